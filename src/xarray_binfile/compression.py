@@ -0,0 +1,306 @@
+"""
+Block-compressed container for binary files.
+
+The raw bytes of the file are split into blocks of a fixed size, that are
+compressed independently and stored one after the other. They are followed by an
+index with the position of each compressed block, and by a trailer::
+
+    [block 0] ... [block n-1] [index: n + 1 uint64] [trailer: 48 bytes]
+
+so a reader decompresses only the blocks that overlap the requested bytes. The
+codecs from the standard library are always available, and those from
+`numcodecs <https://numcodecs.readthedocs.io>`_, like zstd, lz4 or blosc, are used
+when it is installed.
+"""
+
+import bz2
+import gzip
+import lzma
+import mmap
+import os
+import struct
+import zlib
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+from xarray.backends.lru_cache import LRUCache
+
+if TYPE_CHECKING:
+    from xarray_binfile.read.byte_ranges import ByteRanges
+
+MAGIC = b"XBFBLOCK"
+CODEC_NAME_NBYTES = 16
+"""Largest size in bytes of the codec name stored in the trailer."""
+
+TRAILER = struct.Struct(f"<8s{CODEC_NAME_NBYTES}sQQQ")
+"""Magic bytes, codec name, block size, raw size and number of blocks."""
+
+DEFAULT_BLOCK_SIZE = 1 << 20
+"""Size in bytes of the raw data in each block."""
+
+BLOCK_CACHE: LRUCache[tuple, bytes] = LRUCache(maxsize=64)
+"""Process-wide cache of the most recently decompressed blocks."""
+
+
+class Codec(NamedTuple):
+    """
+    Compression codec.
+
+    Attributes:
+        name: Name of the codec.
+        encode: Callable that compresses bytes.
+        decode: Callable that decompresses bytes.
+    """
+
+    name: str
+    encode: Callable[[bytes | memoryview], bytes]
+    decode: Callable[[bytes | memoryview], bytes]
+
+
+_STDLIB_CODECS = {
+    "zlib": Codec("zlib", zlib.compress, zlib.decompress),
+    "gzip": Codec("gzip", gzip.compress, gzip.decompress),
+    "bz2": Codec("bz2", bz2.compress, bz2.decompress),
+    "lzma": Codec("lzma", lzma.compress, lzma.decompress),
+}
+
+
+def get_codec(name: str) -> Codec:
+    """
+    Gets a compression codec by name.
+
+    Args:
+        name: Name of a codec from the standard library (zlib, gzip, bz2 or lzma)
+            or, if it is installed, from numcodecs.
+
+    Returns:
+        The compression codec.
+
+    Raises:
+        ValueError: If the codec is not available.
+    """
+    if name in _STDLIB_CODECS:
+        return _STDLIB_CODECS[name]
+    try:
+        import numcodecs
+    except ImportError as err:
+        error_message = (
+            f"Unknown codec {name!r}, expected one of {sorted(_STDLIB_CODECS)}, "
+            "or install numcodecs for more codecs"
+        )
+        raise ValueError(error_message) from err
+    try:
+        codec = numcodecs.get_codec({"id": name})
+    except ValueError as err:
+        error_message = f"Unknown codec {name!r}"
+        raise ValueError(error_message) from err
+    return Codec(name, codec.encode, lambda data: bytes(codec.decode(data)))
+
+
+def write_compressed(
+    filepath: str | os.PathLike[str],
+    data: np.typing.NDArray,
+    codec: str,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> int:
+    """
+    Writes an array to a block-compressed binary file, in C order.
+
+    Args:
+        filepath: Path to the binary file.
+        data: The array to write.
+        codec: Name of the compression codec.
+        block_size: Size in bytes of the raw data in each block.
+
+    Returns:
+        Size in bytes of the compressed file.
+
+    Raises:
+        ValueError: If the name of the codec does not fit in the trailer.
+    """
+    if len(codec.encode()) > CODEC_NAME_NBYTES:
+        error_message = (
+            f"The codec name {codec!r} is longer than {CODEC_NAME_NBYTES} bytes"
+        )
+        raise ValueError(error_message)
+    encode = get_codec(codec).encode
+    raw = np.ascontiguousarray(data).reshape(-1).view(np.uint8).data
+    offsets = [0]
+    with open(filepath, "wb") as file:
+        for start in range(0, len(raw), block_size):
+            offsets.append(
+                offsets[-1] + file.write(encode(raw[start : start + block_size]))
+            )
+        file.write(np.asarray(offsets, dtype="<u8").tobytes())
+        file.write(
+            TRAILER.pack(MAGIC, codec.encode(), block_size, len(raw), len(offsets) - 1)
+        )
+        return file.tell()
+
+
+class CompressedFile:
+    """
+    Block-compressed binary file, read as its decompressed bytes.
+
+    It offers the same reading interface as
+    :class:`~xarray_binfile.read.file_manager.MappedFile`, so it can be managed by
+    Xarray's file cache in the same way.
+
+    Attributes:
+        filepath: Path to the binary file.
+        codec: Compression codec of the blocks.
+        block_size: Size in bytes of the raw data in each block.
+        size: Size in bytes of the decompressed data.
+    """
+
+    def __init__(self, filepath: str | os.PathLike[str], mode: str = "rb"):
+        """
+        Maps the binary file into memory and reads its index.
+
+        Args:
+            filepath: Path to the binary file.
+            mode: Mode used to open the file. Only reading is supported.
+
+        Raises:
+            ValueError: If the file is not a block-compressed container.
+        """
+        self.filepath = Path(filepath)
+        with open(self.filepath, mode) as file:
+            stat = os.fstat(file.fileno())
+            if stat.st_size < TRAILER.size:
+                error_message = f"{self.filepath} is not a block-compressed file"
+                raise ValueError(error_message)
+            self._memory_map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, codec, self.block_size, self.size, n_blocks = TRAILER.unpack_from(
+            self._memory_map, stat.st_size - TRAILER.size
+        )
+        if magic != MAGIC:
+            error_message = f"{self.filepath} is not a block-compressed file"
+            raise ValueError(error_message)
+        self.codec = get_codec(codec.rstrip(b"\0").decode())
+        index_stop = stat.st_size - TRAILER.size
+        self._offsets = np.frombuffer(
+            self._memory_map[index_stop - 8 * (n_blocks + 1) : index_stop],
+            dtype="<u8",
+        ).astype(np.int64)
+        self._cache_key = (str(self.filepath), stat.st_mtime_ns)
+
+    def _block(self, index: int) -> bytes:
+        """
+        Gets a decompressed block, from the block cache when possible.
+
+        Args:
+            index: Index of the block.
+
+        Returns:
+            The decompressed block.
+        """
+        key = (*self._cache_key, index)
+        try:
+            return BLOCK_CACHE[key]
+        except KeyError:
+            block = self.codec.decode(
+                self._memory_map[self._offsets[index] : self._offsets[index + 1]]
+            )
+            BLOCK_CACHE[key] = block
+            return block
+
+    def _read_into(self, position: int, out: np.typing.NDArray[np.uint8]) -> None:
+        """
+        Copies consecutive decompressed bytes straight from their blocks into an array.
+
+        Args:
+            position: Position in bytes where the read starts.
+            out: Array of bytes receiving the data.
+
+        Raises:
+            EOFError: If the read goes beyond the end of the data.
+        """
+        stop = position + out.size
+        if stop > self.size:
+            error_message = (
+                f"Expected {out.size} bytes at position {position} of "
+                f"{self.filepath}, but the file has {self.size} bytes"
+            )
+            raise EOFError(error_message)
+        first, last = position // self.block_size, (stop - 1) // self.block_size
+        for index in range(first, last + 1):
+            block = np.frombuffer(self._block(index), dtype=np.uint8)
+            block_start = index * self.block_size
+            low, high = max(position, block_start), min(stop, block_start + block.size)
+            out[low - position : high - position] = block[
+                low - block_start : high - block_start
+            ]
+
+    def _span(self, start: int, stop: int) -> np.typing.NDArray[np.uint8]:
+        """
+        Gets a span of the decompressed bytes.
+
+        A span within a single block is a view of it, and any other span is copied
+        from its blocks.
+
+        Args:
+            start: Position in bytes where the span starts.
+            stop: Position in bytes where the span stops.
+
+        Returns:
+            The decompressed bytes.
+
+        Raises:
+            EOFError: If the span goes beyond the end of the data.
+        """
+        index = start // self.block_size
+        if stop <= self.size and (stop - 1) // self.block_size == index:
+            position = index * self.block_size
+            block = np.frombuffer(self._block(index), dtype=np.uint8)
+            return block[start - position : stop - position]
+        span = np.empty(stop - start, dtype=np.uint8)
+        self._read_into(start, span)
+        return span
+
+    def read_ranges(
+        self,
+        out: np.typing.NDArray,
+        ranges: "ByteRanges",
+        max_gap: int | None = None,
+    ) -> None:
+        """
+        Reads byte ranges of the decompressed data into consecutive positions of an array.
+
+        Args:
+            out: C-contiguous array receiving the ranges, in order.
+            ranges: Byte ranges to read.
+            max_gap: Largest gap in bytes between ranges gathered from the same span
+                of blocks. Defaults to None, meaning the block size.
+        """
+        buffer = out.reshape(-1).view(np.uint8)
+        for first, last in ranges.groups(max_gap or self.block_size):
+            starts = ranges.starts[first:last]
+            destination = buffer[first * ranges.nbytes : last * ranges.nbytes]
+            if np.all(np.diff(starts) == ranges.nbytes):
+                # consecutive ranges are decompressed straight into their place
+                self._read_into(int(starts[0]), destination)
+                continue
+            span = self._span(int(starts[0]), int(starts[-1]) + ranges.nbytes)
+            runs = np.lib.stride_tricks.sliding_window_view(span, ranges.nbytes)
+            destination[:] = runs[starts - starts[0]].reshape(-1)
+
+    def readv(self, position: int, buffers: Sequence[memoryview]) -> None:
+        """
+        Reads consecutive decompressed bytes into a sequence of buffers.
+
+        Args:
+            position: Position in bytes where the read starts.
+            buffers: Buffers to fill, in order.
+        """
+        for buffer in buffers:
+            self._read_into(position, np.frombuffer(buffer, dtype=np.uint8))
+            position += buffer.nbytes
+
+    def close(self) -> None:
+        """
+        Closes the memory map.
+        """
+        self._memory_map.close()
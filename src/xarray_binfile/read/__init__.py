@@ -1,2 +1,26 @@
+from xarray_binfile.read.buffers import BufferPool
+from xarray_binfile.read.coordinates import RegularCoord
 from xarray_binfile.read.entrypoint import RawBinaryEntrypoint
-from xarray_binfile.read.file_metadata import ReadSpecs, ReadSpecsGetterProtocol
+from xarray_binfile.read.executor import set_max_read_workers
+from xarray_binfile.read.file_metadata import (
+    PackedReadSpecs,
+    ReadSpecs,
+    ReadSpecsGetterProtocol,
+    VariableNamesGetterProtocol,
+)
+from xarray_binfile.read.index import ReadSpecsIndex
+from xarray_binfile.read.instrumentation import (
+    ReadEvent,
+    add_read_hook,
+    collect_read_stats,
+    remove_read_hook,
+)
+from xarray_binfile.read.loader import load_binfile_series
+from xarray_binfile.read.overviews import Overviews
+from xarray_binfile.read.prefetch import iter_steps
+from xarray_binfile.read.reduce import binfile_reduce
+from xarray_binfile.read.refresh import refresh_dataset
+from xarray_binfile.read.selection import select_paths
+from xarray_binfile.read.series import open_binfile_series
+from xarray_binfile.read.statistics import FileStatistics
+from xarray_binfile.read.tiling import TileManifest, open_binfile_tiles
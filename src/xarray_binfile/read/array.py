@@ -2,30 +2,41 @@
 Defines a backend array for reading binary files in Xarray.
 """
 
+import os
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
 import numpy as np
 import xarray as xr
-from xarray.backends import BackendArray
+from xarray.backends import BackendArray, CachingFileManager
 from xarray.core import indexing
 
+from xarray_binfile.compression import CompressedFile
+from xarray_binfile.read.buffers import BufferPool
+from xarray_binfile.read.byte_ranges import (
+    CONVERT_CHUNK_NBYTES,
+    MAX_GAP_NBYTES,
+    MIN_RUN_NBYTES,
+    ByteRanges,
+    OuterKey,
+    OuterSelection,
+)
+from xarray_binfile.read.chunks import (
+    DEFAULT_CHUNK_NBYTES,
+    get_alignment,
+    get_preferred_chunks,
+)
+from xarray_binfile.read.coordinates import get_coordinates
+from xarray_binfile.read.executor import run_read
+from xarray_binfile.read.file_manager import MappedFile, get_file_manager
 from xarray_binfile.read.file_metadata import ReadSpecs
-
-
-def _is_coord_sliced(size: int, slice_spec: slice) -> bool:
-    """
-    Check if a coordinate is sliced.
-    Args:
-        size: Size of the coordinate.
-        slice_spec: Slice specification.
-    Returns:
-        True if the coordinate is sliced, False otherwise.
-    """
-    return any(
-        (
-            (slice_spec.start or 0) != 0,
-            (slice_spec.stop or size) != size,
-            (slice_spec.step or 1) != 1,
-        ),
-    )
+from xarray_binfile.read.instrumentation import (
+    READ_HOOKS,
+    ReadEvent,
+    emit_read_event,
+    touched_nbytes,
+)
 
 
 class BinaryEngineBackendArray(BackendArray):
@@ -34,23 +45,57 @@ class BinaryEngineBackendArray(BackendArray):
 
     Attributes:
         metadata: Metadata describing the binary file.
+        buffer_pool: Pool lending the arrays that data is read into, if any.
         dtype: Data type of the array.
         shape: Shape of the array.
     """
 
-    def __init__(self, metadata: ReadSpecs):
+    def __init__(
+        self,
+        metadata: ReadSpecs,
+        file_manager: CachingFileManager | None = None,
+        buffer_pool: BufferPool | None = None,
+    ):
         """
         Initializes the backend array.
 
         Args:
             metadata: Metadata describing the binary file.
+            file_manager: Manager of the cached memory map of the binary file, that
+                may be shared with other arrays stored in the same file. Defaults to
+                None, meaning that a new manager is created.
+            buffer_pool: Pool lending the arrays that data is read into, that the
+                caller releases once done with them. Defaults to None, meaning a
+                new array is allocated for each read.
         """
         self.metadata = metadata
+        self.buffer_pool = buffer_pool
+        self._file_manager = file_manager or get_file_manager(
+            self.metadata.filepath, self.metadata.compression
+        )
 
         # Attributes required by BackendArray
-        self.dtype = self.metadata.dtype
+        self.dtype = self.metadata.output_dtype
         self.shape = self.metadata.shape
 
+        self._storage_axes = tuple(
+            self.metadata.dims.index(dim) for dim in self.metadata.storage_order
+        )
+        # position in bytes one past the last element, to map the file again when
+        # records were appended after it was mapped
+        self._extent = 0
+        if all(self.shape):
+            self._extent = (
+                self.metadata.data_offset
+                + sum(
+                    (size - 1) * stride
+                    for size, stride in zip(
+                        self.shape, self.metadata.strides, strict=True
+                    )
+                )
+                + np.dtype(self.metadata.dtype).itemsize
+            )
+
     def __getitem__(self, key: indexing.ExplicitIndexer) -> np.typing.ArrayLike:
         """
         Retrieves data from the array using explicit indexing.
@@ -64,87 +109,267 @@ class BinaryEngineBackendArray(BackendArray):
         return indexing.explicit_indexing_adapter(
             key=key,
             shape=self.metadata.shape,
-            indexing_support=indexing.IndexingSupport.VECTORIZED,
+            indexing_support=indexing.IndexingSupport.OUTER,
             raw_indexing_method=self._raw_indexing_method,
         )
 
-    def _raw_indexing_method(self, key: tuple[slice, ...]) -> np.typing.ArrayLike:
+    async def async_getitem(self, key: indexing.ExplicitIndexer) -> np.typing.ArrayLike:
         """
-        Performs raw indexing on the binary file.
+        Retrieves data from the array using explicit indexing, without blocking.
+
+        The read runs in the bounded read thread pool, so many reads awaited at
+        once, like the variables loaded by ``Dataset.load_async``, overlap.
 
         Args:
-            key: Tuple of slices specifying the indices to read.
+            key: Indexing key specifying the data to retrieve.
+
+        Returns:
+            The retrieved data.
+        """
+        return await indexing.async_explicit_indexing_adapter(
+            key=key,
+            shape=self.metadata.shape,
+            indexing_support=indexing.IndexingSupport.OUTER,
+            raw_indexing_method=self._async_raw_indexing_method,
+        )
+
+    async def _async_raw_indexing_method(self, key: OuterKey) -> np.typing.ArrayLike:
+        """
+        Reads the requested data from the binary file in the read thread pool.
+
+        Args:
+            key: Outer indexing key, with slices, integers or 1-D integer arrays.
 
         Returns:
             The data read from the binary file.
         """
-        with open(self.metadata.filepath, "rb") as file:
-            return self._read_binary_at_slices(file, key)
+        return await run_read(self._raw_indexing_method, key)
 
-    def _is_sliced(self, key: tuple[slice, ...]) -> bool:
+    def _raw_indexing_method(self, key: OuterKey) -> np.typing.ArrayLike:
         """
-        Checks if the key is a slice of the original array.
+        Performs raw indexing on the binary file.
+
+        The memory map is kept in Xarray's file cache, so repeated reads from the
+        same file do not open and map it again.
 
         Args:
-            key: Tuple of slices specifying the indices to check.
+            key: Outer indexing key, with slices, integers or 1-D integer arrays.
 
         Returns:
-            True if the key is a slice, False otherwise.
+            The data read from the binary file.
+        """
+        with self._file_manager.acquire_context() as mapped_file:
+            return self._read_binary_at_slices(mapped_file, key)
+
+    def read_into(
+        self, out: np.typing.NDArray, key: OuterKey | None = None
+    ) -> np.typing.NDArray:
         """
+        Reads data straight into an existing array, without allocating the result.
 
-        return any(
-            _is_coord_sliced(s, k)
-            for k, s in zip(key, self.metadata.shape, strict=True)
+        The bytes are read into `out` itself when it is C-contiguous and the data is
+        stored in the order of its dimensions, otherwise through a temporary array.
+        The array may live anywhere, like in ``multiprocessing.shared_memory``.
+
+        Args:
+            out: Writable array receiving the data, with the data type of the array
+                and the shape of the selection.
+            key: Outer indexing key, with slices, integers or 1-D integer arrays.
+                Defaults to None, meaning the whole array.
+
+        Returns:
+            The array `out`.
+
+        Raises:
+            ValueError: If `out` does not match the selection or is not writable.
+
+        Examples:
+            >>> import tempfile
+            >>> path = Path(tempfile.mkdtemp()) / "ux.bin"
+            >>> np.arange(12.0).tofile(path)
+            >>> array = BinaryEngineBackendArray(
+            ...     ReadSpecs(path, "<f8", {"x": range(3), "y": range(4)}, "ux")
+            ... )
+            >>> out = np.empty(3)
+            >>> array.read_into(out, (slice(None), 2))
+            array([ 2.,  6., 10.])
+        """
+        if key is None:
+            key = tuple(slice(None) for _ in self.shape)
+        selection = OuterSelection.from_key(key, self.shape)
+        shape = tuple(
+            size
+            for axis, size in enumerate(selection.shape)
+            if axis not in selection.int_axes
         )
+        if out.shape != shape or out.dtype != self.dtype or not out.flags.writeable:
+            error_message = (
+                f"Expected a writable array of shape {shape} and dtype {self.dtype}, "
+                f"got shape {out.shape} and dtype {out.dtype}"
+            )
+            raise ValueError(error_message)
+        with self._file_manager.acquire_context() as mapped_file:
+            self._read_binary_at_slices(mapped_file, key, out)
+        return out
 
-    def _wrap_numpy_fromfile(self, file) -> np.typing.NDArray:
+    def _allocate(self, shape: tuple[int, ...]) -> np.typing.NDArray:
         """
-        Reads the entire binary file into a NumPy array.
+        Gets a new array to read data into, from the buffer pool if any.
 
         Args:
-            file: The binary file to read.
+            shape: Shape of the array.
 
         Returns:
-            The data read from the file.
+            A C-contiguous array with undefined contents.
         """
-        return np.fromfile(
-            file, dtype=self.metadata.dtype, count=np.prod(self.metadata.shape)
-        ).reshape(self.metadata.shape)
+        if self.buffer_pool is None:
+            return np.empty(shape, dtype=self.dtype)
+        return self.buffer_pool.acquire(shape, self.dtype)
 
-    def _wrap_numpy_memmap(self, file, key: tuple[slice, ...]) -> np.typing.NDArray:
+    def _read_binary_at_slices(
+        self,
+        mapped_file: MappedFile | CompressedFile,
+        key: OuterKey,
+        out: np.typing.NDArray | None = None,
+    ) -> np.typing.NDArray:
         """
-        Reads a portion of the binary file using memory mapping.
+        Reads a binary file at specific locations based on an outer indexing key.
+
+        The selection is converted into byte ranges, that are read straight into
+        the result. When the ranges are too short to be worth a read call, the
+        elements are gathered from the memory map instead. Either way, only the
+        selected data is touched and only the result is allocated. Compressed files
+        always read their ranges, decompressing only the blocks that hold them.
+        When the data type on disk differs from the one in memory, the ranges are
+        read in small chunks, each one converted straight into the result. Data
+        stored in another order than its dimensions, like Fortran-ordered arrays,
+        is read in the order on disk, and the result is a transposed view of it.
+        Each read is reported to the read hooks, if any.
 
         Args:
-            file: The binary file to read.
-            key: Tuple of slices specifying the indices to read.
+            mapped_file: The memory mapped binary file to read.
+            key: Outer indexing key, with slices, integers or 1-D integer arrays.
+            out: Array receiving the data, with the shape of the result. Defaults
+                to None, meaning a new array, from the buffer pool if any.
 
         Returns:
-            The data read from the file.
+            The array data read from the file at the specified locations.
         """
-        memory_map = np.memmap(
-            file,
-            dtype=self.metadata.dtype,
-            mode="r",
-            shape=self.metadata.shape,
-            order="C",
+        start_time = time.perf_counter() if READ_HOOKS else 0.0
+        selection = OuterSelection.from_key(key, self.shape)
+        disk_dtype = np.dtype(self.metadata.dtype)
+        # the ranges follow the order on disk, and the result is transposed back
+        axes = self._storage_axes
+        stored_selection = OuterSelection(
+            tuple(selection.indices[axis] for axis in axes),
+            (),
+            tuple(self.shape[axis] for axis in axes),
+        )
+        ranges = ByteRanges.from_selection(
+            stored_selection,
+            strides=tuple(self.metadata.strides[axis] for axis in axes),
+            itemsize=disk_dtype.itemsize,
+            offset=self.metadata.data_offset,
         )
-        return np.asarray(memory_map[key])  # ensure we actually read the data
+        if ranges.nbytes >= MIN_RUN_NBYTES or not isinstance(mapped_file, MappedFile):
+            if out is None:
+                stored = self._allocate(stored_selection.shape)
+            else:
+                stored = np.expand_dims(out, selection.int_axes).transpose(axes)
+            buffer = (
+                stored
+                if stored.flags.c_contiguous
+                else np.empty(stored.shape, dtype=self.dtype)
+            )
+            if disk_dtype == self.dtype:
+                mapped_file.read_ranges(buffer, ranges)
+            else:
+                _read_converted(mapped_file, buffer, ranges, disk_dtype)
+            if buffer is not stored:
+                stored[...] = buffer
+            result = stored.transpose(np.argsort(axes))
+        else:
+            if mapped_file.size < self._extent:
+                mapped_file.refresh()
+            array = mapped_file.view(
+                dtype=disk_dtype,
+                shape=self.shape,
+                offset=self.metadata.data_offset,
+                strides=self.metadata.strides,
+            )
+            if out is not None:
+                result = np.expand_dims(out, selection.int_axes)
+                _gather_converted(array, result, selection.indices)
+            elif disk_dtype == self.dtype and self.buffer_pool is None:
+                # outer indexing copies the data, so no view keeps the memory map alive
+                result = np.asarray(array[np.ix_(*selection.indices)])
+            else:
+                result = self._allocate(selection.shape)
+                _gather_converted(array, result, selection.indices)
+        if READ_HOOKS:
+            self._emit_read_event(mapped_file, ranges, start_time)
+        if out is not None:
+            return out
+        return result.squeeze(axis=selection.int_axes)
 
-    def _read_binary_at_slices(self, file, key: tuple[slice, ...]) -> np.typing.NDArray:
+    def _emit_read_event(
+        self,
+        mapped_file: MappedFile | CompressedFile,
+        ranges: ByteRanges,
+        start_time: float,
+    ) -> None:
         """
-        Reads a binary file at specific locations based on the key tuple of slices.
+        Reports a read to the read hooks.
 
         Args:
-            file: The binary file to read.
-            key: Tuple of slices specifying the indices to read.
+            mapped_file: The binary file that was read.
+            ranges: Byte ranges holding the data that was read.
+            start_time: Value of ``time.perf_counter`` when the read started.
+        """
+        seconds = time.perf_counter() - start_time
+        max_gap = MAX_GAP_NBYTES
+        gather = ranges.nbytes < MIN_RUN_NBYTES and isinstance(mapped_file, MappedFile)
+        if gather:
+            path = "gather"
+        elif isinstance(mapped_file, CompressedFile):
+            path = "compressed"
+            max_gap = mapped_file.block_size
+        else:
+            path = "ranges"
+        if np.dtype(self.metadata.dtype) != self.dtype:
+            path += "+convert"
+        emit_read_event(
+            ReadEvent(
+                filepath=Path(self.metadata.filepath),
+                name=self.metadata.name,
+                path=path,
+                requested_nbytes=ranges.starts.size * ranges.nbytes,
+                touched_nbytes=touched_nbytes(ranges, max_gap, gather=gather),
+                n_ranges=ranges.starts.size,
+                seconds=seconds,
+                pid=os.getpid(),
+            )
+        )
+
+    def refresh(self) -> "BinaryEngineBackendArray":
+        """
+        Gets the backend array with the records found in the file now.
+
+        Only the size of the file is queried, and the file stays open, shared with
+        the returned array.
 
         Returns:
-            The array data read from the file at the specified slices.
+            A backend array with the records of the file, or this one if their
+            number did not change or the file has no record dimension.
         """
-        if self._is_sliced(key):
-            return self._wrap_numpy_memmap(file, key)
-        return self._wrap_numpy_fromfile(file)
+        if self.metadata.record_dim is None or self.metadata.compression is not None:
+            return self
+        n_records = self.metadata.count_records(os.stat(self.metadata.filepath).st_size)
+        if n_records == self.shape[self.metadata.dims.index(self.metadata.record_dim)]:
+            return self
+        return BinaryEngineBackendArray(
+            self.metadata.with_records(n_records), self._file_manager, self.buffer_pool
+        )
 
     def get_xarray_dataset(self) -> xr.Dataset:
         """
@@ -153,13 +378,155 @@ class BinaryEngineBackendArray(BackendArray):
         Returns:
             The Xarray Dataset representation of the backend array.
         """
-        return xr.Dataset(
-            data_vars={
-                self.metadata.name: (
-                    self.metadata.dims,
-                    indexing.LazilyIndexedArray(self),
+        return get_xarray_dataset((self,))
+
+
+def _read_converted(
+    mapped_file: MappedFile | CompressedFile,
+    out: np.typing.NDArray,
+    ranges: ByteRanges,
+    disk_dtype: np.dtype,
+) -> None:
+    """
+    Reads byte ranges chunk by chunk, converting each chunk into an array.
+
+    A single scratch buffer of about `CONVERT_CHUNK_NBYTES` receives the bytes of
+    each chunk, that are byte swapped and cast into their place in the output in
+    the same pass, so no intermediate array of the whole selection is created.
+
+    Args:
+        mapped_file: The memory mapped binary file to read.
+        out: C-contiguous array receiving the ranges, in order.
+        ranges: Byte ranges to read.
+        disk_dtype: Data type of the elements in the binary file.
+    """
+    ranges = ranges.split(disk_dtype.itemsize, CONVERT_CHUNK_NBYTES)
+    if not ranges.starts.size:
+        return
+    runs_per_chunk = max(1, CONVERT_CHUNK_NBYTES // ranges.nbytes)
+    items_per_run = ranges.nbytes // disk_dtype.itemsize
+    scratch = np.empty(runs_per_chunk * items_per_run, dtype=disk_dtype)
+    flat = out.reshape(-1)
+    for first in range(0, ranges.starts.size, runs_per_chunk):
+        chunk_ranges = ByteRanges(
+            ranges.starts[first : first + runs_per_chunk], ranges.nbytes
+        )
+        chunk = scratch[: chunk_ranges.starts.size * items_per_run]
+        mapped_file.read_ranges(chunk, chunk_ranges)
+        start = first * items_per_run
+        flat[start : start + chunk.size] = chunk
+
+
+def _gather_converted(
+    array: np.typing.NDArray,
+    out: np.typing.NDArray,
+    indices: tuple[np.typing.NDArray[np.intp], ...],
+) -> None:
+    """
+    Gathers an outer selection chunk by chunk, converting each chunk into an array.
+
+    Only one chunk of the selection is copied at a time, so gathering into an
+    existing array needs no temporary array of the whole selection.
+
+    Args:
+        array: Memory mapped array, with the data type on disk.
+        out: Array receiving the selection.
+        indices: Selected indices along each axis.
+    """
+    if not indices or not out.size:
+        out[...] = array[np.ix_(*indices)]
+        return
+    row_nbytes = array.itemsize * out[0].size
+    rows_per_chunk = max(1, CONVERT_CHUNK_NBYTES // max(row_nbytes, 1))
+    first_index, *other_indices = indices
+    for first in range(0, first_index.size, rows_per_chunk):
+        chunk_index = first_index[first : first + rows_per_chunk]
+        out[first : first + chunk_index.size] = array[
+            np.ix_(chunk_index, *other_indices)
+        ]
+
+
+def get_backend_arrays(
+    read_specs: Iterable[ReadSpecs],
+    buffer_pool: BufferPool | None = None,
+) -> list[BinaryEngineBackendArray]:
+    """
+    Creates backend arrays for read specifications.
+
+    Arrays stored in the same file share a single memory map.
+
+    Args:
+        read_specs: Metadata describing each array.
+        buffer_pool: Pool lending the arrays that data is read into. Defaults to
+            None, meaning a new array is allocated for each read.
+
+    Returns:
+        A backend array for each read specification.
+    """
+    file_managers: dict[Path, CachingFileManager] = {}
+    arrays = []
+    for metadata in read_specs:
+        if metadata.filepath not in file_managers:
+            file_managers[metadata.filepath] = get_file_manager(
+                metadata.filepath, metadata.compression
+            )
+        arrays.append(
+            BinaryEngineBackendArray(
+                metadata=metadata,
+                file_manager=file_managers[metadata.filepath],
+                buffer_pool=buffer_pool,
+            )
+        )
+    return arrays
+
+
+def get_xarray_dataset(
+    arrays: Iterable[BinaryEngineBackendArray],
+    chunk_nbytes: int = DEFAULT_CHUNK_NBYTES,
+) -> xr.Dataset:
+    """
+    Converts backend arrays to an Xarray Dataset, with one data variable each.
+
+    Coordinates and attributes are merged from all arrays without any alignment,
+    and closing the dataset closes the files of all arrays. The preferred chunks of
+    each variable, used by ``chunks={}`` or ``chunks="auto"``, follow its layout on
+    disk.
+
+    Args:
+        arrays: Backend arrays to include in the dataset.
+        chunk_nbytes: Target size in bytes of the preferred chunks. Defaults to
+            `DEFAULT_CHUNK_NBYTES`.
+
+    Returns:
+        The Xarray Dataset representation of the backend arrays.
+    """
+    data_vars = {}
+    coords: dict = {}
+    attrs: dict = {}
+    file_managers = {}
+    for array in arrays:
+        data_vars[array.metadata.name] = xr.Variable(
+            array.metadata.dims,
+            indexing.LazilyIndexedArray(array),
+            encoding={
+                "preferred_chunks": get_preferred_chunks(
+                    array.metadata,
+                    chunk_nbytes,
+                    get_alignment(Path(array.metadata.filepath).parent),
                 )
             },
-            coords=self.metadata.coords,
-            attrs=self.metadata.attrs,
         )
+        coords |= array.metadata.coords
+        attrs |= array.metadata.attrs or {}
+        file_managers[id(array._file_manager)] = array._file_manager
+
+    dataset = xr.Dataset(
+        data_vars=data_vars, coords=get_coordinates(coords), attrs=attrs
+    )
+
+    def close() -> None:
+        for file_manager in file_managers.values():
+            file_manager.close()
+
+    dataset.set_close(close)
+    return dataset
@@ -0,0 +1,131 @@
+"""
+Reuses the arrays that data is read into, so steady-state reads do not allocate.
+
+Loops loading the same shape again and again, like one chunk per time step, spend
+much of their time allocating and page faulting fresh result arrays. A
+:class:`BufferPool` given to the backend hands out the arrays that each read fills,
+and takes them back once the caller is done with them.
+"""
+
+import threading
+import weakref
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+from xarray_binfile.typing import DTypeLike
+
+BufferKey = tuple[tuple[int, ...], str]
+
+
+class BufferPool:
+    """
+    Thread-safe pool of reusable arrays, grouped by shape and data type.
+
+    An array is lent by :meth:`acquire` and returned with :meth:`release`, called
+    with the array or any view of it, like the data of a chunk loaded by dask. The
+    pool only tracks the arrays it lends weakly, so arrays that are never released
+    are simply garbage collected.
+
+    The pool belongs to the process that created it. A pool pickled to another
+    process, like a dask worker, starts empty there, and the arrays it lends come
+    back as copies that cannot be released to the original pool.
+
+    Attributes:
+        max_free: Largest number of free arrays kept for each shape and data type.
+        allocator: Callable creating a new array from its shape and data type, like
+            one backed by ``multiprocessing.shared_memory``.
+        allocations: Number of arrays created so far.
+
+    Examples:
+        >>> pool = BufferPool()
+        >>> first = pool.acquire((2, 3), "<f8")
+        >>> pool.release(first[0])
+        >>> pool.acquire((2, 3), "<f8") is first, pool.allocations
+        (True, 1)
+    """
+
+    def __init__(
+        self,
+        max_free: int = 8,
+        allocator: Callable[[tuple[int, ...], np.dtype], np.typing.NDArray]
+        | None = None,
+    ):
+        """
+        Initializes an empty pool.
+
+        Args:
+            max_free: Largest number of free arrays kept for each shape and data
+                type. Defaults to 8.
+            allocator: Callable creating a new array from its shape and data type.
+                Defaults to None, meaning ``np.empty``.
+        """
+        self.max_free = max_free
+        self.allocator = allocator or np.empty
+        self.allocations = 0
+        self._free: dict[BufferKey, list[np.typing.NDArray]] = defaultdict(list)
+        self._lent: dict[int, tuple[BufferKey, weakref.finalize]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, shape: tuple[int, ...], dtype: DTypeLike) -> np.typing.NDArray:
+        """
+        Lends a C-contiguous array, reusing a free one if possible.
+
+        Args:
+            shape: Shape of the array.
+            dtype: Data type of the array.
+
+        Returns:
+            An array with undefined contents.
+        """
+        dtype = np.dtype(dtype)
+        key = (tuple(shape), dtype.str)
+        with self._lock:
+            free = self._free[key]
+            if free:
+                array = free.pop()
+            else:
+                array = self.allocator(key[0], dtype)
+                self.allocations += 1
+            # forgets the array if it is garbage collected instead of released
+            finalizer = weakref.finalize(array, self._lent.pop, id(array), None)
+            self._lent[id(array)] = (key, finalizer)
+        return array
+
+    def release(self, array: np.typing.NDArray) -> None:
+        """
+        Takes back a lent array, so it can be lent again.
+
+        Args:
+            array: The lent array, or a view of it.
+
+        Raises:
+            ValueError: If the array was not lent by this pool, like an array lent
+                by a copy of the pool in another process.
+        """
+        base: Any = array
+        with self._lock:
+            while base is not None and id(base) not in self._lent:
+                base = getattr(base, "base", None)
+            if base is None:
+                error_message = "The array was not acquired from this pool"
+                raise ValueError(error_message)
+            key, finalizer = self._lent.pop(id(base))
+            finalizer.detach()
+            if len(self._free[key]) < self.max_free:
+                self._free[key].append(base)
+
+    def __reduce__(self) -> tuple:
+        """
+        Pickles the pool as an empty one, like when it is sent to a dask worker.
+
+        The arrays lent by the copy are not tracked by this pool, so they cannot be
+        released to it.
+
+        Returns:
+            The constructor of the pool and its arguments.
+        """
+        allocator = None if self.allocator is np.empty else self.allocator
+        return (BufferPool, (self.max_free, allocator))
@@ -0,0 +1,238 @@
+"""
+Plans the byte ranges of a binary file that hold an outer selection of an array.
+
+An outer selection picks a set of indices along each axis independently. The
+trailing axes whose selection is contiguous on disk are merged into runs of bytes,
+and nearby runs are coalesced into a single read, so a selection like
+``isel(z=[0, 7, 14])`` reads only the bytes it needs.
+"""
+
+from collections.abc import Iterator
+from typing import NamedTuple
+
+import numpy as np
+
+OuterKey = tuple[int | np.integer | slice | np.typing.NDArray[np.integer], ...]
+
+MIN_RUN_NBYTES = 1 << 14
+"""Runs shorter than this are gathered from the memory map, as a read call per run
+costs more than copying them from the page cache."""
+
+MAX_GAP_NBYTES = 4096
+"""Runs separated by up to this many bytes are coalesced into a single read."""
+
+CONVERT_CHUNK_NBYTES = 1 << 20
+"""Size in bytes of the chunks read or written at once when converting data types."""
+
+
+def key_indices(
+    k: int | np.integer | slice | np.typing.NDArray[np.integer], size: int
+) -> np.typing.NDArray[np.intp]:
+    """
+    Gets the indices selected by the key along an axis, without enumerating the axis.
+
+    Args:
+        k: Key along the axis, a slice, an integer or a 1-D integer array.
+        size: Size of the axis.
+
+    Returns:
+        The selected indices, non-negative, as a 1-D array.
+
+    Raises:
+        IndexError: If an index is out of bounds.
+
+    Examples:
+        >>> key_indices(slice(-3, None), 10**12), key_indices(np.array([-1, 2]), 5)
+        (array([999999999997, 999999999998, 999999999999]), array([4, 2]))
+    """
+    if isinstance(k, slice):
+        return np.arange(*k.indices(size), dtype=np.intp)
+    indices = np.atleast_1d(np.asarray(k, dtype=np.intp))
+    if indices.size and (indices.min() < -size or indices.max() >= size):
+        error_message = f"Index {k} is out of bounds for an axis of size {size}"
+        raise IndexError(error_message)
+    return np.where(indices < 0, indices + size, indices)
+
+
+class OuterSelection(NamedTuple):
+    """
+    Indices selected along each axis of an array.
+
+    Attributes:
+        indices: Selected indices along each axis, as 1-D integer arrays.
+        int_axes: Axes indexed by an integer, that are dropped from the result.
+        array_shape: Shape of the indexed array.
+    """
+
+    indices: tuple[np.typing.NDArray[np.intp], ...]
+    int_axes: tuple[int, ...]
+    array_shape: tuple[int, ...]
+
+    @classmethod
+    def from_key(cls, key: OuterKey, shape: tuple[int, ...]) -> "OuterSelection":
+        """
+        Normalizes an outer indexing key.
+
+        Args:
+            key: Outer indexing key, with slices, integers or 1-D integer arrays.
+            shape: Shape of the indexed array.
+
+        Returns:
+            The indices selected by the key.
+        """
+        indices = tuple(
+            key_indices(k, size) for k, size in zip(key, shape, strict=True)
+        )
+        int_axes = tuple(
+            axis for axis, k in enumerate(key) if isinstance(k, int | np.integer)
+        )
+        return cls(indices, int_axes, tuple(shape))
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        """
+        Gets the shape of the selection, including the axes indexed by integers.
+
+        Returns:
+            Shape of the selection.
+        """
+        return tuple(index.size for index in self.indices)
+
+
+class ByteRanges(NamedTuple):
+    """
+    Byte ranges of a binary file holding a selection, in C order of the selection.
+
+    Attributes:
+        starts: Position in the file where each range starts.
+        nbytes: Size in bytes of every range.
+    """
+
+    starts: np.typing.NDArray[np.int64]
+    nbytes: int
+
+    @classmethod
+    def from_selection(
+        cls,
+        selection: OuterSelection,
+        strides: tuple[int, ...],
+        itemsize: int,
+        offset: int = 0,
+    ) -> "ByteRanges":
+        """
+        Merges the trailing axes that are contiguous on disk into runs of bytes.
+
+        Args:
+            selection: Indices selected along each axis.
+            strides: Strides in bytes of the array in the file.
+            itemsize: Size in bytes of each element.
+            offset: Position in bytes of the first element in the file.
+
+        Returns:
+            The byte ranges holding the selection.
+        """
+        if 0 in selection.shape:
+            return cls(np.empty(0, dtype=np.int64), 0)
+
+        nbytes = itemsize
+        run_axis = len(strides)
+        for axis in reversed(range(len(strides))):
+            if selection.array_shape[axis] == 1:
+                run_axis = axis  # axes of size one do not break contiguity
+                continue
+            index = selection.indices[axis]
+            if strides[axis] != nbytes or np.any(np.diff(index) != 1):
+                break
+            run_axis = axis
+            nbytes *= index.size
+            if index.size != selection.array_shape[axis]:
+                break  # a partial axis ends the run
+
+        run_start = offset + sum(
+            int(index[0]) * stride
+            for index, stride in zip(
+                selection.indices[run_axis:], strides[run_axis:], strict=True
+            )
+        )
+        starts = np.full((), run_start, dtype=np.int64)
+        for index, stride in zip(
+            selection.indices[:run_axis], strides[:run_axis], strict=True
+        ):
+            starts = np.add.outer(starts, index.astype(np.int64) * stride)
+        return cls(starts.ravel(), nbytes)
+
+    def split(self, itemsize: int, max_nbytes: int) -> "ByteRanges":
+        """
+        Splits ranges longer than `max_nbytes` into pieces of the same size.
+
+        The pieces hold whole elements, so a range is kept whole when its number of
+        elements has no divisor giving pieces of up to a few times `max_nbytes`.
+
+        Args:
+            itemsize: Size in bytes of each element.
+            max_nbytes: Largest size in bytes of a piece.
+
+        Returns:
+            The byte ranges, with the same bytes in the same order.
+        """
+        if self.nbytes <= max_nbytes:
+            return self
+        n_items = self.nbytes // itemsize
+        min_pieces = -(-self.nbytes // max_nbytes)
+        for pieces in range(min_pieces, min(n_items, 4 * min_pieces) + 1):
+            if n_items % pieces == 0:
+                break
+        else:
+            return self
+        nbytes = self.nbytes // pieces
+        offsets = np.arange(pieces, dtype=np.int64) * nbytes
+        return ByteRanges(np.add.outer(self.starts, offsets).ravel(), nbytes)
+
+    def groups(self, max_gap: int = MAX_GAP_NBYTES) -> Iterator[tuple[int, int]]:
+        """
+        Groups consecutive ranges separated by small forward gaps.
+
+        Args:
+            max_gap: Largest gap in bytes between ranges in the same group.
+
+        Yields:
+            The indices of the first range in each group and one past its last range.
+        """
+        if not self.starts.size:
+            return
+        gaps = self.starts[1:] - self.starts[:-1] - self.nbytes
+        breaks = np.flatnonzero((gaps < 0) | (gaps > max_gap)) + 1
+        yield from zip(
+            np.concatenate(([0], breaks)).tolist(),
+            np.concatenate((breaks, [self.starts.size])).tolist(),
+            strict=True,
+        )
+
+    def coalesce(
+        self, max_gap: int = MAX_GAP_NBYTES
+    ) -> Iterator[tuple[int, list[tuple[int, int]]]]:
+        """
+        Groups consecutive ranges separated by small forward gaps into single reads.
+
+        Args:
+            max_gap: Largest gap in bytes between ranges read at once.
+
+        Yields:
+            The position where each read starts in the file, and its segments as
+            pairs of position in the output buffer and size in bytes. Gaps have a
+            negative position, since their bytes are discarded.
+        """
+        gaps = self.starts[1:] - self.starts[:-1] - self.nbytes
+        for first, last in self.groups(max_gap):
+            segments = []
+            run_first = first
+            for run in range(first, last):
+                if run + 1 < last and gaps[run] == 0:
+                    continue  # adjacent ranges are merged into one segment
+                segments.append(
+                    (run_first * self.nbytes, (run + 1 - run_first) * self.nbytes)
+                )
+                if run + 1 < last:
+                    segments.append((-1, int(gaps[run])))
+                run_first = run + 1
+            yield int(self.starts[first]), segments
@@ -0,0 +1,93 @@
+"""
+Chooses dask chunks that follow the layout of the data in binary files.
+
+The chunks span whole trailing dimensions first, since they are contiguous on disk,
+and split a single leading dimension so each chunk holds about a target number of
+bytes, aligned to the page and filesystem block sizes when possible. Each dask
+task then becomes a single large sequential read.
+"""
+
+import math
+import mmap
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from xarray_binfile.read.file_metadata import ReadSpecs
+
+DEFAULT_CHUNK_NBYTES = 128 << 20
+"""Target size in bytes of each chunk, the same as dask's default."""
+
+
+@lru_cache(maxsize=128)
+def get_alignment(directory: str | os.PathLike[str]) -> int:
+    """
+    Gets the size in bytes that chunk boundaries should be aligned to.
+
+    Args:
+        directory: Directory holding the binary files, queried once per process.
+
+    Returns:
+        The least common multiple of the page size and the filesystem block size.
+    """
+    try:
+        block_size = os.statvfs(directory).f_bsize
+    except (AttributeError, OSError):  # no cov
+        block_size = 1
+    return math.lcm(mmap.PAGESIZE, block_size or 1)
+
+
+def get_preferred_chunks(
+    metadata: ReadSpecs,
+    target_nbytes: int = DEFAULT_CHUNK_NBYTES,
+    alignment: int = 1,
+) -> dict[str, int]:
+    """
+    Gets chunk sizes that make each chunk a large sequential read.
+
+    Args:
+        metadata: Metadata describing the binary file.
+        target_nbytes: Largest size in bytes of each chunk, unless a single
+            contiguous run of the trailing dimensions is larger. Defaults to
+            `DEFAULT_CHUNK_NBYTES`.
+        alignment: Size in bytes that the size of the chunks along the split
+            dimension should be a multiple of, when possible. Defaults to 1.
+
+    Returns:
+        The chunk size along each dimension.
+
+    Examples:
+        >>> from pathlib import Path
+        >>> specs = ReadSpecs(
+        ...     filepath=Path("ux.bin"),
+        ...     dtype="<f8",
+        ...     coords={"x": range(100), "y": range(64), "z": range(64)},
+        ...     name="ux",
+        ... )
+        >>> get_preferred_chunks(specs, target_nbytes=1 << 20, alignment=4096)
+        {'x': 32, 'y': 64, 'z': 64}
+    """
+    chunks = dict(zip(metadata.dims, metadata.shape, strict=True))
+    nbytes = metadata.output_dtype.itemsize
+    disk_nbytes = np.dtype(metadata.dtype).itemsize
+    storage_axes = [metadata.dims.index(dim) for dim in metadata.storage_order]
+    for position in reversed(range(len(storage_axes))):
+        axis = storage_axes[position]
+        dim, size = metadata.dims[axis], metadata.shape[axis]
+        contiguous = metadata.strides[axis] == disk_nbytes
+        if nbytes * size <= target_nbytes and contiguous:
+            nbytes *= size
+            disk_nbytes *= size
+            continue
+        count = max(1, target_nbytes // nbytes)
+        if contiguous:
+            # a multiple of this count keeps the size of each chunk on disk aligned
+            step = alignment // math.gcd(alignment, disk_nbytes)
+            if count >= step:
+                count -= count % step
+        chunks[dim] = min(size, count)
+        for leading_axis in storage_axes[:position]:
+            chunks[metadata.dims[leading_axis]] = 1
+        break
+    return chunks
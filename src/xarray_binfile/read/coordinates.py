@@ -0,0 +1,203 @@
+"""
+Describes regular coordinates compactly and converts coordinates to Xarray.
+
+A :class:`RegularCoord` holds only the start, step and size of an evenly spaced
+coordinate, so read specifications along huge regular grids stay small when they
+are pickled and sent to workers. Floating point values are generated lazily by
+Xarray, with a ``RangeIndex`` when it is available.
+"""
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, replace
+from itertools import pairwise
+from typing import Any
+
+import numpy as np
+import xarray as xr
+
+try:
+    from xarray.indexes import RangeIndex
+except ImportError:  # pragma: no cover
+    RangeIndex = None  # type: ignore[assignment,misc]
+
+
+@dataclass(frozen=True)
+class RegularCoord:
+    """
+    Evenly spaced coordinate values, described by their start, step and size.
+
+    It can be given instead of an array in the coordinates of
+    :class:`~xarray_binfile.read.file_metadata.ReadSpecs`.
+
+    Attributes:
+        start: First value.
+        step: Difference between consecutive values.
+        size: Number of values.
+        dtype: Data type of the values. Defaults to None, meaning the type of
+            ``start + step``.
+
+    Examples:
+        >>> coord = RegularCoord(0.0, 0.5, 4)
+        >>> len(coord), coord[-1], np.asarray(coord[1:3])
+        (4, np.float64(1.5), array([0.5, 1. ]))
+    """
+
+    start: float
+    step: float
+    size: int
+    dtype: Any = None
+
+    def __post_init__(self):
+        """
+        Validates the coordinate.
+
+        Raises:
+            ValueError: If the size is negative or the step is zero.
+        """
+        if self.size < 0 or self.step == 0:
+            error_message = (
+                f"Invalid regular coordinate with step {self.step} and size {self.size}"
+            )
+            raise ValueError(error_message)
+
+    @property
+    def values_dtype(self) -> np.dtype:
+        """
+        Gets the data type of the values.
+
+        Returns:
+            The given data type, or the type of ``start + step``.
+        """
+        if self.dtype is not None:
+            return np.dtype(self.dtype)
+        return np.result_type(self.start, self.step)
+
+    def __len__(self) -> int:
+        """
+        Gets the number of values.
+
+        Returns:
+            Size of the coordinate.
+        """
+        return self.size
+
+    def __getitem__(self, key: int | slice) -> Any:
+        """
+        Gets a value, or a regular coordinate with a slice of the values.
+
+        Args:
+            key: Position or slice of the values.
+
+        Returns:
+            The value at `key`, or the values within `key`, still described
+            compactly.
+        """
+        positions = range(self.size)[key]
+        if isinstance(positions, int):
+            return self.values_dtype.type(self.start + self.step * positions)
+        return replace(
+            self,
+            start=self.start + self.step * positions.start,
+            step=self.step * positions.step,
+            size=len(positions),
+        )
+
+    def __array__(self, dtype: Any = None, copy: bool | None = None) -> np.ndarray:
+        """
+        Materializes the values.
+
+        Args:
+            dtype: Data type of the array. Defaults to None, meaning the data type
+                of the values.
+            copy: Ignored, a new array is always created.
+
+        Returns:
+            The values of the coordinate.
+        """
+        values = self.start + self.step * np.arange(self.size)
+        return values.astype(self.values_dtype if dtype is None else dtype)
+
+    def follows(self, other: "RegularCoord") -> bool:
+        """
+        Checks if the values continue another regular coordinate, with the same step.
+
+        Args:
+            other: The preceding coordinate.
+
+        Returns:
+            Whether the concatenation of `other` and this one is regular.
+        """
+        return (
+            self.step == other.step
+            and self.values_dtype == other.values_dtype
+            and bool(np.isclose(self.start, other.start + other.step * other.size))
+        )
+
+
+def coords_equal(first: Any, second: Any) -> bool:
+    """
+    Compares coordinate values, without materializing regular coordinates.
+
+    Args:
+        first: Coordinate values.
+        second: Coordinate values.
+
+    Returns:
+        Whether both coordinates have the same values.
+    """
+    if first is second:
+        return True
+    if isinstance(first, RegularCoord) and isinstance(second, RegularCoord):
+        return first == second
+    return np.array_equal(first, second)
+
+
+def concatenate_coords(coords: Iterable[Any]) -> Any:
+    """
+    Concatenates coordinate values, keeping them compact if they stay regular.
+
+    Args:
+        coords: Coordinate values, in order.
+
+    Returns:
+        A regular coordinate if all of them are regular and continue each other,
+        otherwise an array.
+    """
+    coords = list(coords)
+    if all(isinstance(coord, RegularCoord) for coord in coords) and all(
+        current.follows(previous) for previous, current in pairwise(coords)
+    ):
+        return replace(coords[0], size=sum(coord.size for coord in coords))
+    return np.concatenate([np.asarray(coord) for coord in coords])
+
+
+def get_coordinates(coords: Mapping[str, Any]) -> xr.Coordinates:
+    """
+    Converts coordinate values to Xarray coordinates, each one along its dimension.
+
+    Regular floating point coordinates are indexed by a ``RangeIndex``, that
+    generates their values lazily. Other coordinates are materialized.
+
+    Args:
+        coords: Values of each coordinate.
+
+    Returns:
+        The Xarray coordinates, in the same order.
+    """
+    result = xr.Coordinates()
+    for name, values in coords.items():
+        if not isinstance(values, RegularCoord):
+            result = result.assign({name: values})
+        elif RangeIndex is None or values.values_dtype.kind != "f":
+            result = result.assign({name: np.asarray(values)})
+        else:
+            index = RangeIndex.linspace(
+                values.start,
+                values.start + values.step * values.size,
+                num=values.size,
+                endpoint=False,
+                dim=name,
+                dtype=values.values_dtype,
+            )
+            result = result.assign(xr.Coordinates.from_xindex(index))
+    return result
@@ -7,15 +7,25 @@ References:
 """
 
 import os
-from collections.abc import Iterable
+from collections.abc import Iterable, Mapping
+from dataclasses import replace
 from pathlib import Path
 from typing import Any
 
 from xarray import Dataset
 from xarray.backends import BackendEntrypoint
 
-from xarray_binfile.read.array import BinaryEngineBackendArray
-from xarray_binfile.read.file_metadata import ReadSpecsGetterProtocol
+from xarray_binfile.read.array import get_backend_arrays, get_xarray_dataset
+from xarray_binfile.read.buffers import BufferPool
+from xarray_binfile.read.chunks import DEFAULT_CHUNK_NBYTES
+from xarray_binfile.read.file_metadata import (
+    ReadSpecs,
+    ReadSpecsGetterProtocol,
+    VariableNamesGetterProtocol,
+)
+from xarray_binfile.read.index import load_index
+from xarray_binfile.read.overviews import select_overviews
+from xarray_binfile.read.selection import VariableSelection
 
 
 class RawBinaryEntrypoint(BackendEntrypoint):
@@ -28,7 +38,17 @@ class RawBinaryEntrypoint(BackendEntrypoint):
         url: URL to the backend documentation.
     """
 
-    open_dataset_parameters = ("filename_or_obj", "drop_variables, read_specs_getter")
+    open_dataset_parameters = (
+        "filename_or_obj",
+        "drop_variables",
+        "read_specs_getter",
+        "read_specs_index",
+        "chunk_nbytes",
+        "variables",
+        "variable_names_getter",
+        "buffer_pool",
+        "resolution",
+    )
     description = "Read and write raw binary files using the familiar interface from the Xarray library."
     url = "https://docs.fschuch.com/xarray-binfile/"
 
@@ -36,39 +56,85 @@ class RawBinaryEntrypoint(BackendEntrypoint):
         self,
         filename_or_obj: str | os.PathLike[Any],
         *,
-        read_specs_getter: ReadSpecsGetterProtocol,
+        read_specs_getter: ReadSpecsGetterProtocol | None = None,
+        read_specs_index: str | os.PathLike[Any] | None = None,
         drop_variables: str | Iterable[str] | None = None,
+        chunk_nbytes: int = DEFAULT_CHUNK_NBYTES,
+        variables: str | Iterable[str] | None = None,
+        variable_names_getter: VariableNamesGetterProtocol | None = None,
+        buffer_pool: BufferPool | None = None,
+        resolution: Mapping[str, int] | None = None,
     ) -> Dataset:
         """
         Open a dataset from a binary file.
 
         Args:
             filename_or_obj: Path to the binary file or a file-like object.
-            read_specs_getter: A callable that generates read specifications for the binary file.
+            read_specs_getter: A callable that generates read specifications for the binary file,
+                or for each variable packed into it. Used for the files missing from
+                `read_specs_index` or changed since they were indexed.
+            read_specs_index: Path to a
+                :class:`~xarray_binfile.read.index.ReadSpecsIndex` file with the read
+                specifications of the binary file. It is read once per process and
+                reused by every file opened with it. Defaults to None.
             drop_variables: Variables to drop from the dataset. Defaults to None.
+            chunk_nbytes: Target size in bytes of the preferred chunks, that span
+                the trailing dimensions contiguous on disk. Defaults to 128 MiB.
+            variables: Variables to keep in the dataset. Defaults to None, meaning
+                all but `drop_variables`.
+            variable_names_getter: A callable that gets the names of the variables in
+                the binary file from its path alone. If none of them is selected, an
+                empty dataset is returned without computing the read
+                specifications. Defaults to None.
+            buffer_pool: Pool lending the arrays that data is read into, like the
+                chunks loaded by dask, that the caller releases once done with them.
+                Defaults to None, meaning a new array is allocated for each read.
+            resolution: Smallest number of values needed along some dimensions,
+                like the pixels of a plot. The coarsest overview level of the binary
+                file with at least as many values is opened instead, if it has
+                overviews. Defaults to None, meaning the full resolution.
 
         Returns:
             The opened Xarray dataset.
 
         Raises:
+            ValueError: If neither `read_specs_getter` nor `read_specs_index` is given.
             ValueError: If `filename_or_obj` is not a valid file path.
             ValueError: If there is an error reading the metadata from the file path.
         """
+        if read_specs_index is not None:
+            read_specs_getter = replace(
+                load_index(read_specs_index), read_specs_getter=read_specs_getter
+            )
+        if read_specs_getter is None:
+            error_message = "Expected either read_specs_getter or read_specs_index"
+            raise ValueError(error_message)
         try:
             file_path = Path(filename_or_obj)
         except TypeError as err:
             error_message = f"Expected a file path or file-like object, but got: {filename_or_obj!r}"
             raise ValueError(error_message) from err
+        selection = VariableSelection.from_names(variables, drop_variables)
+        if variable_names_getter is not None and not selection.includes_any(
+            variable_names_getter(path=file_path)
+        ):
+            return Dataset()
         try:
             file_metadata = read_specs_getter(path=file_path)
         except Exception as err:
             error_message = f"Error reading metadata from {file_path}: {err}"
             raise ValueError(error_message) from err
-        if (
-            isinstance(drop_variables, str) and file_metadata.name == drop_variables
-        ) or (
-            isinstance(drop_variables, Iterable)
-            and file_metadata.name in drop_variables
-        ):
+        if isinstance(file_metadata, ReadSpecs):
+            file_metadata = (file_metadata,)
+
+        arrays = get_backend_arrays(
+            (
+                metadata
+                for metadata in select_overviews(file_metadata, resolution)
+                if metadata.name in selection
+            ),
+            buffer_pool,
+        )
+        if not arrays:
             return Dataset()
-        return BinaryEngineBackendArray(metadata=file_metadata).get_xarray_dataset()
+        return get_xarray_dataset(arrays, chunk_nbytes)
@@ -0,0 +1,78 @@
+"""
+Runs the blocking reads of binary files for asynchronous loading.
+
+The reads awaited by ``Dataset.load_async`` run in a process-wide thread pool with
+a bounded number of workers, so an event loop keeps many reads in flight while the
+number of threads, and of concurrent system calls, stays fixed.
+"""
+
+import asyncio
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_MAX_READ_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+"""Number of threads reading binary files at once, as in ThreadPoolExecutor."""
+
+_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+_max_workers = DEFAULT_MAX_READ_WORKERS
+
+
+def get_read_executor() -> ThreadPoolExecutor:
+    """
+    Gets the thread pool running the asynchronous reads, creating it if needed.
+
+    Returns:
+        The process-wide thread pool.
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                _max_workers, thread_name_prefix="xarray-binfile-read"
+            )
+        return _executor
+
+
+def set_max_read_workers(max_workers: int) -> None:
+    """
+    Sets the number of threads running the asynchronous reads.
+
+    The current pool finishes its pending reads in the background, and a new one
+    is created for the next read.
+
+    Args:
+        max_workers: Number of threads reading binary files at once.
+
+    Raises:
+        ValueError: If `max_workers` is not positive.
+    """
+    global _executor, _max_workers
+    if max_workers < 1:
+        error_message = f"max_workers must be positive, got {max_workers}"
+        raise ValueError(error_message)
+    with _lock:
+        _max_workers = max_workers
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+
+
+async def run_read(func: Callable[..., T], *args) -> T:
+    """
+    Runs a blocking read in the read thread pool, without blocking the event loop.
+
+    Args:
+        func: Callable doing the read.
+        *args: Arguments to `func`.
+
+    Returns:
+        The result of `func`.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_read_executor(), func, *args)
@@ -0,0 +1,242 @@
+"""
+Defines the cached file handles used to read binary files in Xarray.
+
+The handles are managed by Xarray's :class:`~xarray.backends.CachingFileManager`,
+so they live in the process-wide least-recently-used file cache. Its size, and
+therefore the number of open file descriptors, is configured with
+``xarray.set_options(file_cache_maxsize=...)``. Before Python 3.13 each memory map
+holds a duplicate of the descriptor of its file, so every cached file takes two
+descriptors instead of one.
+"""
+
+import contextlib
+import mmap
+import os
+import sys
+import threading
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+import numpy as np
+from xarray.backends import CachingFileManager
+
+from xarray_binfile.compression import CompressedFile
+from xarray_binfile.read.byte_ranges import MAX_GAP_NBYTES, ByteRanges
+from xarray_binfile.typing import DTypeLike
+
+IOV_MAX = os.sysconf("SC_IOV_MAX") if hasattr(os, "sysconf") else 1024
+"""Largest number of buffers in a single vectored read."""
+
+MAX_READ_NBYTES = 1 << 30
+"""Largest number of bytes requested in a single read call."""
+
+
+def _iter_batches(
+    buffers: Sequence[memoryview],
+) -> Iterator[list[memoryview]]:
+    """
+    Splits buffers into batches small enough for a single vectored read.
+
+    Args:
+        buffers: Buffers to fill, in order.
+
+    Yields:
+        Lists of at most `IOV_MAX` buffers, adding up to at most `MAX_READ_NBYTES`.
+    """
+    batch: list[memoryview] = []
+    batch_nbytes = 0
+    for buffer in buffers:
+        for start in range(0, len(buffer), MAX_READ_NBYTES):
+            piece = buffer[start : start + MAX_READ_NBYTES]
+            if len(batch) == IOV_MAX or batch_nbytes + len(piece) > MAX_READ_NBYTES:
+                yield batch
+                batch, batch_nbytes = [], 0
+            batch.append(piece)
+            batch_nbytes += len(piece)
+    if batch:
+        yield batch
+
+
+class MappedFile:
+    """
+    Read-only memory map of a binary file, and its open file descriptor.
+
+    The descriptor is kept open for the vectored reads and to check the size of the
+    file when it is refreshed. Before Python 3.13 the memory map holds a duplicate
+    of it, so each mapped file takes two file descriptors.
+
+    Attributes:
+        filepath: Path to the binary file.
+        size: Size of the binary file in bytes.
+    """
+
+    def __init__(self, filepath: str | os.PathLike[str], mode: str = "rb"):
+        """
+        Maps the binary file into memory.
+
+        Args:
+            filepath: Path to the binary file.
+            mode: Mode used to open the file. Only reading is supported.
+        """
+        self.filepath = Path(filepath)
+        self._file = open(self.filepath, mode)  # noqa: SIM115
+        self.size = os.fstat(self._file.fileno()).st_size
+        self._memory_map = self._map()
+        self._lock = threading.Lock()
+
+    def _map(self) -> mmap.mmap | bytes:
+        """
+        Maps the whole binary file into memory.
+
+        Returns:
+            The memory map, or an empty buffer if the file is empty, which cannot
+            be mapped.
+        """
+        if not self.size:
+            return b""
+        if sys.version_info >= (3, 13):
+            # the descriptor of the file is kept open anyway, for os.preadv
+            return mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ, trackfd=False
+            )
+        return mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def refresh(self) -> None:
+        """
+        Maps the binary file again if it grew since it was mapped, like by appends.
+
+        Views of the previous memory map remain valid.
+        """
+        with self._lock:
+            size = os.fstat(self._file.fileno()).st_size
+            if size > self.size:
+                self.size = size
+                self._memory_map = self._map()
+
+    def view(
+        self,
+        dtype: DTypeLike,
+        shape: tuple[int, ...],
+        offset: int = 0,
+        strides: tuple[int, ...] | None = None,
+    ) -> np.typing.NDArray:
+        """
+        Gets a zero-copy view of the binary file as a NumPy array.
+
+        Args:
+            dtype: Data type of the array.
+            shape: Shape of the array.
+            offset: Position in bytes where the array starts in the file.
+            strides: Strides in bytes of the array. Defaults to None, meaning C order.
+
+        Returns:
+            An array backed by the memory map, or a new one if it is empty.
+        """
+        if 0 in shape:
+            return np.empty(shape, dtype=dtype)
+        return np.ndarray(
+            shape,
+            dtype=dtype,
+            buffer=self._memory_map,
+            offset=offset,
+            strides=strides,
+        )
+
+    def read_ranges(
+        self,
+        out: np.typing.NDArray,
+        ranges: ByteRanges,
+        max_gap: int = MAX_GAP_NBYTES,
+    ) -> None:
+        """
+        Reads byte ranges of the file into consecutive positions of an array.
+
+        Nearby ranges are coalesced and read with a single vectored read, whose
+        gaps are discarded into a scratch buffer, only allocated if there are gaps.
+
+        Args:
+            out: C-contiguous array receiving the ranges, in order.
+            ranges: Byte ranges to read.
+            max_gap: Largest gap in bytes between ranges read at once.
+        """
+        buffer = out.reshape(-1).view(np.uint8).data
+        scratch = memoryview(b"")
+        for position, segments in ranges.coalesce(max_gap):
+            if not len(scratch) and len(segments) > 1:
+                scratch = np.empty(max_gap, dtype=np.uint8).data
+            self.readv(
+                position,
+                [
+                    buffer[start : start + nbytes] if start >= 0 else scratch[:nbytes]
+                    for start, nbytes in segments
+                ],
+            )
+
+    def readv(self, position: int, buffers: Sequence[memoryview]) -> None:
+        """
+        Reads consecutive bytes of the file into a sequence of buffers.
+
+        It uses ``os.preadv`` where available, which is safe to call from several
+        threads at once, and copies from the memory map elsewhere.
+
+        Args:
+            position: Position in bytes where the read starts.
+            buffers: Buffers to fill, in order.
+
+        Raises:
+            EOFError: If the file ends before all buffers are filled.
+        """
+        for batch in _iter_batches(buffers):
+            nbytes = sum(len(buffer) for buffer in batch)
+            if hasattr(os, "preadv"):
+                nread = os.preadv(self._file.fileno(), batch, position)
+            else:  # no cov
+                nread = 0
+                for buffer in batch:
+                    chunk = self._memory_map[
+                        position + nread : position + nread + len(buffer)
+                    ]
+                    buffer[: len(chunk)] = chunk
+                    nread += len(chunk)
+            if nread < nbytes:
+                error_message = (
+                    f"Expected {nbytes} bytes at position {position} of "
+                    f"{self.filepath}, but the file has {self.size} bytes"
+                )
+                raise EOFError(error_message)
+            position += nbytes
+
+    def close(self) -> None:
+        """
+        Closes the memory map and the file.
+
+        If other threads are still reading from views of the memory map, it is
+        released by the garbage collector once those views are gone.
+        """
+        if isinstance(self._memory_map, mmap.mmap):
+            with contextlib.suppress(BufferError):
+                self._memory_map.close()
+        self._file.close()
+
+
+def get_file_manager(
+    filepath: str | os.PathLike[str], compression: str | None = None
+) -> CachingFileManager:
+    """
+    Gets a manager for the cached memory map of a binary file.
+
+    The manager is safe to pickle, and the file is mapped again when the manager
+    is used in another process, such as a dask worker.
+
+    Args:
+        filepath: Path to the binary file.
+        compression: Name of the codec of a block-compressed file. Defaults to None,
+            meaning the file is not compressed.
+
+    Returns:
+        A file manager that opens the file as a :class:`MappedFile`, or as a
+        :class:`~xarray_binfile.compression.CompressedFile` if it is compressed.
+    """
+    if compression is not None:
+        return CachingFileManager(CompressedFile, Path(filepath), mode="rb")
+    return CachingFileManager(MappedFile, Path(filepath), mode="rb")
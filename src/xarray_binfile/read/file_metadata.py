@@ -2,11 +2,15 @@
 Defines metadata structures and protocols for reading binary files.
 """
 
-from dataclasses import dataclass
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass, replace
 from functools import cached_property
 from pathlib import Path
 from typing import Protocol
 
+import numpy as np
+
+from xarray_binfile.read.coordinates import RegularCoord
 from xarray_binfile.typing import AttributesLike, CoordsLike, DTypeLike
 
 
@@ -17,10 +21,73 @@ class ReadSpecs:
 
     Attributes:
         filepath: Path to the binary file.
-        dtype: Data type of the binary file.
-        coords: Coordinates of the data in the binary file.
+        dtype: Data type of the binary file, as stored on disk, like ``">f4"`` for
+            big-endian single precision.
+        coords: Coordinates of the data in the binary file. Evenly spaced values
+            can be described by a
+            :class:`~xarray_binfile.read.coordinates.RegularCoord`, that is never
+            materialized in the read specifications.
         name: Name of the dataset or variable.
         attrs: Additional attributes for the dataset or variable.
+        offset: Size in bytes of the header before the first record. Defaults to 0.
+        record_dim: Dimension whose entries are stored as separate records, each one
+            with the remaining dimensions in C order. Defaults to None, meaning that
+            the whole array is a single record.
+        record_marker_size: Size in bytes of the markers written before and after
+            each record, like the 4 or 8 bytes in Fortran unformatted files.
+            Defaults to 0.
+        record_stride: Distance in bytes between the start of consecutive records.
+            Defaults to None, meaning that records are contiguous, with their markers.
+        compression: Name of the codec of a block-compressed binary file, written
+            with :func:`~xarray_binfile.compression.write_compressed`. The layout
+            above then refers to the decompressed bytes. Defaults to None, meaning
+            the file is not compressed.
+        memory_dtype: Data type of the arrays read from the binary file. The data
+            is byte swapped and cast while it is read. Defaults to None, meaning
+            the same as `dtype`.
+        storage_dims: Dimensions in the order they are stored in each record, from
+            the slowest to the fastest varying, like the reversed dimensions of a
+            Fortran-ordered array. Defaults to None, meaning the order of `coords`.
+
+    Examples:
+        A file written by a Fortran program with ``write(unit) array`` is a single
+        record surrounded by 4-byte markers:
+
+        >>> specs = ReadSpecs(
+        ...     filepath=Path("ux.bin"),
+        ...     dtype="<f8",
+        ...     coords={"x": range(3), "y": range(2)},
+        ...     name="ux",
+        ...     record_marker_size=4,
+        ... )
+        >>> specs.data_offset, specs.strides
+        (4, (16, 8))
+
+        When each time step is written as a separate record, the records are
+        strided along ``time``:
+
+        >>> specs = ReadSpecs(
+        ...     filepath=Path("ux.bin"),
+        ...     dtype="<f8",
+        ...     coords={"x": range(3), "time": range(10)},
+        ...     name="ux",
+        ...     record_dim="time",
+        ...     record_marker_size=4,
+        ... )
+        >>> specs.data_offset, specs.strides
+        (4, (8, 32))
+
+        A Fortran-ordered array keeps its logical dimensions, with reversed strides:
+
+        >>> specs = ReadSpecs(
+        ...     filepath=Path("ux.bin"),
+        ...     dtype="<f8",
+        ...     coords={"x": range(3), "y": range(2)},
+        ...     name="ux",
+        ...     storage_dims=("y", "x"),
+        ... )
+        >>> specs.strides
+        (8, 24)
     """
 
     filepath: Path
@@ -28,6 +95,43 @@ class ReadSpecs:
     coords: CoordsLike
     name: str
     attrs: AttributesLike | None = None
+    offset: int = 0
+    record_dim: str | None = None
+    record_marker_size: int = 0
+    record_stride: int | None = None
+    compression: str | None = None
+    memory_dtype: DTypeLike | None = None
+    storage_dims: tuple[str, ...] | None = None
+
+    def __post_init__(self):
+        """
+        Validates the layout of the records in the binary file.
+
+        Raises:
+            ValueError: If the layout is not consistent with the data.
+        """
+        if self.offset < 0 or self.record_marker_size < 0:
+            error_message = "offset and record_marker_size must be non-negative"
+            raise ValueError(error_message)
+        if self.record_dim is not None and self.record_dim not in self.dims:
+            error_message = f"record_dim {self.record_dim!r} is not one of {self.dims}"
+            raise ValueError(error_message)
+        record_dims = set(self.dims) - {self.record_dim}
+        if self.storage_dims is not None and (
+            len(self.storage_dims) != len(record_dims)
+            or set(self.storage_dims) != record_dims
+        ):
+            error_message = (
+                f"storage_dims {self.storage_dims} is not a permutation of "
+                f"{tuple(dim for dim in self.dims if dim in record_dims)}"
+            )
+            raise ValueError(error_message)
+        if self.record_stride is not None and self.record_stride < self.record_nbytes:
+            error_message = (
+                f"record_stride ({self.record_stride}) is smaller than the size of "
+                f"a record ({self.record_nbytes} bytes)"
+            )
+            raise ValueError(error_message)
 
     @cached_property
     def shape(self) -> tuple[int, ...]:
@@ -49,13 +153,238 @@ class ReadSpecs:
         """
         return tuple(self.coords.keys())
 
+    @cached_property
+    def output_dtype(self) -> np.dtype:
+        """
+        Gets the data type of the arrays read from the binary file.
+
+        Returns:
+            The memory data type if given, otherwise the data type on disk.
+        """
+        return np.dtype(self.dtype if self.memory_dtype is None else self.memory_dtype)
+
+    @cached_property
+    def record_nbytes(self) -> int:
+        """
+        Gets the size in bytes of the data in each record, without its markers.
+
+        Returns:
+            Size of a record in bytes.
+        """
+        return int(
+            np.prod(
+                [
+                    s
+                    for d, s in zip(self.dims, self.shape, strict=True)
+                    if d != self.record_dim
+                ],
+                dtype=np.int64,
+            )
+            * np.dtype(self.dtype).itemsize
+        )
+
+    @cached_property
+    def data_offset(self) -> int:
+        """
+        Gets the position in bytes of the first element in the binary file.
+
+        Returns:
+            Offset of the data in bytes.
+        """
+        return self.offset + self.record_marker_size
+
+    @cached_property
+    def storage_order(self) -> tuple[str, ...]:
+        """
+        Gets the dimensions in the order they are stored in the binary file.
+
+        Returns:
+            Dimension names from the slowest to the fastest varying, starting with
+            the record dimension, if any.
+        """
+        record_dims = (self.record_dim,) if self.record_dim is not None else ()
+        if self.storage_dims is None:
+            return record_dims + tuple(d for d in self.dims if d != self.record_dim)
+        return record_dims + tuple(self.storage_dims)
+
+    @cached_property
+    def strides(self) -> tuple[int, ...]:
+        """
+        Gets the strides in bytes of the data in the binary file.
+
+        Returns:
+            Strides for each dimension, in the same order as the coordinates.
+        """
+        sizes = dict(zip(self.dims, self.shape, strict=True))
+        strides = {}
+        stride = np.dtype(self.dtype).itemsize
+        for dim in reversed(self.storage_order):
+            if dim != self.record_dim:
+                strides[dim] = stride
+                stride *= sizes[dim]
+        if self.record_dim is not None:
+            strides[self.record_dim] = (
+                self.record_stride or self.record_nbytes + 2 * self.record_marker_size
+            )
+        return tuple(strides[dim] for dim in self.dims)
+
+    def count_records(self, file_size: int) -> int:
+        """
+        Counts the complete records in the binary file, given its size.
+
+        Args:
+            file_size: Size of the binary file in bytes.
+
+        Returns:
+            Number of records that fit in the file, ignoring a last partial one.
+
+        Examples:
+            >>> specs = ReadSpecs(
+            ...     filepath=Path("ux.bin"),
+            ...     dtype="<f8",
+            ...     coords={"x": range(3), "time": range(1)},
+            ...     name="ux",
+            ...     record_dim="time",
+            ...     record_marker_size=4,
+            ... )
+            >>> specs.count_records(3 * 32), specs.count_records(3 * 32 + 16)
+            (3, 3)
+        """
+        if self.record_dim is None:
+            return 1
+        record_total = self.record_nbytes + 2 * self.record_marker_size
+        available = file_size - self.offset
+        if available < record_total:
+            return 0
+        stride = self.strides[self.dims.index(self.record_dim)]
+        return (available - record_total) // stride + 1
+
+    def with_records(self, n_records: int) -> "ReadSpecs":
+        """
+        Gets the read specifications with another number of records.
+
+        The coordinate along the record dimension is cut, or extended with its
+        constant step, like a ``range``, a
+        :class:`~xarray_binfile.read.coordinates.RegularCoord` or evenly spaced
+        times.
+
+        Args:
+            n_records: Number of records.
+
+        Returns:
+            Metadata for reading the binary file with `n_records` records.
+
+        Raises:
+            ValueError: If there is no record dimension, or if its coordinate must
+                be extended without a constant step.
+        """
+        if self.record_dim is None:
+            error_message = f"{self.name!r} has no record dimension"
+            raise ValueError(error_message)
+        coord = self.coords[self.record_dim]
+        if isinstance(coord, range):
+            coord = range(coord.start, coord.start + n_records * coord.step, coord.step)
+        elif isinstance(coord, RegularCoord):
+            coord = replace(coord, size=n_records)
+        elif n_records <= np.size(coord):
+            coord = np.asarray(coord)[:n_records]
+        else:
+            values = np.asarray(coord)
+            steps = np.diff(values)
+            if not steps.size or np.any(steps != steps[0]):
+                error_message = (
+                    f"Cannot extend the coordinate {self.record_dim!r} of "
+                    f"{self.name!r}, which has no constant step; describe it with a "
+                    f"range or a RegularCoord to let it grow from fewer than 2 values"
+                )
+                raise ValueError(error_message)
+            coord = values[0] + steps[0] * np.arange(n_records)
+        return replace(self, coords={**self.coords, self.record_dim: coord})
+
+
+@dataclass(frozen=True)
+class PackedReadSpecs:
+    """
+    Metadata for reading several variables and records packed into one binary file.
+
+    The file starts with a header of ``offset`` bytes, followed by one group of
+    records for each entry along ``record_dim``. Each group holds one record per
+    variable, in the order they are given, with the remaining dimensions in C order.
+
+    Attributes:
+        filepath: Path to the binary file.
+        variables: Data type of each variable, in the order they are stored.
+        coords: Coordinates of the data in the binary file, including ``record_dim``.
+        record_dim: Dimension whose entries are stored as separate groups of records.
+            Defaults to "time".
+        attrs: Additional attributes for the dataset. Defaults to None.
+        offset: Size in bytes of the header before the first record. Defaults to 0.
+        record_marker_size: Size in bytes of the markers written before and after
+            each record. Defaults to 0.
+
+    Examples:
+        >>> specs = PackedReadSpecs(
+        ...     filepath=Path("fields.bin"),
+        ...     variables={"ux": "<f8", "uy": "<f4"},
+        ...     coords={"x": range(3), "time": range(10)},
+        ...     record_marker_size=4,
+        ... )
+        >>> [(s.name, s.offset, s.record_stride) for s in specs]
+        [('ux', 0, 52), ('uy', 32, 52)]
+    """
+
+    filepath: Path
+    variables: Mapping[str, DTypeLike]
+    coords: CoordsLike
+    record_dim: str = "time"
+    attrs: AttributesLike | None = None
+    offset: int = 0
+    record_marker_size: int = 0
+
+    @cached_property
+    def read_specs(self) -> tuple[ReadSpecs, ...]:
+        """
+        Gets the read specifications for each variable in the binary file.
+
+        Returns:
+            Metadata for reading each variable.
+        """
+        variables_specs = []
+        offset = self.offset
+        for name, dtype in self.variables.items():
+            specs = ReadSpecs(
+                filepath=self.filepath,
+                dtype=dtype,
+                coords=self.coords,
+                name=name,
+                attrs=self.attrs,
+                offset=offset,
+                record_dim=self.record_dim,
+                record_marker_size=self.record_marker_size,
+            )
+            offset += specs.record_nbytes + 2 * self.record_marker_size
+            variables_specs.append(specs)
+        record_stride = offset - self.offset
+        return tuple(
+            replace(specs, record_stride=record_stride) for specs in variables_specs
+        )
+
+    def __iter__(self) -> Iterator[ReadSpecs]:
+        """
+        Iterates over the read specifications for each variable.
+
+        Returns:
+            An iterator over the metadata for reading each variable.
+        """
+        return iter(self.read_specs)
+
 
 class ReadSpecsGetterProtocol(Protocol):
     """
     Protocol for generating read specifications for a binary file.
     """
 
-    def __call__(self, path: Path) -> ReadSpecs:
+    def __call__(self, path: Path) -> ReadSpecs | Iterable[ReadSpecs]:
         """
         Generates read specifications for a binary file.
 
@@ -63,6 +392,29 @@ class ReadSpecsGetterProtocol(Protocol):
             path: Path to the binary file.
 
         Returns:
-            Metadata for reading the binary file.
+            Metadata for reading the binary file, or for each variable in it, as
+            in :class:`PackedReadSpecs`.
+        """
+        ...
+
+
+class VariableNamesGetterProtocol(Protocol):
+    """
+    Protocol for getting the names of the variables in a binary file cheaply.
+
+    Unlike :class:`ReadSpecsGetterProtocol`, it only looks at the path, like
+    parsing the filename, so files can be selected before any metadata is built.
+    """
+
+    def __call__(self, path: Path) -> str | Iterable[str]:
+        """
+        Gets the names of the variables in a binary file.
+
+        Args:
+            path: Path to the binary file.
+
+        Returns:
+            The name of the variable in the binary file, or of each variable packed
+            into it.
         """
         ...
@@ -0,0 +1,357 @@
+"""
+Persists the read specifications of many binary files into a single sidecar index.
+
+Computing the read specifications of each file, like parsing its name or resolving
+its path, is repeated every time a directory is opened. The index stores them once,
+along with the modification time and size of each file, so opening the files again
+costs a single read of the index plus a ``stat`` call per file, to revalidate it.
+
+The index is a NumPy ``.npz`` archive, with a JSON header holding the
+specifications and one array per distinct coordinate, shared by all files where it
+appears. Regular coordinates are kept in the header by their start, step and size.
+"""
+
+import json
+import os
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+
+from xarray_binfile.read.coordinates import RegularCoord
+from xarray_binfile.read.file_metadata import ReadSpecs, ReadSpecsGetterProtocol
+
+INDEX_VERSION = 1
+
+
+class IndexEntry(NamedTuple):
+    """
+    Read specifications of a binary file, as of the last time it was indexed.
+
+    Attributes:
+        mtime_ns: Modification time of the file, in nanoseconds.
+        size: Size of the file in bytes.
+        read_specs: Metadata for reading the file, or each variable in it.
+    """
+
+    mtime_ns: int
+    size: int
+    read_specs: tuple[ReadSpecs, ...]
+
+
+def _index_key(path: str | os.PathLike[str]) -> str:
+    """
+    Gets the key of a binary file in the index.
+
+    Args:
+        path: Path to the binary file.
+
+    Returns:
+        The absolute path, normalized without resolving symbolic links.
+    """
+    return os.path.abspath(path)
+
+
+@dataclass(frozen=True)
+class ReadSpecsIndex:
+    """
+    Read specifications of many binary files, indexed by their absolute paths.
+
+    The index is itself a read specifications getter, so it is passed wherever
+    `read_specs_getter` is expected. A file whose modification time or size changed
+    since it was indexed is stale, and its specifications are computed again with
+    `read_specs_getter`, if any.
+
+    Attributes:
+        entries: Indexed specifications of each binary file.
+        read_specs_getter: Getter used for stale or missing files. Defaults to None,
+            meaning they raise an error.
+
+    """
+
+    entries: Mapping[str, IndexEntry]
+    read_specs_getter: ReadSpecsGetterProtocol | None = None
+
+    @classmethod
+    def build(
+        cls,
+        paths: Iterable[str | os.PathLike[str]],
+        read_specs_getter: ReadSpecsGetterProtocol,
+    ) -> "ReadSpecsIndex":
+        """
+        Computes the read specifications of binary files.
+
+        Args:
+            paths: Paths to the binary files.
+            read_specs_getter: A callable that generates read specifications for
+                each binary file, or for each variable packed into it.
+
+        Returns:
+            The index of the binary files.
+        """
+        index = cls({}, read_specs_getter)
+        return replace(
+            index, entries={_index_key(path): index._compute(path) for path in paths}
+        )
+
+    @property
+    def paths(self) -> list[Path]:
+        """
+        Gets the paths of the indexed binary files.
+
+        Returns:
+            Paths to the binary files, in the order they were indexed.
+        """
+        return [Path(key) for key in self.entries]
+
+    def _compute(self, path: str | os.PathLike[str]) -> IndexEntry:
+        """
+        Computes the index entry of a binary file with the read specifications getter.
+
+        Args:
+            path: Path to the binary file.
+
+        Returns:
+            The index entry of the binary file.
+
+        Raises:
+            ValueError: If there is no read specifications getter.
+        """
+        if self.read_specs_getter is None:
+            error_message = f"{path} is missing from the index or has changed"
+            raise ValueError(error_message)
+        stat = os.stat(path)
+        read_specs = self.read_specs_getter(path=Path(path))
+        if isinstance(read_specs, ReadSpecs):
+            read_specs = (read_specs,)
+        return IndexEntry(stat.st_mtime_ns, stat.st_size, tuple(read_specs))
+
+    def __call__(self, path: Path) -> tuple[ReadSpecs, ...]:
+        """
+        Gets the read specifications of a binary file, revalidating them first.
+
+        Args:
+            path: Path to the binary file.
+
+        Returns:
+            Metadata for reading the binary file, or each variable in it.
+        """
+        entry = self.entries.get(_index_key(path))
+        if entry is not None:
+            stat = os.stat(path)
+            if (stat.st_mtime_ns, stat.st_size) == (entry.mtime_ns, entry.size):
+                return entry.read_specs
+        return self._compute(path).read_specs
+
+    def refresh(self) -> "ReadSpecsIndex":
+        """
+        Computes again the read specifications of the stale binary files.
+
+        Returns:
+            The updated index, without the files that no longer exist.
+        """
+        entries = {}
+        for key, entry in self.entries.items():
+            try:
+                stat = os.stat(key)
+            except FileNotFoundError:
+                continue
+            if (stat.st_mtime_ns, stat.st_size) == (entry.mtime_ns, entry.size):
+                entries[key] = entry
+            else:
+                entries[key] = self._compute(key)
+        return replace(self, entries=entries)
+
+    def save(self, filepath: str | os.PathLike[str]) -> None:
+        """
+        Writes the index to a file, replacing it atomically.
+
+        The attributes of the read specifications must be serializable to JSON.
+
+        Args:
+            filepath: Path to the index file, usually with the ``.npz`` suffix.
+        """
+        coords: dict[tuple[str, tuple[int, ...], bytes], int] = {}
+
+        def coord_id(values: Any) -> int | dict[str, Any]:
+            if isinstance(values, RegularCoord):
+                return {
+                    "start": np.asarray(values.start).item(),
+                    "step": np.asarray(values.step).item(),
+                    "size": values.size,
+                    "dtype": values.values_dtype.str,
+                }
+            array = np.asarray(values)
+            return coords.setdefault(
+                (array.dtype.str, array.shape, array.tobytes()), len(coords)
+            )
+
+        header = {
+            "version": INDEX_VERSION,
+            "files": [
+                {
+                    "path": key,
+                    "mtime_ns": entry.mtime_ns,
+                    "size": entry.size,
+                    "read_specs": [
+                        {
+                            "filepath": str(specs.filepath),
+                            "dtype": np.lib.format.dtype_to_descr(
+                                np.dtype(specs.dtype)
+                            ),
+                            "coords": {
+                                dim: coord_id(values)
+                                for dim, values in specs.coords.items()
+                            },
+                            "name": specs.name,
+                            "attrs": specs.attrs,
+                            "offset": specs.offset,
+                            "record_dim": specs.record_dim,
+                            "record_marker_size": specs.record_marker_size,
+                            "record_stride": specs.record_stride,
+                            "compression": specs.compression,
+                            "storage_dims": specs.storage_dims,
+                            "memory_dtype": None
+                            if specs.memory_dtype is None
+                            else np.lib.format.dtype_to_descr(
+                                np.dtype(specs.memory_dtype)
+                            ),
+                        }
+                        for specs in entry.read_specs
+                    ],
+                }
+                for key, entry in self.entries.items()
+            ],
+        }
+        arrays = {
+            f"coord_{i}": np.frombuffer(data, dtype=dtype).reshape(shape)
+            for (dtype, shape, data), i in coords.items()
+        }
+        filepath = Path(filepath)
+        temporary_path = filepath.with_name(f".{filepath.name}.tmp")
+        with open(temporary_path, "wb") as file:
+            np.savez(file, header=np.array(json.dumps(header)), **arrays)  # type: ignore[arg-type]
+        os.replace(temporary_path, filepath)
+
+    @classmethod
+    def load(
+        cls,
+        filepath: str | os.PathLike[str],
+        read_specs_getter: ReadSpecsGetterProtocol | None = None,
+    ) -> "ReadSpecsIndex":
+        """
+        Reads an index from a file.
+
+        Args:
+            filepath: Path to the index file.
+            read_specs_getter: Getter used for stale or missing files. Defaults to
+                None, meaning they raise an error.
+
+        Returns:
+            The index of the binary files.
+
+        Raises:
+            ValueError: If the index was written by an incompatible version.
+        """
+        with np.load(filepath, allow_pickle=False) as archive:
+            header = json.loads(str(archive["header"]))
+            if header.get("version") != INDEX_VERSION:
+                error_message = (
+                    f"Unsupported index version {header.get('version')!r} in "
+                    f"{filepath}, expected {INDEX_VERSION}"
+                )
+                raise ValueError(error_message)
+            coords = [archive[f"coord_{i}"] for i in range(len(archive.files) - 1)]
+
+        entries = {}
+        for file in header["files"]:
+            read_specs = tuple(
+                ReadSpecs(
+                    **(
+                        specs
+                        | {
+                            "filepath": Path(specs["filepath"]),
+                            "dtype": np.lib.format.descr_to_dtype(
+                                _as_descr(specs["dtype"])
+                            ),
+                            "coords": {
+                                dim: RegularCoord(**i)
+                                if isinstance(i, dict)
+                                else coords[i]
+                                for dim, i in specs["coords"].items()
+                            },
+                            "storage_dims": None
+                            if specs.get("storage_dims") is None
+                            else tuple(specs["storage_dims"]),
+                            "memory_dtype": None
+                            if specs.get("memory_dtype") is None
+                            else np.lib.format.descr_to_dtype(
+                                _as_descr(specs["memory_dtype"])
+                            ),
+                        }
+                    )
+                )
+                for specs in file["read_specs"]
+            )
+            entries[file["path"]] = IndexEntry(
+                file["mtime_ns"], file["size"], read_specs
+            )
+        return cls(entries, read_specs_getter)
+
+
+def _as_descr(descr: Any) -> Any:
+    """
+    Restores the tuples of a data type description decoded from JSON.
+
+    Args:
+        descr: Data type description, with lists in place of tuples.
+
+    Returns:
+        The data type description.
+    """
+    if not isinstance(descr, list):
+        return descr
+    fields = []
+    for name, field_descr, *shape in descr:
+        fields.append(
+            (
+                tuple(name) if isinstance(name, list) else name,
+                _as_descr(field_descr),
+                *(tuple(s) for s in shape),
+            )
+        )
+    return fields
+
+
+@lru_cache(maxsize=8)
+def _load_cached(filepath: Path, mtime_ns: int, size: int) -> ReadSpecsIndex:
+    """
+    Reads an index from a file, once per version of the file.
+
+    Args:
+        filepath: Path to the index file.
+        mtime_ns: Modification time of the index file, in nanoseconds.
+        size: Size of the index file in bytes.
+
+    Returns:
+        The index of the binary files.
+    """
+    return ReadSpecsIndex.load(filepath)
+
+
+def load_index(filepath: str | os.PathLike[str]) -> ReadSpecsIndex:
+    """
+    Reads an index from a file, reusing the index already read by this process.
+
+    Args:
+        filepath: Path to the index file.
+
+    Returns:
+        The index of the binary files.
+    """
+    filepath = Path(filepath).absolute()
+    stat = os.stat(filepath)
+    return _load_cached(filepath, stat.st_mtime_ns, stat.st_size)
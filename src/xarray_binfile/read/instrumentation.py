@@ -0,0 +1,238 @@
+"""
+Opt-in instrumentation of the reads of binary files.
+
+Every read made by a backend array is reported as a :class:`ReadEvent` to the
+registered hooks, like a callback that forwards it to OpenTelemetry or to a log.
+When no hook is registered, reads only check that the list of hooks is empty.
+
+Examples:
+    >>> with collect_read_stats() as stats:  # doctest: +SKIP
+    ...     ds.load()
+    >>> stats.total.touched_nbytes  # doctest: +SKIP
+"""
+
+import contextlib
+import mmap
+import threading
+from collections import Counter
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from xarray_binfile.read.byte_ranges import MAX_GAP_NBYTES, ByteRanges
+
+READ_HOOKS: list[Callable[["ReadEvent"], None]] = []
+"""Callables receiving each read event, in order."""
+
+
+class ReadEvent(NamedTuple):
+    """
+    Summary of a read from a binary file.
+
+    Attributes:
+        filepath: Path to the binary file.
+        name: Name of the variable read.
+        path: How the data was read: "ranges" for vectored reads, "gather" for
+            elements copied from the memory map, "compressed" for decompressed
+            blocks, with a "+convert" suffix when the data type was converted.
+        requested_nbytes: Size in bytes of the requested data, as stored on disk.
+        touched_nbytes: Size in bytes of the data read from the file, including
+            coalesced gaps, or of the pages touched when gathering.
+        n_ranges: Number of contiguous byte ranges holding the requested data.
+        seconds: Time spent reading, in seconds.
+        pid: Identifier of the process that read the data.
+    """
+
+    filepath: Path
+    name: str
+    path: str
+    requested_nbytes: int
+    touched_nbytes: int
+    n_ranges: int
+    seconds: float
+    pid: int
+
+
+def add_read_hook(hook: Callable[[ReadEvent], None]) -> None:
+    """
+    Registers a callable receiving each read event of the current process.
+
+    Hooks run in the thread that reads, so they should be fast and thread-safe.
+
+    Args:
+        hook: Callable receiving each read event.
+    """
+    READ_HOOKS.append(hook)
+
+
+def remove_read_hook(hook: Callable[[ReadEvent], None]) -> None:
+    """
+    Unregisters a callable receiving read events.
+
+    Args:
+        hook: Callable registered with :func:`add_read_hook`.
+    """
+    READ_HOOKS.remove(hook)
+
+
+def emit_read_event(event: ReadEvent) -> None:
+    """
+    Sends a read event to every registered hook.
+
+    Args:
+        event: The read event.
+    """
+    # a snapshot, as hooks may be removed by other threads, or by themselves
+    for hook in tuple(READ_HOOKS):
+        hook(event)
+
+
+def touched_nbytes(
+    ranges: ByteRanges, max_gap: int = MAX_GAP_NBYTES, *, gather: bool = False
+) -> int:
+    """
+    Estimates the size in bytes touched in the file to read byte ranges.
+
+    Args:
+        ranges: Byte ranges holding the requested data.
+        max_gap: Largest gap in bytes between ranges read at once. Defaults to
+            `MAX_GAP_NBYTES`.
+        gather: Whether the ranges are gathered from a memory map, touching whole
+            pages, instead of read with coalesced reads. Defaults to False.
+
+    Returns:
+        Size in bytes of the coalesced reads, or of the distinct pages touched.
+    """
+    if not ranges.starts.size:
+        return 0
+    if not gather:
+        return sum(
+            int(ranges.starts[last - 1] - ranges.starts[first]) + ranges.nbytes
+            for first, last in ranges.groups(max_gap)
+        )
+    first_pages = ranges.starts // mmap.PAGESIZE
+    last_pages = (ranges.starts + ranges.nbytes - 1) // mmap.PAGESIZE
+    pages = np.concatenate(
+        [
+            first_pages[first_pages + offset <= last_pages] + offset
+            for offset in range(int((last_pages - first_pages).max()) + 1)
+        ]
+    )
+    return np.unique(pages).size * mmap.PAGESIZE
+
+
+@dataclass
+class FileReadStats:
+    """
+    Statistics of the reads from binary files.
+
+    Attributes:
+        calls: Number of reads.
+        requested_nbytes: Size in bytes of the requested data.
+        touched_nbytes: Size in bytes of the data read from the files.
+        seconds: Total time spent reading, in seconds.
+        paths: Number of reads by how the data was read.
+        latency_histogram: Number of reads by latency, binned by the power of two
+            of microseconds that bounds it from above.
+    """
+
+    calls: int = 0
+    requested_nbytes: int = 0
+    touched_nbytes: int = 0
+    seconds: float = 0.0
+    paths: Counter[str] = field(default_factory=Counter)
+    latency_histogram: Counter[int] = field(default_factory=Counter)
+
+    def add(self, event: ReadEvent) -> None:
+        """
+        Adds a read to the statistics.
+
+        Args:
+            event: The read event.
+        """
+        self.calls += 1
+        self.requested_nbytes += event.requested_nbytes
+        self.touched_nbytes += event.touched_nbytes
+        self.seconds += event.seconds
+        self.paths[event.path] += 1
+        microseconds = max(1, int(event.seconds * 1e6))
+        self.latency_histogram[1 << (microseconds - 1).bit_length()] += 1
+
+    def merge(self, other: "FileReadStats") -> None:
+        """
+        Adds the reads of other statistics to these ones.
+
+        Args:
+            other: The statistics to add.
+        """
+        self.calls += other.calls
+        self.requested_nbytes += other.requested_nbytes
+        self.touched_nbytes += other.touched_nbytes
+        self.seconds += other.seconds
+        self.paths.update(other.paths)
+        self.latency_histogram.update(other.latency_histogram)
+
+
+class ReadStatsCollector:
+    """
+    Hook aggregating the read events by process and file.
+
+    Attributes:
+        files: Statistics of the reads of each process and file.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty collector.
+        """
+        self.files: dict[tuple[int, Path], FileReadStats] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: ReadEvent) -> None:
+        """
+        Adds a read event to the statistics of its process and file.
+
+        Args:
+            event: The read event.
+        """
+        with self._lock:
+            key = (event.pid, event.filepath)
+            if key not in self.files:
+                self.files[key] = FileReadStats()
+            self.files[key].add(event)
+
+    @property
+    def total(self) -> FileReadStats:
+        """
+        Gets the statistics of all reads.
+
+        Returns:
+            The statistics merged over processes and files.
+        """
+        total = FileReadStats()
+        with self._lock:
+            for stats in self.files.values():
+                total.merge(stats)
+        return total
+
+
+@contextlib.contextmanager
+def collect_read_stats() -> Iterator[ReadStatsCollector]:
+    """
+    Collects the statistics of the reads made in this process within the context.
+
+    Reads made by other processes, like those of a distributed dask cluster, are
+    only collected by hooks registered in those processes.
+
+    Yields:
+        The collector, filled as the reads happen.
+    """
+    collector = ReadStatsCollector()
+    add_read_hook(collector)
+    try:
+        yield collector
+    finally:
+        remove_read_hook(collector)
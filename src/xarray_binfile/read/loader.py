@@ -0,0 +1,402 @@
+"""
+Loads a series of binary files with a pool of processes, into shared memory.
+
+Post-read steps that hold the GIL, like derived fields computed in Python, do not
+scale with the threads of dask. Here each file is read and transformed by a worker
+process, that writes the result straight into its place in a single
+``multiprocessing.shared_memory`` block. Only the read specifications travel
+between processes, never the data, and the loaded dataset is a set of NumPy views
+of the block.
+"""
+
+import multiprocessing.context
+import os
+import weakref
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import shared_memory
+from typing import Any, NamedTuple
+
+import numpy as np
+import xarray as xr
+
+from xarray_binfile.read.array import get_backend_arrays
+from xarray_binfile.read.buffers import BufferPool
+from xarray_binfile.read.coordinates import coords_equal, get_coordinates
+from xarray_binfile.read.file_metadata import (
+    ReadSpecs,
+    ReadSpecsGetterProtocol,
+    VariableNamesGetterProtocol,
+)
+from xarray_binfile.read.series import _collect_read_specs
+
+Transform = Callable[[xr.Dataset], xr.Dataset]
+
+SHARED_ALIGNMENT = 64
+"""Alignment in bytes of each variable in the shared memory block."""
+
+_BUFFER_POOL = BufferPool()
+"""Pool lending the arrays read before a transform, reused by each worker process."""
+
+
+class SharedVariable(NamedTuple):
+    """
+    Place of a loaded variable in the shared memory block.
+
+    Attributes:
+        dims: Dimension names of the variable.
+        shape: Shape of the variable.
+        dtype: Data type of the variable, as a string.
+        offset: Position in bytes of the variable in the block.
+    """
+
+    dims: tuple[str, ...]
+    shape: tuple[int, ...]
+    dtype: str
+    offset: int
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Gets the size in bytes of the variable.
+
+        Returns:
+            Size of the variable in bytes.
+        """
+        return int(np.prod(self.shape, dtype=np.int64)) * np.dtype(self.dtype).itemsize
+
+    def view(self, buffer: Any) -> np.typing.NDArray:
+        """
+        Gets the variable as an array viewing the shared memory block.
+
+        Args:
+            buffer: The shared memory block, or an array viewing all of it.
+
+        Returns:
+            An array sharing the memory of the block.
+        """
+        return np.ndarray(self.shape, self.dtype, buffer=buffer, offset=self.offset)
+
+
+def _get_layout(
+    variables: dict[str, tuple[tuple[str, ...], tuple[int, ...], Any]],
+) -> tuple[dict[str, SharedVariable], int]:
+    """
+    Places variables one after the other in a shared memory block.
+
+    Args:
+        variables: Dimension names, shape and data type of each variable.
+
+    Returns:
+        The place of each variable, and the size in bytes of the block.
+    """
+    layout = {}
+    nbytes = 0
+    for name, (dims, shape, dtype) in variables.items():
+        layout[name] = SharedVariable(dims, shape, np.dtype(dtype).str, nbytes)
+        nbytes += -(-layout[name].nbytes // SHARED_ALIGNMENT) * SHARED_ALIGNMENT
+    return layout, nbytes
+
+
+def _get_transformed_variables(
+    read_specs: dict[str, list[ReadSpecs]], dim: str, transform: Transform
+) -> tuple[dict[str, tuple[tuple[str, ...], tuple[int, ...], Any]], xr.Dataset]:
+    """
+    Finds the variables produced by a transform, running it without any data.
+
+    Like dask does to infer the metadata of a computation, the transform is applied
+    to a template of the inputs with no entry along `dim`.
+
+    Args:
+        read_specs: Read specifications of each variable, sorted along `dim`.
+        dim: Name of the dimension that varies from file to file.
+        transform: Callable transforming the dataset of each file.
+
+    Returns:
+        The dimension names, shape and data type of each transformed variable, and
+        the transformed template.
+
+    Raises:
+        ValueError: If a transformed variable is not along `dim` or changes the size
+            of another dimension.
+    """
+    sizes: dict[str, int] = {}
+    data_vars = {}
+    coords: dict = {}
+    for name, variable_specs in read_specs.items():
+        first = variable_specs[0]
+        shape = tuple(
+            0 if d == dim else size
+            for d, size in zip(first.dims, first.shape, strict=True)
+        )
+        data_vars[name] = xr.Variable(
+            first.dims, np.empty(shape, dtype=first.output_dtype), attrs=first.attrs
+        )
+        coords |= first.coords
+        sizes |= {
+            d: sum(specs.shape[specs.dims.index(d)] for specs in variable_specs)
+            if d == dim
+            else size
+            for d, size in zip(first.dims, first.shape, strict=True)
+        }
+    coords[dim] = np.asarray(coords[dim])[:0]
+    template = transform(xr.Dataset(data_vars, coords=get_coordinates(coords)))
+
+    variables = {}
+    for data_name, data_array in template.data_vars.items():
+        dims = tuple(str(d) for d in data_array.dims)
+        if dim not in dims or any(
+            d not in sizes or (d != dim and data_array.sizes[d] != sizes[d])
+            for d in dims
+        ):
+            error_message = (
+                f"The transform must keep the dimensions of its inputs, with {dim!r}, "
+                f"but {data_name!r} has dimensions {dict(data_array.sizes)}"
+            )
+            raise ValueError(error_message)
+        variables[str(data_name)] = (
+            dims,
+            tuple(sizes[d] for d in dims),
+            data_array.dtype,
+        )
+    return variables, template
+
+
+def _get_steps(
+    read_specs: dict[str, list[ReadSpecs]], dim: str, grouped: bool
+) -> tuple[list[list[ReadSpecs]], list[int]]:
+    """
+    Splits the files into the steps loaded by the worker processes.
+
+    Args:
+        read_specs: Read specifications of each variable, sorted along `dim`.
+        dim: Name of the dimension that varies from file to file.
+        grouped: Whether each step holds the files of all variables at the same
+            position along `dim`, like a transform needs, or a single file.
+
+    Returns:
+        The read specifications of each step, and its position along `dim`.
+
+    Raises:
+        ValueError: If grouped and the variables are not split in the same files
+            along `dim`.
+    """
+    steps = []
+    starts = []
+    if not grouped:
+        for variable_specs in read_specs.values():
+            start = 0
+            for specs in variable_specs:
+                steps.append([specs])
+                starts.append(start)
+                start += specs.shape[specs.dims.index(dim)]
+        return steps, starts
+
+    first_name, first_specs = next(iter(read_specs.items()))
+    for name, variable_specs in read_specs.items():
+        if len(variable_specs) != len(first_specs) or not all(
+            coords_equal(specs.coords[dim], first.coords[dim])
+            for specs, first in zip(variable_specs, first_specs, strict=True)
+        ):
+            error_message = (
+                f"Cannot transform {name!r} with {first_name!r}: their files split "
+                f"{dim!r} differently"
+            )
+            raise ValueError(error_message)
+    start = 0
+    for group in zip(*read_specs.values(), strict=True):
+        steps.append(list(group))
+        starts.append(start)
+        start += group[0].shape[group[0].dims.index(dim)]
+    return steps, starts
+
+
+def _load_step(
+    block_name: str,
+    layout: dict[str, SharedVariable],
+    dim: str,
+    transform: Transform | None,
+    read_specs: Sequence[ReadSpecs],
+    start: int,
+) -> None:
+    """
+    Reads and transforms the files of a step into the shared memory block.
+
+    Without a transform, each file is read straight into its place in the block.
+    Otherwise, the files are read into pooled arrays, and the transformed
+    variables are written into the block.
+
+    Args:
+        block_name: Name of the shared memory block.
+        layout: Place of each loaded variable in the block.
+        dim: Name of the dimension that varies from file to file.
+        transform: Callable transforming the dataset of the files, if any.
+        read_specs: Read specifications of the files.
+        start: Position of the files along `dim`.
+
+    Raises:
+        ValueError: If a transformed variable changes its shape along `dim`.
+    """
+    block = shared_memory.SharedMemory(name=block_name)
+    arrays = get_backend_arrays(read_specs)
+    try:
+        if transform is None:
+            for array in arrays:
+                variable = layout[array.metadata.name]
+                region = tuple(
+                    slice(start, start + size) if d == dim else slice(None)
+                    for d, size in zip(variable.dims, array.shape, strict=True)
+                )
+                array.read_into(variable.view(block.buf)[region])
+            return
+
+        data_vars = {}
+        coords: dict = {}
+        for array in arrays:
+            data_vars[array.metadata.name] = xr.Variable(
+                array.metadata.dims,
+                array.read_into(_BUFFER_POOL.acquire(array.shape, array.dtype)),
+                attrs=array.metadata.attrs,
+            )
+            coords |= array.metadata.coords
+        transformed = transform(xr.Dataset(data_vars, coords=get_coordinates(coords)))
+        size = arrays[0].shape[arrays[0].metadata.dims.index(dim)]
+        for name, variable in layout.items():
+            data = transformed[name].variable.transpose(*variable.dims).values
+            region = tuple(
+                slice(start, start + size) if d == dim else slice(None)
+                for d in variable.dims
+            )
+            target = variable.view(block.buf)[region]
+            if data.shape != target.shape:
+                error_message = (
+                    f"The transform changed the shape of {name!r} from {target.shape} "
+                    f"to {data.shape}"
+                )
+                raise ValueError(error_message)
+            target[...] = data
+        for data_var in data_vars.values():
+            _BUFFER_POOL.release(data_var.values)
+    finally:
+        for array in arrays:
+            array._file_manager.close()
+        block.close()
+
+
+def load_binfile_series(
+    paths: Iterable[str | os.PathLike],
+    read_specs_getter: ReadSpecsGetterProtocol,
+    dim: str = "time",
+    transform: Transform | None = None,
+    max_workers: int | None = None,
+    mp_context: multiprocessing.context.BaseContext | None = None,
+    variables: str | Iterable[str] | None = None,
+    variable_names_getter: VariableNamesGetterProtocol | None = None,
+) -> xr.Dataset:
+    """
+    Loads a series of homogeneous binary files with a pool of worker processes.
+
+    The files are grouped and sorted like in
+    :func:`~xarray_binfile.read.series.open_binfile_series`. Byte swapping and
+    casting are done while reading, following the ``memory_dtype`` of the read
+    specifications. The loaded variables are views of a shared memory block, that
+    is released once they are all garbage collected.
+
+    Args:
+        paths: Paths to the binary files.
+        read_specs_getter: A callable that generates read specifications for each
+            binary file, or for each variable packed into it.
+        dim: Name of the dimension that varies from file to file. Defaults to "time".
+        transform: A picklable callable, like a module-level function, applied in
+            the worker processes to the dataset of the files at each position
+            along `dim`, with a variable each. It may compute derived variables,
+            that must keep the dimensions of the inputs, including `dim`. It is
+            also called once with no entry along `dim`, to find the variables it
+            returns. Defaults to None, meaning the variables are loaded as read.
+        max_workers: Number of worker processes. Defaults to None, meaning the
+            number of processors.
+        mp_context: Multiprocessing context starting the worker processes.
+            Defaults to None, meaning the default context.
+        variables: Variables to load. Defaults to None, meaning all.
+        variable_names_getter: A callable that gets the names of the variables in
+            each binary file from its path alone, so the files without any of
+            `variables` are skipped before computing their read specifications.
+            Defaults to None.
+
+    Returns:
+        The loaded Xarray dataset, backed by shared memory.
+
+    Raises:
+        ValueError: If no file is given, if the files are not homogeneous, or if the
+            transform changes the dimensions of the variables.
+    """
+    read_specs, stack_coord = _collect_read_specs(
+        paths, read_specs_getter, dim, variables, variable_names_getter
+    )
+    first = next(iter(read_specs.values()))[0]
+    attrs = first.attrs or {}
+    if transform is None:
+        shared_variables = {
+            name: (
+                variable_specs[0].dims,
+                tuple(
+                    len(stack_coord) if d == dim else size
+                    for d, size in zip(
+                        variable_specs[0].dims, variable_specs[0].shape, strict=True
+                    )
+                ),
+                variable_specs[0].output_dtype,
+            )
+            for name, variable_specs in read_specs.items()
+        }
+        variable_attrs = {
+            name: variable_specs[0].attrs for name, variable_specs in read_specs.items()
+        }
+    else:
+        shared_variables, template = _get_transformed_variables(
+            read_specs, dim, transform
+        )
+        attrs = template.attrs
+        variable_attrs = {name: template[name].attrs for name in shared_variables}
+    layout, nbytes = _get_layout(shared_variables)
+    steps, starts = _get_steps(read_specs, dim, grouped=transform is not None)
+
+    n_workers = max_workers or os.cpu_count() or 1
+    block = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+    try:
+        with ProcessPoolExecutor(max_workers, mp_context) as executor:
+            for _ in executor.map(
+                partial(_load_step, block.name, layout, dim, transform),
+                steps,
+                starts,
+                chunksize=max(1, len(steps) // (4 * n_workers)),
+            ):
+                pass
+    except BaseException:
+        block.close()
+        raise
+    finally:
+        # the memory stays mapped until it is closed
+        block.unlink()
+
+    # every variable is a view of this array, so the block is closed after them all
+    memory = np.ndarray((nbytes,), np.uint8, buffer=block.buf)
+    weakref.finalize(memory, block.close).atexit = False
+
+    coords: dict = {}
+    for variable_specs in read_specs.values():
+        coords |= variable_specs[0].coords
+    coords[dim] = stack_coord
+    dims = {d for variable in layout.values() for d in variable.dims}
+    data_vars = {
+        name: xr.Variable(
+            variable.dims, variable.view(memory), attrs=variable_attrs[name]
+        )
+        for name, variable in layout.items()
+    }
+    return xr.Dataset(
+        data_vars,
+        coords=get_coordinates({d: c for d, c in coords.items() if d in dims}),
+        attrs=attrs,
+    )
@@ -0,0 +1,306 @@
+"""
+Reads coarse overviews of binary files, written next to them at lower resolutions.
+
+Previews and zoomed-out plots do not need every value of a large field. Each
+overview level is a decimated copy of the file, either strided or averaged over
+blocks, stored next to it as ``<filename>.ovr<level>``, with the same layout on
+disk. A sidecar ``<filename>.overviews.json`` lists the decimation factors of each
+level, so the reader picks the coarsest level that keeps the requested resolution
+and reads a small fraction of the bytes.
+"""
+
+import glob
+import json
+import os
+import threading
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from xarray_binfile.read.coordinates import RegularCoord
+from xarray_binfile.read.file_metadata import ReadSpecs
+
+OVERVIEWS_VERSION = 1
+"""Version of the layout of the sidecar files, bumped on incompatible changes."""
+
+OVERVIEW_METHODS = ("mean", "stride")
+"""Names of the supported decimation methods."""
+
+
+def decimated_size(size: int, factor: int, method: str) -> int:
+    """
+    Gets the number of values left along a dimension after decimating it.
+
+    Averaging drops the values of the last incomplete block, like
+    ``coarsen(boundary="trim")``, while striding keeps the first value of it.
+
+    Args:
+        size: Number of values.
+        factor: Decimation factor.
+        method: Decimation method, one of `OVERVIEW_METHODS`.
+
+    Returns:
+        Number of decimated values.
+
+    Examples:
+        >>> decimated_size(10, 4, "mean"), decimated_size(10, 4, "stride")
+        (2, 3)
+    """
+    if method == "mean":
+        return size // factor
+    return -(-size // factor)
+
+
+def decimate_coord(values: Any, factor: int, method: str) -> Any:
+    """
+    Decimates the values of a coordinate like the data of an overview.
+
+    Times are averaged like Xarray does, through their offsets from the first time
+    of each block, truncated to the resolution of their data type.
+
+    Args:
+        values: Coordinate values, possibly a regular coordinate.
+        factor: Decimation factor.
+        method: Decimation method, one of `OVERVIEW_METHODS`.
+
+    Returns:
+        The decimated values, still described compactly if they were regular.
+
+    Examples:
+        >>> decimate_coord(RegularCoord(0.0, 1.0, 10), 4, "mean")
+        RegularCoord(start=1.5, step=4.0, size=2, dtype=None)
+        >>> decimate_coord(np.arange(10), 4, "stride")
+        array([0, 4, 8])
+    """
+    if factor == 1:
+        return values
+    if method == "stride":
+        return values[::factor]
+    size = decimated_size(len(values), factor, method)
+    if isinstance(values, RegularCoord):
+        return RegularCoord(
+            start=values.start + values.step * (factor - 1) / 2,
+            step=values.step * factor,
+            size=size,
+        )
+    blocks = np.asarray(values)[: size * factor].reshape(size, factor)
+    if blocks.dtype.kind in "mM":
+        offsets = blocks - blocks[:, :1]
+        means = offsets.astype(np.float64).mean(axis=1).astype(offsets.dtype)
+        return blocks[:, 0] + means
+    return blocks.mean(axis=1)
+
+
+@dataclass(frozen=True)
+class Overviews:
+    """
+    Decimation factors of the overview levels of a binary file.
+
+    Attributes:
+        levels: Decimation factor of each level along some dimensions, relative to
+            the full resolution, from the finest to the coarsest level. Dimensions
+            not listed are kept whole.
+        method: Decimation method, "mean" to average each block of values or
+            "stride" to keep its first value. Defaults to "mean".
+
+    Examples:
+        >>> overviews = Overviews(({"x": 2, "y": 2}, {"x": 8, "y": 8}))
+        >>> specs = ReadSpecs(
+        ...     Path("ux.bin"), "<f8", {"x": range(64), "y": range(32)}, "ux"
+        ... )
+        >>> overviews.select(specs, {"x": 10}).shape
+        (32, 16)
+        >>> overviews.select(specs, {"x": 4}).filepath.name
+        'ux.bin.ovr2'
+    """
+
+    levels: tuple[Mapping[str, int], ...]
+    method: str = "mean"
+
+    def __post_init__(self):
+        """
+        Validates the decimation.
+
+        Raises:
+            ValueError: If the method is unknown or a factor is not positive.
+        """
+        if self.method not in OVERVIEW_METHODS:
+            error_message = (
+                f"Unknown overview method {self.method!r}, expected {OVERVIEW_METHODS}"
+            )
+            raise ValueError(error_message)
+        if any(factor < 1 for level in self.levels for factor in level.values()):
+            error_message = f"Overview factors must be positive, got {self.levels}"
+            raise ValueError(error_message)
+
+    @staticmethod
+    def sidecar_path(filepath: str | os.PathLike[str]) -> Path:
+        """
+        Gets the path to the description of the overviews of a binary file.
+
+        Args:
+            filepath: Path to the binary file.
+
+        Returns:
+            Path to the sidecar file.
+        """
+        filepath = Path(filepath)
+        return filepath.with_name(f"{filepath.name}.overviews.json")
+
+    @staticmethod
+    def level_path(filepath: str | os.PathLike[str], level: int) -> Path:
+        """
+        Gets the path to an overview level of a binary file.
+
+        Args:
+            filepath: Path to the binary file.
+            level: Position of the level, starting at 1 for the finest one.
+
+        Returns:
+            Path to the overview file.
+
+        Examples:
+            >>> Overviews.level_path("data/ux-0001.bin", 2).name
+            'ux-0001.bin.ovr2'
+        """
+        filepath = Path(filepath)
+        return filepath.with_name(f"{filepath.name}.ovr{level}")
+
+    def save(self, filepath: str | os.PathLike[str]) -> None:
+        """
+        Writes the overview levels of a binary file to its sidecar, atomically.
+
+        Args:
+            filepath: Path to the binary file.
+        """
+        sidecar_path = self.sidecar_path(filepath)
+        temporary_path = sidecar_path.with_name(
+            f".{sidecar_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        content = {
+            "version": OVERVIEWS_VERSION,
+            "levels": [dict(level) for level in self.levels],
+            "method": self.method,
+        }
+        with open(temporary_path, "w") as file:
+            json.dump(content, file)
+        os.replace(temporary_path, sidecar_path)
+
+    @classmethod
+    def remove(cls, filepath: str | os.PathLike[str]) -> None:
+        """
+        Removes the overview levels of a binary file and their sidecar, if any.
+
+        The sidecar goes first, so readers stop selecting the levels before they are
+        removed.
+
+        Args:
+            filepath: Path to the binary file.
+        """
+        filepath = Path(filepath)
+        cls.sidecar_path(filepath).unlink(missing_ok=True)
+        prefix = f"{filepath.name}.ovr"
+        for path in filepath.parent.glob(f"{glob.escape(prefix)}*"):
+            if path.name.removeprefix(prefix).isdigit():
+                path.unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, filepath: str | os.PathLike[str]) -> "Overviews | None":
+        """
+        Reads the overview levels of a binary file from its sidecar.
+
+        Args:
+            filepath: Path to the binary file.
+
+        Returns:
+            The overview levels, or None if the file has no sidecar or it was
+            written by an incompatible version.
+        """
+        try:
+            with open(cls.sidecar_path(filepath)) as file:
+                content = json.load(file)
+        except FileNotFoundError:
+            return None
+        if content.get("version") != OVERVIEWS_VERSION:
+            return None
+        return cls(tuple(content["levels"]), content["method"])
+
+    def read_specs(self, specs: ReadSpecs, level: int) -> ReadSpecs:
+        """
+        Gets the read specifications of an overview level.
+
+        Args:
+            specs: Read specifications of the binary file at full resolution.
+            level: Position of the level, starting at 1 for the finest one, or 0
+                for the full resolution.
+
+        Returns:
+            The read specifications of the overview file, with decimated
+            coordinates and without the header of the binary file.
+        """
+        if not level:
+            return specs
+        factors = self.levels[level - 1]
+        return replace(
+            specs,
+            filepath=self.level_path(specs.filepath, level),
+            coords={
+                dim: decimate_coord(values, factors.get(dim, 1), self.method)
+                for dim, values in specs.coords.items()
+            },
+            offset=0,
+            record_stride=None,
+        )
+
+    def select(self, specs: ReadSpecs, resolution: Mapping[str, int]) -> ReadSpecs:
+        """
+        Gets the read specifications of the coarsest level keeping a resolution.
+
+        Args:
+            specs: Read specifications of the binary file at full resolution.
+            resolution: Smallest number of values needed along some dimensions,
+                like the pixels of a plot. Other dimensions are not constrained.
+
+        Returns:
+            The read specifications of the coarsest overview level with at least
+            `resolution` values along each dimension, or `specs` if none has.
+        """
+        sizes = dict(zip(specs.dims, specs.shape, strict=True))
+        for level in range(len(self.levels), 0, -1):
+            factors = self.levels[level - 1]
+            if all(
+                decimated_size(sizes[dim], factors.get(dim, 1), self.method) >= size
+                for dim, size in resolution.items()
+                if dim in sizes
+            ):
+                return self.read_specs(specs, level)
+        return specs
+
+
+def select_overviews(
+    read_specs: Iterable[ReadSpecs], resolution: Mapping[str, int] | None
+) -> list[ReadSpecs]:
+    """
+    Replaces read specifications with those of their coarsest suitable overview.
+
+    Args:
+        read_specs: Read specifications of binary files at full resolution.
+        resolution: Smallest number of values needed along some dimensions, or
+            None for the full resolution.
+
+    Returns:
+        The read specifications to use, at full resolution for the files without
+        overviews.
+    """
+    if resolution is None:
+        return list(read_specs)
+    selected = []
+    for specs in read_specs:
+        overviews = Overviews.load(specs.filepath)
+        selected.append(
+            specs if overviews is None else overviews.select(specs, resolution)
+        )
+    return selected
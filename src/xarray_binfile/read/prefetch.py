@@ -0,0 +1,90 @@
+"""
+Iterates over the steps of a dataset in order, reading the next ones ahead.
+
+Loops like animations or time marching analyses load ``ds.isel(time=i)`` one after
+the other, waiting for the disk at every step. Here the next steps are loaded in
+the read thread pool while the caller works on the current one, so the time spent
+reading hides behind the computation.
+"""
+
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future
+from typing import TypeVar
+
+import xarray as xr
+
+from xarray_binfile.read.executor import get_read_executor
+
+T = TypeVar("T", xr.Dataset, xr.DataArray)
+
+
+def _load_step(obj: T, dim: str, index: int) -> T:
+    """
+    Loads a step of a dataset or data array into memory.
+
+    Args:
+        obj: The dataset or data array.
+        dim: Name of the dimension of the steps.
+        index: Position of the step along `dim`.
+
+    Returns:
+        The step, without `dim`, with its data loaded.
+    """
+    return obj.isel({dim: index}).load()
+
+
+def iter_steps(obj: T, dim: str = "time", prefetch: int = 1) -> Iterator[T]:
+    """
+    Iterates over the steps of a dataset or data array along a dimension, in order.
+
+    While a step is used, up to `prefetch` of the next steps are loaded in the read
+    thread pool, whose size is set with
+    :func:`~xarray_binfile.read.executor.set_max_read_workers`, even while the
+    iteration runs. The iteration holds at most ``prefetch + 1`` steps in memory,
+    the current one and the next `prefetch`, and a caller still referencing the
+    previous step when asking for the next one, like the variable of a ``for`` loop,
+    holds one more. Steps not yet yielded when the iteration stops early are
+    discarded.
+
+    Args:
+        obj: The dataset or data array, like one opened with
+            :func:`~xarray_binfile.read.series.open_binfile_series`.
+        dim: Name of the dimension of the steps. Defaults to "time".
+        prefetch: Number of steps loaded ahead of the current one. Defaults to 1,
+            and 0 loads each step when it is requested.
+
+    Yields:
+        Each step, as ``obj.isel({dim: i})``, with its data loaded.
+
+    Raises:
+        ValueError: If `prefetch` is negative.
+
+    Examples:
+        >>> ds = xr.Dataset({"ux": (("time", "x"), [[0, 1], [2, 3]])})
+        >>> [int(step["ux"].sum()) for step in iter_steps(ds, prefetch=2)]
+        [1, 5]
+    """
+    if prefetch < 0:
+        error_message = f"prefetch must be non-negative, got {prefetch}"
+        raise ValueError(error_message)
+    size = obj.sizes[dim]
+    if not prefetch:
+        for index in range(size):
+            yield _load_step(obj, dim, index)
+        return
+
+    pending: deque[Future[T]] = deque()
+    submitted = 0
+    try:
+        for index in range(size):
+            # the executor is fetched for each step, as resizing the pool replaces it
+            while submitted < min(size, index + prefetch + 1):
+                pending.append(
+                    get_read_executor().submit(_load_step, obj, dim, submitted)
+                )
+                submitted += 1
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
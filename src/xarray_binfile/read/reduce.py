@@ -0,0 +1,405 @@
+"""
+Reduces a series of binary files along a dimension, streaming over the files.
+
+Reductions like ``open_mfdataset(...).mean("time")`` build a dask graph with tasks
+for every file. Here each file is read once, in blocks small enough to stay in the
+CPU caches, and folded into running accumulators, so memory holds the accumulators
+and a single block per worker, whatever the number of files. The variance uses the
+parallel form of Welford's algorithm, that is numerically stable and merges the
+partial results of several workers.
+"""
+
+import os
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+import xarray as xr
+
+from xarray_binfile.read.array import BinaryEngineBackendArray
+from xarray_binfile.read.buffers import BufferPool
+from xarray_binfile.read.chunks import get_preferred_chunks
+from xarray_binfile.read.coordinates import get_coordinates
+from xarray_binfile.read.file_metadata import ReadSpecs, ReadSpecsGetterProtocol
+from xarray_binfile.read.series import _check_homogeneous
+
+REDUCTIONS = ("count", "sum", "mean", "min", "max", "var", "std")
+"""Names of the supported reductions."""
+
+DEFAULT_BLOCK_NBYTES = 4 << 20
+"""Size in bytes of the blocks each file is read in."""
+
+
+def _combine(
+    ufunc: np.ufunc,
+    values: np.typing.NDArray,
+    count: np.typing.NDArray,
+    other: np.typing.NDArray,
+    other_count: np.typing.NDArray,
+) -> np.typing.NDArray:
+    """
+    Combines the accumulators of two sets of values, ignoring those of empty sets.
+
+    Args:
+        ufunc: Function combining the accumulators, like ``np.fmin``.
+        values: Accumulators of the first set of values.
+        count: Number of values in the first set, for each element.
+        other: Accumulators of the second set of values.
+        other_count: Number of values in the second set, for each element.
+
+    Returns:
+        The combined accumulators.
+    """
+    return np.where(
+        count == 0, other, np.where(other_count == 0, values, ufunc(values, other))
+    )
+
+
+@dataclass
+class RunningStats:
+    """
+    Running accumulators of the values along a dimension, for each element.
+
+    NaN values are skipped, as by Xarray's reductions with their default
+    ``skipna``, so every accumulator only covers the values that are not NaN.
+
+    Attributes:
+        count: Number of values accumulated for each element, ignoring NaN.
+        mean: Mean of the values.
+        m2: Sum of the squared deviations from the mean, if the variance is needed.
+        total: Sum of the values, if needed.
+        minimum: Smallest value, if needed.
+        maximum: Largest value, if needed.
+    """
+
+    count: np.typing.NDArray[np.int64]
+    mean: np.typing.NDArray[np.float64]
+    m2: np.typing.NDArray[np.float64] | None
+    total: np.typing.NDArray | None
+    minimum: np.typing.NDArray | None
+    maximum: np.typing.NDArray | None
+
+    @classmethod
+    def empty(
+        cls, shape: tuple[int, ...], dtype: np.dtype, ops: Iterable[str]
+    ) -> "RunningStats":
+        """
+        Creates accumulators without any value.
+
+        Args:
+            shape: Shape of the result of the reduction.
+            dtype: Data type of the values.
+            ops: Names of the reductions to compute.
+
+        Returns:
+            The empty accumulators.
+        """
+        ops = set(ops)
+        # sums of integers keep integers, like in NumPy and Xarray
+        sum_dtype = (
+            np.float64 if dtype.kind in "fc" else np.sum(np.zeros(1, dtype)).dtype
+        )
+        fill_value = np.nan if dtype.kind in "fc" else 0
+        return cls(
+            count=np.zeros(shape, dtype=np.int64),
+            mean=np.zeros(shape),
+            m2=np.zeros(shape) if ops & {"var", "std"} else None,
+            total=np.zeros(shape, dtype=sum_dtype) if "sum" in ops else None,
+            minimum=np.full(shape, fill_value, dtype=dtype) if "min" in ops else None,
+            maximum=np.full(shape, fill_value, dtype=dtype) if "max" in ops else None,
+        )
+
+    def update(
+        self, region: tuple[slice, ...], block: np.typing.NDArray, axis: int
+    ) -> None:
+        """
+        Accumulates a block of values into a region of the accumulators.
+
+        Args:
+            region: Region of the result updated by the block.
+            block: Values, with the reduced dimension along `axis`.
+            axis: Position of the reduced dimension in `block`.
+        """
+        if not block.shape[axis]:
+            return
+        valid = ~np.isnan(block) if block.dtype.kind in "fc" else None
+        if valid is None:
+            n_block = np.full(self.count[region].shape, block.shape[axis])
+            block_sum = block.sum(axis=axis, dtype=np.float64)
+        else:
+            n_block = valid.sum(axis=axis)
+            block_sum = np.nansum(block, axis=axis, dtype=np.float64)
+        block_mean = np.divide(
+            block_sum, n_block, out=np.zeros_like(block_sum), where=n_block > 0
+        )
+        count = self.count[region].copy()
+        total = count + n_block
+        delta = block_mean - self.mean[region]
+        self.mean[region] += delta * np.divide(
+            n_block, total, out=np.zeros_like(delta), where=total > 0
+        )
+        if self.m2 is not None:
+            deviations = block - np.expand_dims(block_mean, axis)
+            if valid is not None:
+                deviations[~valid] = 0.0
+            block_m2 = (deviations * deviations).sum(axis=axis)
+            self.m2[region] += block_m2 + delta * delta * np.divide(
+                count * n_block, total, out=np.zeros_like(delta), where=total > 0
+            )
+        if self.total is not None:
+            self.total[region] += (
+                block_sum
+                if valid is not None
+                else block.sum(axis=axis, dtype=self.total.dtype)
+            )
+        if self.minimum is not None:
+            self.minimum[region] = _combine(
+                np.fmin,
+                self.minimum[region],
+                count,
+                np.fmin.reduce(block, axis=axis),
+                n_block,
+            )
+        if self.maximum is not None:
+            self.maximum[region] = _combine(
+                np.fmax,
+                self.maximum[region],
+                count,
+                np.fmax.reduce(block, axis=axis),
+                n_block,
+            )
+        self.count[region] = total
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """
+        Merges the accumulators of two disjoint sets of values.
+
+        Args:
+            other: Accumulators of the other values.
+
+        Returns:
+            The accumulators of all values.
+        """
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        return RunningStats(
+            count=total,
+            mean=self.mean
+            + delta
+            * np.divide(other.count, total, out=np.zeros_like(delta), where=total > 0),
+            m2=None
+            if self.m2 is None or other.m2 is None
+            else self.m2
+            + other.m2
+            + delta
+            * delta
+            * np.divide(
+                self.count * other.count,
+                total,
+                out=np.zeros_like(delta),
+                where=total > 0,
+            ),
+            total=None
+            if self.total is None or other.total is None
+            else self.total + other.total,
+            minimum=None
+            if self.minimum is None or other.minimum is None
+            else _combine(
+                np.fmin, self.minimum, self.count, other.minimum, other.count
+            ),
+            maximum=None
+            if self.maximum is None or other.maximum is None
+            else _combine(
+                np.fmax, self.maximum, self.count, other.maximum, other.count
+            ),
+        )
+
+    def result(self, op: str) -> np.typing.NDArray:
+        """
+        Gets the result of a reduction.
+
+        Elements without any value that is not NaN get NaN, except for the count
+        and the sum, that are zero.
+
+        Args:
+            op: Name of the reduction.
+
+        Returns:
+            The reduced values.
+
+        Raises:
+            ValueError: If the accumulators needed by the reduction were not kept.
+        """
+        if op == "count":
+            return self.count
+        if op == "mean":
+            return np.where(self.count > 0, self.mean, np.nan)
+        if op in {"var", "std"} and self.m2 is not None:
+            variance = np.divide(
+                self.m2,
+                self.count,
+                out=np.full_like(self.m2, np.nan),
+                where=self.count > 0,
+            )
+            return variance if op == "var" else np.sqrt(variance)
+        values = {"sum": self.total, "min": self.minimum, "max": self.maximum}.get(op)
+        if values is None:
+            error_message = f"The reduction {op!r} was not accumulated"
+            raise ValueError(error_message)
+        return values
+
+
+def _reduce_file(
+    specs: ReadSpecs,
+    dim: str,
+    stats: RunningStats,
+    block_nbytes: int,
+    buffer_pool: BufferPool,
+) -> None:
+    """
+    Accumulates the values of a binary file, reading it in blocks.
+
+    The blocks split the slowest varying dimension on disk, so each one is a
+    sequential read.
+
+    Args:
+        specs: Metadata describing the binary file.
+        dim: Name of the reduced dimension.
+        stats: Accumulators of the values read before.
+        block_nbytes: Target size in bytes of each block.
+        buffer_pool: Pool lending the arrays that each block is read into.
+    """
+    array = BinaryEngineBackendArray(specs)
+    axis = specs.dims.index(dim)
+    chunks = get_preferred_chunks(specs, block_nbytes)
+    starts = [
+        range(0, size, chunks[name])
+        for name, size in zip(specs.dims, specs.shape, strict=True)
+    ]
+    for block_start in product(*starts):
+        key = tuple(
+            slice(start, start + chunks[name])
+            for name, start in zip(specs.dims, block_start, strict=True)
+        )
+        block = array.read_into(
+            buffer_pool.acquire(
+                tuple(
+                    len(range(size)[k])
+                    for k, size in zip(key, specs.shape, strict=True)
+                ),
+                array.dtype,
+            ),
+            key,
+        )
+        stats.update(key[:axis] + key[axis + 1 :], block, axis)
+        buffer_pool.release(block)
+    array._file_manager.close()
+
+
+def _reduce_files(
+    read_specs: Sequence[ReadSpecs],
+    dim: str,
+    ops: Sequence[str],
+    block_nbytes: int,
+) -> RunningStats:
+    """
+    Accumulates the values of several binary files, one after the other.
+
+    Args:
+        read_specs: Metadata describing each binary file.
+        dim: Name of the reduced dimension.
+        ops: Names of the reductions to compute.
+        block_nbytes: Target size in bytes of each block.
+
+    Returns:
+        The accumulators of the values in all files.
+    """
+    first = read_specs[0]
+    axis = first.dims.index(dim)
+    stats = RunningStats.empty(
+        first.shape[:axis] + first.shape[axis + 1 :], first.output_dtype, ops
+    )
+    buffer_pool = BufferPool()
+    for specs in read_specs:
+        _reduce_file(specs, dim, stats, block_nbytes, buffer_pool)
+    return stats
+
+
+def binfile_reduce(
+    paths: Iterable[str | os.PathLike],
+    read_specs_getter: ReadSpecsGetterProtocol,
+    ops: str | Sequence[str] = ("mean",),
+    dim: str = "time",
+    max_workers: int = 1,
+    block_nbytes: int = DEFAULT_BLOCK_NBYTES,
+) -> dict[str, xr.Dataset]:
+    """
+    Reduces a series of homogeneous binary files along a dimension.
+
+    Unlike reducing a dataset opened with ``xr.open_mfdataset``, no dask graph is
+    built. Each worker reduces a share of the files, one at a time, and
+    their accumulators are merged at the end, so the memory needed grows with the
+    number of workers but not with the number of files. The results match those of
+    Xarray, skipping NaN values as with its default ``skipna``, with the variance
+    normalized by the number of values. Floating point results are computed in
+    double precision.
+
+    Args:
+        paths: Paths to the binary files.
+        read_specs_getter: A callable that generates read specifications for each
+            binary file, or for each variable packed into it.
+        ops: Names of the reductions, among `REDUCTIONS`. Defaults to "mean".
+        dim: Name of the dimension that is reduced, that varies from file to file
+            or from record to record. Defaults to "time".
+        max_workers: Number of threads reducing files at once. Defaults to 1.
+        block_nbytes: Target size in bytes of the blocks each file is read in.
+            Defaults to 4 MiB.
+
+    Returns:
+        A dataset for each reduction, with the reduced variables.
+
+    Raises:
+        ValueError: If an unknown reduction is given, if no file is given, or if
+            the files are not homogeneous.
+    """
+    ops = (ops,) if isinstance(ops, str) else tuple(ops)
+    if unknown := set(ops) - set(REDUCTIONS):
+        error_message = f"Unknown reductions {sorted(unknown)}, expected {REDUCTIONS}"
+        raise ValueError(error_message)
+    read_specs: dict[str, list[ReadSpecs]] = defaultdict(list)
+    for path in paths:
+        file_metadata = read_specs_getter(path=Path(path))
+        if isinstance(file_metadata, ReadSpecs):
+            file_metadata = (file_metadata,)
+        for metadata in file_metadata:
+            read_specs[metadata.name].append(metadata)
+    if not read_specs:
+        error_message = "No binary files to reduce"
+        raise ValueError(error_message)
+
+    results: dict[str, dict[str, xr.Variable]] = {op: {} for op in ops}
+    coords: dict = {}
+    with ThreadPoolExecutor(max_workers) as executor:
+        for name, variable_specs in read_specs.items():
+            _check_homogeneous(variable_specs, dim)
+            n_shares = min(max_workers, len(variable_specs))
+            shares = [variable_specs[i::n_shares] for i in range(n_shares)]
+            partial = executor.map(
+                lambda share: _reduce_files(share, dim, ops, block_nbytes), shares
+            )
+            stats = next(partial)
+            for other in partial:
+                stats = stats.merge(other)
+            first = variable_specs[0]
+            dims = tuple(d for d in first.dims if d != dim)
+            for op in ops:
+                results[op][name] = xr.Variable(dims, stats.result(op))
+            coords |= {d: first.coords[d] for d in dims}
+    return {
+        op: xr.Dataset(data_vars, coords=get_coordinates(coords))
+        for op, data_vars in results.items()
+    }
@@ -0,0 +1,206 @@
+"""
+Refreshes open datasets whose binary files grow, as new records are appended.
+
+Only the size of each file is queried, so a dataset of thousands of files is
+refreshed without opening or mapping them again.
+"""
+
+from collections.abc import Sequence
+from typing import Any
+
+import dask.array
+import xarray as xr
+from xarray.core import indexing
+
+from xarray_binfile.read.array import BinaryEngineBackendArray
+from xarray_binfile.read.coordinates import concatenate_coords, get_coordinates
+from xarray_binfile.read.series import StackedBackendArray
+
+RefreshableArray = BinaryEngineBackendArray | StackedBackendArray
+
+
+def _find_dask_source(data: dask.array.Array) -> Any:
+    """
+    Finds the array a dask array was created from, like by ``chunks=`` in Xarray.
+
+    Args:
+        data: The dask array.
+
+    Returns:
+        The array passed to :func:`dask.array.from_array`, or None if the dask array
+        was computed on, like indexed or concatenated, since it was created.
+    """
+    graph = data.dask
+    dependencies = graph.dependencies.get(data.name, set())
+    if len(graph.layers) != 2 or len(dependencies) != 1:
+        return None
+    (source_name,) = dependencies
+    sources = list(graph.layers[source_name].values())
+    return sources[0] if len(sources) == 1 else None
+
+
+def _find_backend_array(data: Any) -> RefreshableArray | None:
+    """
+    Finds the backend array behind the lazy wrappers of a variable.
+
+    Args:
+        data: Data of the variable, lazily indexed or chunked with dask.
+
+    Returns:
+        The backend array, or None if the data was loaded or indexed already.
+    """
+    if isinstance(data, dask.array.Array):
+        data = _find_dask_source(data)
+    while data is not None and not isinstance(data, RefreshableArray):
+        if isinstance(data, indexing.LazilyIndexedArray) and (
+            data.shape != data.array.shape
+        ):
+            return None
+        data = getattr(data, "array", None)
+    return data
+
+
+def _get_record_coord(array: RefreshableArray) -> tuple[str, Any] | None:
+    """
+    Gets the record dimension of a backend array and its coordinate.
+
+    Args:
+        array: The backend array.
+
+    Returns:
+        The name and values of the record dimension, or None if there is none.
+    """
+    if isinstance(array, BinaryEngineBackendArray):
+        record_dim = array.metadata.record_dim
+        if record_dim is None:
+            return None
+        return record_dim, array.metadata.coords[record_dim]
+    last = array.arrays[-1]
+    if not isinstance(last, BinaryEngineBackendArray) or (
+        last.metadata.record_dim is None
+    ):
+        return None
+    record_dim = last.metadata.record_dim
+    if last.metadata.dims[array.axis] != record_dim:
+        return record_dim, last.metadata.coords[record_dim]
+    return record_dim, concatenate_coords(
+        part.metadata.coords[record_dim]
+        for part in array.arrays
+        if isinstance(part, BinaryEngineBackendArray)
+    )
+
+
+def _resize_chunks(chunks: Sequence[int], size: int) -> tuple[int, ...]:
+    """
+    Cuts chunks along a dimension, or extends them with chunks of the largest size.
+
+    Args:
+        chunks: Sizes of the chunks.
+        size: Size of the dimension to cover.
+
+    Returns:
+        Sizes of the chunks adding up to `size`.
+
+    Examples:
+        >>> _resize_chunks((2, 2, 1), 7), _resize_chunks((2, 2, 1), 3)
+        ((2, 2, 1, 2), (2, 1))
+    """
+    resized = []
+    remaining = size
+    for chunk in chunks:
+        if remaining <= 0:
+            break
+        resized.append(min(chunk, remaining))
+        remaining -= resized[-1]
+    step = max(chunks, default=0) or remaining
+    while remaining > 0:
+        resized.append(min(step, remaining))
+        remaining -= resized[-1]
+    return tuple(chunk for chunk in resized if chunk) or (0,)
+
+
+def refresh_dataset(dataset: xr.Dataset) -> xr.Dataset:
+    """
+    Gets an open dataset with the records appended to its files since it was opened.
+
+    Variables sharing a record dimension are cut to the records complete in all
+    their files, so a record being appended is only read once it is complete. The
+    refreshed dataset shares the open files of `dataset`, and closing either one
+    closes them. Variables chunked with dask when they were opened, like by
+    :func:`xarray.open_mfdataset`, keep their chunks, extended with chunks of the
+    same size along the record dimension.
+
+    Args:
+        dataset: A dataset opened with the ``binfile`` engine, from a single file
+            with :func:`xarray.open_mfdataset`, or with
+            :func:`~xarray_binfile.read.series.open_binfile_series`.
+
+    Returns:
+        The refreshed dataset, or `dataset` if no variable has records.
+
+    Raises:
+        ValueError: If a variable along a record dimension, or every variable, was
+            loaded, indexed or computed on since the dataset was opened, like when
+            several files are concatenated by :func:`xarray.open_mfdataset`.
+    """
+    refreshed: dict[str, tuple[RefreshableArray, str]] = {}
+    record_coords: dict[str, Any] = {}
+    untraced = []
+    for name, data_array in dataset.data_vars.items():
+        array = _find_backend_array(data_array.variable._data)
+        if array is None:
+            untraced.append(str(name))
+            continue
+        array = array.refresh()
+        if (record_coord := _get_record_coord(array)) is None:
+            continue
+        record_dim, coord = record_coord
+        refreshed[str(name)] = (array, record_dim)
+        if record_dim not in record_coords or len(coord) < len(
+            record_coords[record_dim]
+        ):
+            record_coords[record_dim] = coord
+    if not refreshed:
+        if untraced:
+            error_message = (
+                f"Cannot refresh {untraced}, which were loaded, indexed or computed "
+                f"on since the dataset was opened"
+            )
+            raise ValueError(error_message)
+        return dataset
+
+    data_vars = {}
+    for name, data_array in dataset.data_vars.items():
+        variable = data_array.variable
+        if name in refreshed:
+            array, record_dim = refreshed[str(name)]
+            size = len(record_coords[record_dim])
+            dask_chunks = variable.chunks
+            variable = xr.Variable(
+                variable.dims,
+                indexing.LazilyIndexedArray(array),
+                attrs=variable.attrs,
+                encoding=variable.encoding,
+            ).isel({record_dim: slice(size)})
+            if dask_chunks is not None:
+                variable = variable.chunk(
+                    {
+                        dim: _resize_chunks(chunks, size)
+                        if dim == record_dim
+                        else chunks
+                        for dim, chunks in zip(variable.dims, dask_chunks, strict=True)
+                    }
+                )
+        elif set(variable.dims) & set(record_coords):
+            error_message = (
+                f"Cannot refresh {name!r}, which was loaded or indexed since the "
+                f"dataset was opened"
+            )
+            raise ValueError(error_message)
+        data_vars[name] = variable
+    coords = dataset.coords.drop_vars(list(record_coords)).assign(
+        get_coordinates(record_coords)
+    )
+    result = xr.Dataset(data_vars=data_vars, coords=coords, attrs=dataset.attrs)
+    result.set_close(dataset.close)
+    return result
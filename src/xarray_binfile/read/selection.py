@@ -0,0 +1,127 @@
+"""
+Selects the variables to open, before any read specification is computed.
+
+Directories often hold one file per variable and time step, so opening a few
+variables out of many is dominated by the files that are thrown away. Given the
+names of the variables in each file, from a cheap
+:class:`~xarray_binfile.read.file_metadata.VariableNamesGetterProtocol`, the
+excluded files are skipped before their read specifications are computed.
+"""
+
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from xarray_binfile.read.file_metadata import VariableNamesGetterProtocol
+
+
+def _as_names(names: str | Iterable[str]) -> frozenset[str]:
+    """
+    Converts a name or names to a set.
+
+    Args:
+        names: A name, or several names.
+
+    Returns:
+        The set of names.
+    """
+    if isinstance(names, str):
+        return frozenset((names,))
+    return frozenset(names)
+
+
+@dataclass(frozen=True)
+class VariableSelection:
+    """
+    Variables to open out of all variables available.
+
+    Attributes:
+        variables: Names of the variables to keep. Defaults to None, meaning all.
+        drop_variables: Names of the variables to drop. Defaults to none.
+
+    Examples:
+        >>> selection = VariableSelection.from_names(["ux", "uy"], "uy")
+        >>> "ux" in selection, "uy" in selection, "uz" in selection
+        (True, False, False)
+    """
+
+    variables: frozenset[str] | None = None
+    drop_variables: frozenset[str] = frozenset()
+
+    @classmethod
+    def from_names(
+        cls,
+        variables: str | Iterable[str] | None = None,
+        drop_variables: str | Iterable[str] | None = None,
+    ) -> "VariableSelection":
+        """
+        Creates the selection from names given by the user.
+
+        Args:
+            variables: Variables to keep, or None to keep all.
+            drop_variables: Variables to drop, or None to drop none.
+
+        Returns:
+            The selection of variables.
+        """
+        return cls(
+            variables=None if variables is None else _as_names(variables),
+            drop_variables=_as_names(drop_variables or ()),
+        )
+
+    def __contains__(self, name: object) -> bool:
+        """
+        Checks if a variable is selected.
+
+        Args:
+            name: Name of the variable.
+
+        Returns:
+            Whether the variable is kept.
+        """
+        return (
+            self.variables is None or name in self.variables
+        ) and name not in self.drop_variables
+
+    def includes_any(self, names: str | Iterable[str]) -> bool:
+        """
+        Checks if any of the variables in a file is selected.
+
+        Args:
+            names: Name of the variable in the file, or of each variable in it.
+
+        Returns:
+            Whether the file has to be opened.
+        """
+        return any(name in self for name in _as_names(names))
+
+
+def select_paths(
+    paths: Iterable[str | os.PathLike],
+    variable_names_getter: VariableNamesGetterProtocol,
+    variables: str | Iterable[str] | None = None,
+    drop_variables: str | Iterable[str] | None = None,
+) -> list[Path]:
+    """
+    Selects the binary files holding any of the selected variables.
+
+    The result can be given to ``xr.open_mfdataset``, so the excluded files are not
+    opened at all.
+
+    Args:
+        paths: Paths to the binary files.
+        variable_names_getter: A callable that gets the names of the variables in
+            each binary file from its path.
+        variables: Variables to keep. Defaults to None, meaning all.
+        drop_variables: Variables to drop. Defaults to None.
+
+    Returns:
+        The paths of the selected binary files, in order.
+    """
+    selection = VariableSelection.from_names(variables, drop_variables)
+    return [
+        Path(path)
+        for path in paths
+        if selection.includes_any(variable_names_getter(path=Path(path)))
+    ]
@@ -0,0 +1,477 @@
+"""
+Opens a series of homogeneous binary files as a single Xarray Dataset.
+
+Unlike ``xr.open_mfdataset``, no intermediate dataset is created per file and no
+alignment or combine step is performed, so the cost of opening the series grows
+only with the number of files.
+"""
+
+import asyncio
+import os
+from collections import defaultdict
+from collections.abc import Iterable, Mapping, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import xarray as xr
+from xarray.backends import BackendArray
+from xarray.core import indexing
+
+from xarray_binfile.read.array import BinaryEngineBackendArray, get_backend_arrays
+from xarray_binfile.read.byte_ranges import key_indices
+from xarray_binfile.read.chunks import (
+    DEFAULT_CHUNK_NBYTES,
+    get_alignment,
+    get_preferred_chunks,
+)
+from xarray_binfile.read.coordinates import (
+    concatenate_coords,
+    coords_equal,
+    get_coordinates,
+)
+from xarray_binfile.read.file_metadata import (
+    ReadSpecs,
+    ReadSpecsGetterProtocol,
+    VariableNamesGetterProtocol,
+)
+from xarray_binfile.read.overviews import select_overviews
+from xarray_binfile.read.selection import VariableSelection
+from xarray_binfile.read.statistics import STATISTICS, StatisticsBackendArray
+
+if TYPE_CHECKING:
+    from xarray_binfile.read.tiling import TiledBackendArray
+
+
+class StackedBackendArray(BackendArray):
+    """
+    Backend array stacking the arrays from several binary files along a dimension.
+
+    Attributes:
+        arrays: Backend arrays to stack, in order.
+        axis: Position of the stacking dimension.
+        dtype: Data type of the array.
+        shape: Shape of the array.
+    """
+
+    def __init__(
+        self,
+        arrays: Sequence["BinaryEngineBackendArray | TiledBackendArray"],
+        axis: int,
+    ):
+        """
+        Initializes the stacked backend array.
+
+        Args:
+            arrays: Backend arrays to stack, with the same data type and shape except
+                along `axis`.
+            axis: Position of the stacking dimension.
+        """
+        self.arrays = tuple(arrays)
+        self.axis = axis
+        sizes = [array.shape[axis] for array in self.arrays]
+        self._stops = np.cumsum(sizes)
+
+        # Attributes required by BackendArray
+        self.dtype = self.arrays[0].dtype
+        self.shape = (
+            *self.arrays[0].shape[:axis],
+            int(self._stops[-1]),
+            *self.arrays[0].shape[axis + 1 :],
+        )
+
+    def __getitem__(self, key: indexing.ExplicitIndexer) -> np.typing.ArrayLike:
+        """
+        Retrieves data from the array using explicit indexing.
+
+        Args:
+            key: Indexing key specifying the data to retrieve.
+
+        Returns:
+            The retrieved data.
+        """
+        return indexing.explicit_indexing_adapter(
+            key=key,
+            shape=self.shape,
+            indexing_support=indexing.IndexingSupport.OUTER,
+            raw_indexing_method=self._raw_indexing_method,
+        )
+
+    async def async_getitem(self, key: indexing.ExplicitIndexer) -> np.typing.ArrayLike:
+        """
+        Retrieves data from the array using explicit indexing, without blocking.
+
+        Args:
+            key: Indexing key specifying the data to retrieve.
+
+        Returns:
+            The retrieved data.
+        """
+        return await indexing.async_explicit_indexing_adapter(
+            key=key,
+            shape=self.shape,
+            indexing_support=indexing.IndexingSupport.OUTER,
+            raw_indexing_method=self._async_raw_indexing_method,
+        )
+
+    def _file_keys(self, key: tuple) -> list[tuple[int, indexing.OuterIndexer]]:
+        """
+        Splits an outer indexing key into the keys of the files it intersects.
+
+        Consecutive indices from the same file are read at once, keeping their order.
+
+        Args:
+            key: Outer indexing key, with slices, integers or 1-D integer arrays.
+
+        Returns:
+            Position of each file to read and its indexing key, in order.
+        """
+        indices = key_indices(key[self.axis], self.shape[self.axis])
+        file_ids = np.searchsorted(self._stops, indices, side="right")
+        splits = np.flatnonzero(np.diff(file_ids)) + 1
+        file_keys = []
+        for file_indices in np.split(np.arange(indices.size), splits):
+            if not file_indices.size:
+                continue
+            file_id = int(file_ids[file_indices[0]])
+            start = self._stops[file_id - 1] if file_id else 0
+            file_key = (
+                *key[: self.axis],
+                indices[file_indices] - start,
+                *key[self.axis + 1 :],
+            )
+            file_keys.append((file_id, indexing.OuterIndexer(file_key)))
+        return file_keys
+
+    def _stack(self, key: tuple, parts: list) -> np.typing.NDArray:
+        """
+        Stacks the data read from each file.
+
+        Args:
+            key: Outer indexing key, with slices, integers or 1-D integer arrays.
+            parts: Data read from each file intersecting the key, in order.
+
+        Returns:
+            The stacked data.
+        """
+        if not parts:
+            return np.empty(
+                tuple(
+                    key_indices(k, size).size
+                    for k, size in zip(key, self.shape, strict=True)
+                    if not isinstance(k, int | np.integer)
+                ),
+                dtype=self.dtype,
+            )
+        # integer keys before the stacking dimension drop their axes
+        axis = self.axis - sum(
+            isinstance(k, int | np.integer) for k in key[: self.axis]
+        )
+        result = np.concatenate(parts, axis=axis)
+        if isinstance(key[self.axis], int | np.integer):
+            return result.squeeze(axis=axis)
+        return result
+
+    def _raw_indexing_method(self, key: tuple) -> np.typing.NDArray:
+        """
+        Reads the requested data from each file intersecting the key.
+
+        Args:
+            key: Outer indexing key, with slices, integers or 1-D integer arrays.
+
+        Returns:
+            The data read from the binary files.
+        """
+        parts = [
+            self.arrays[file_id][file_key] for file_id, file_key in self._file_keys(key)
+        ]
+        return self._stack(key, parts)
+
+    async def _async_raw_indexing_method(self, key: tuple) -> np.typing.NDArray:
+        """
+        Reads the requested data from each file intersecting the key concurrently.
+
+        Args:
+            key: Outer indexing key, with slices, integers or 1-D integer arrays.
+
+        Returns:
+            The data read from the binary files.
+        """
+        parts = await asyncio.gather(
+            *(
+                self.arrays[file_id].async_getitem(file_key)
+                for file_id, file_key in self._file_keys(key)
+            )
+        )
+        return self._stack(key, list(parts))
+
+    def refresh(self) -> "StackedBackendArray":
+        """
+        Gets the stacked backend array with the records found in the last file now.
+
+        Returns:
+            A stacked backend array with the records of the last file, or this one
+            if their number did not change.
+        """
+        last = self.arrays[-1].refresh()
+        if last is self.arrays[-1]:
+            return self
+        return StackedBackendArray((*self.arrays[:-1], last), self.axis)
+
+
+def _stacking_key(specs: ReadSpecs, dim: str) -> tuple[bool, Any]:
+    """
+    Gets the key sorting read specifications by their first value along a dimension.
+
+    Arrays empty along the dimension, like a file without records yet being
+    appended to, are sorted last.
+
+    Args:
+        specs: Metadata describing an array to stack.
+        dim: Name of the stacking dimension.
+
+    Returns:
+        Whether the array is empty along `dim`, then its first value along it, or
+        None if it is empty.
+    """
+    values = np.asarray(specs.coords[dim])
+    if not values.size:
+        return True, None
+    return False, values[0]
+
+
+def _check_homogeneous(read_specs: Sequence[ReadSpecs], dim: str) -> None:
+    """
+    Checks that read specifications can be stacked along a dimension.
+
+    Args:
+        read_specs: Metadata describing each array to stack.
+        dim: Name of the stacking dimension.
+
+    Raises:
+        ValueError: If any array differs from the first one in data type on disk or
+            in memory, dimensions, storage order or coordinates other than `dim`.
+    """
+    first = read_specs[0]
+    if dim not in first.dims:
+        error_message = f"{first.name!r} has no dimension {dim!r}, got {first.dims}"
+        raise ValueError(error_message)
+    for specs in read_specs[1:]:
+        if (
+            np.dtype(specs.dtype) != np.dtype(first.dtype)
+            or specs.output_dtype != first.output_dtype
+            or specs.dims != first.dims
+            or specs.storage_order != first.storage_order
+        ):
+            error_message = (
+                f"Cannot stack {specs.filepath} with {first.filepath}: expected "
+                f"dtype {np.dtype(first.dtype)}, output dtype {first.output_dtype}, "
+                f"dims {first.dims} and storage order {first.storage_order}, got "
+                f"dtype {np.dtype(specs.dtype)}, output dtype {specs.output_dtype}, "
+                f"dims {specs.dims} and storage order {specs.storage_order}"
+            )
+            raise ValueError(error_message)
+        for name, coord in first.coords.items():
+            if name != dim and not coords_equal(specs.coords[name], coord):
+                error_message = (
+                    f"Cannot stack {specs.filepath} with {first.filepath}: "
+                    f"coordinate {name!r} differs"
+                )
+                raise ValueError(error_message)
+
+
+def _collect_read_specs(
+    paths: Iterable[str | os.PathLike],
+    read_specs_getter: ReadSpecsGetterProtocol,
+    dim: str,
+    variables: str | Iterable[str] | None = None,
+    variable_names_getter: VariableNamesGetterProtocol | None = None,
+    resolution: Mapping[str, int] | None = None,
+) -> tuple[dict[str, list[ReadSpecs]], Any]:
+    """
+    Computes the read specifications of a series of files, grouped by variable.
+
+    Args:
+        paths: Paths to the binary files.
+        read_specs_getter: A callable that generates read specifications for each
+            binary file, or for each variable packed into it.
+        dim: Name of the dimension that varies from file to file.
+        variables: Variables to keep. Defaults to None, meaning all.
+        variable_names_getter: A callable that gets the names of the variables in
+            each binary file from its path alone. Defaults to None.
+        resolution: Smallest number of values needed along some dimensions, to
+            read the coarsest overview levels with as many. Defaults to None.
+
+    Returns:
+        The read specifications of each variable, sorted along `dim`, and the
+        values of `dim` shared by all variables.
+
+    Raises:
+        ValueError: If no file is given, or if the files are not homogeneous.
+    """
+    selection = VariableSelection.from_names(variables)
+    read_specs: dict[str, list[ReadSpecs]] = defaultdict(list)
+    for path in paths:
+        if variable_names_getter is not None and not selection.includes_any(
+            variable_names_getter(path=Path(path))
+        ):
+            continue
+        file_metadata = read_specs_getter(path=Path(path))
+        if isinstance(file_metadata, ReadSpecs):
+            file_metadata = (file_metadata,)
+        for metadata in select_overviews(file_metadata, resolution):
+            if metadata.name in selection:
+                read_specs[metadata.name].append(metadata)
+    if not read_specs:
+        error_message = "No binary files to open"
+        raise ValueError(error_message)
+
+    stack_coord = None
+    for name, variable_specs in read_specs.items():
+        _check_homogeneous(variable_specs, dim)
+        variable_specs.sort(key=lambda specs: _stacking_key(specs, dim))
+        variable_coord = concatenate_coords(
+            specs.coords[dim] for specs in variable_specs
+        )
+        if stack_coord is None:
+            stack_coord = variable_coord
+        elif not coords_equal(stack_coord, variable_coord):
+            error_message = f"Variable {name!r} has different values along {dim!r}"
+            raise ValueError(error_message)
+
+    return read_specs, stack_coord
+
+
+def _split_files(sizes: Iterable[tuple[int, int]]) -> tuple[int, ...]:
+    """
+    Gets the chunks along the stacking dimension, so none spans more than one file.
+
+    Args:
+        sizes: Size of each file along the dimension, and its preferred chunk size.
+
+    Returns:
+        The size of each chunk.
+
+    Examples:
+        >>> _split_files([(5, 2), (3, 3), (0, 0), (4, 4)])
+        (2, 2, 1, 3, 4)
+    """
+    chunks: list[int] = []
+    for size, chunk in sizes:
+        if not size:
+            continue
+        chunks += [chunk] * (size // chunk)
+        if size % chunk:
+            chunks.append(size % chunk)
+    return tuple(chunks) or (0,)
+
+
+def open_binfile_series(
+    paths: Iterable[str | os.PathLike],
+    read_specs_getter: ReadSpecsGetterProtocol,
+    dim: str = "time",
+    chunk_nbytes: int = DEFAULT_CHUNK_NBYTES,
+    variables: str | Iterable[str] | None = None,
+    variable_names_getter: VariableNamesGetterProtocol | None = None,
+    statistics: bool = False,
+    resolution: Mapping[str, int] | None = None,
+) -> xr.Dataset:
+    """
+    Opens a series of homogeneous binary files as a single lazily indexed Dataset.
+
+    The read specifications of each file are computed once and checked against the
+    first file of the same variable, then the files are stacked along `dim`, sorted
+    by its coordinate values. All variables must have the same values along `dim`.
+
+    Args:
+        paths: Paths to the binary files.
+        read_specs_getter: A callable that generates read specifications for each
+            binary file, or for each variable packed into it.
+        dim: Name of the dimension that varies from file to file. Defaults to "time".
+        chunk_nbytes: Target size in bytes of the preferred chunks, that never span
+            more than one file. Defaults to 128 MiB.
+        variables: Variables to open. Defaults to None, meaning all.
+        variable_names_getter: A callable that gets the names of the variables in
+            each binary file from its path alone, so the files without any of
+            `variables` are skipped before computing their read specifications.
+            Defaults to None.
+        statistics: Whether to add the statistics saved by ``to_file`` with
+            ``statistics=True`` as coordinates along `dim`, like ``ux_max``. They
+            are read from the sidecars of the selected files only when loaded, and
+            are NaN for files without them. Defaults to False.
+        resolution: Smallest number of values needed along some dimensions, like
+            the pixels of a plot. The coarsest overview level of each binary file
+            with at least as many values is opened instead, for the files with
+            overviews. Defaults to None, meaning the full resolution.
+
+    Returns:
+        The opened Xarray dataset.
+
+    Raises:
+        ValueError: If no file is given, or if the files are not homogeneous.
+    """
+    read_specs, stack_coord = _collect_read_specs(
+        paths, read_specs_getter, dim, variables, variable_names_getter, resolution
+    )
+
+    # variables packed into the same file share a single memory map
+    all_arrays = get_backend_arrays(
+        specs for variable_specs in read_specs.values() for specs in variable_specs
+    )
+    data_vars = {}
+    coords: dict = {}
+    statistics_coords: dict[str, xr.Variable] = {}
+    start = 0
+    for name, variable_specs in read_specs.items():
+        first = variable_specs[0]
+        stacked = StackedBackendArray(
+            all_arrays[start : start + len(variable_specs)],
+            axis=first.dims.index(dim),
+        )
+        start += len(variable_specs)
+        preferred_chunks: dict[str, int | tuple[int, ...]] = {}
+        preferred_chunks |= get_preferred_chunks(
+            first, chunk_nbytes, get_alignment(Path(first.filepath).parent)
+        )
+        # files may have different lengths along dim, so each one is split on its own
+        preferred_chunks[dim] = _split_files(
+            (
+                specs.shape[specs.dims.index(dim)],
+                get_preferred_chunks(
+                    specs, chunk_nbytes, get_alignment(Path(specs.filepath).parent)
+                )[dim],
+            )
+            for specs in variable_specs
+        )
+        data_vars[name] = xr.Variable(
+            first.dims,
+            indexing.LazilyIndexedArray(stacked),
+            encoding={"preferred_chunks": preferred_chunks},
+        )
+        coords |= first.coords
+        if statistics:
+            sizes = [specs.shape[specs.dims.index(dim)] for specs in variable_specs]
+            filepaths = [Path(specs.filepath) for specs in variable_specs]
+            statistics_coords |= {
+                f"{name}_{statistic}": xr.Variable(
+                    (dim,),
+                    indexing.LazilyIndexedArray(
+                        StatisticsBackendArray(filepaths, sizes, statistic)
+                    ),
+                )
+                for statistic in STATISTICS
+            }
+    coords[dim] = stack_coord
+
+    dataset = xr.Dataset(
+        data_vars=data_vars,
+        coords=get_coordinates(coords),
+        attrs=all_arrays[0].metadata.attrs,
+    ).assign_coords(statistics_coords)
+
+    def close() -> None:
+        for array in all_arrays:
+            array._file_manager.close()
+
+    dataset.set_close(close)
+    return dataset
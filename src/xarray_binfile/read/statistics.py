@@ -0,0 +1,225 @@
+"""
+Keeps summary statistics of each binary file in a small sidecar file.
+
+The statistics are computed when the file is written, while its data is already
+in memory, and saved next to it as ``<filename>.stats.json``. Reading them back
+costs a tiny read per file, so quick looks and range queries, like the time steps
+where the maximum of a variable exceeds a threshold, never touch the raw data.
+"""
+
+import json
+import os
+import threading
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+from xarray.backends import BackendArray
+from xarray.core import indexing
+
+STATISTICS_VERSION = 1
+"""Version of the layout of the sidecar files, bumped on incompatible changes."""
+
+STATISTICS = ("min", "max", "mean", "count")
+"""Names of the statistics kept for each binary file."""
+
+
+@dataclass(frozen=True)
+class FileStatistics:
+    """
+    Summary statistics of the data in a binary file.
+
+    Attributes:
+        count: Number of values.
+        min: Smallest value.
+        max: Largest value.
+        mean: Mean of the values.
+
+    Examples:
+        >>> first = FileStatistics.from_array(np.array([1.0, 2.0]))
+        >>> first.merge(FileStatistics.from_array(np.array([6.0])))
+        FileStatistics(count=3, min=1.0, max=6.0, mean=3.0)
+    """
+
+    count: int
+    min: float
+    max: float
+    mean: float
+
+    @classmethod
+    def from_array(cls, data: np.typing.NDArray) -> "FileStatistics | None":
+        """
+        Computes the statistics of an array.
+
+        Args:
+            data: The array written to the binary file.
+
+        Returns:
+            The statistics, or None if the data is not numeric, like structured.
+        """
+        if data.dtype.kind not in "biuf":
+            return None
+        if not data.size:
+            return cls(0, np.nan, np.nan, np.nan)
+        return cls(
+            count=data.size,
+            min=float(data.min()),
+            max=float(data.max()),
+            mean=float(data.mean(dtype=np.float64)),
+        )
+
+    def merge(self, other: "FileStatistics") -> "FileStatistics":
+        """
+        Merges the statistics of two disjoint sets of values, like appended records.
+
+        Args:
+            other: Statistics of the other values.
+
+        Returns:
+            The statistics of all values.
+        """
+        if not other.count:
+            return self
+        if not self.count:
+            return other
+        count = self.count + other.count
+        return FileStatistics(
+            count=count,
+            min=min(self.min, other.min),
+            max=max(self.max, other.max),
+            mean=self.mean + (other.mean - self.mean) * (other.count / count),
+        )
+
+    @staticmethod
+    def sidecar_path(filepath: str | os.PathLike[str]) -> Path:
+        """
+        Gets the path to the statistics of a binary file.
+
+        Args:
+            filepath: Path to the binary file.
+
+        Returns:
+            Path to the sidecar file.
+
+        Examples:
+            >>> FileStatistics.sidecar_path("data/ux-0001.bin").name
+            'ux-0001.bin.stats.json'
+        """
+        filepath = Path(filepath)
+        return filepath.with_name(f"{filepath.name}.stats.json")
+
+    def save(self, filepath: str | os.PathLike[str]) -> None:
+        """
+        Writes the statistics of a binary file to its sidecar, replacing it atomically.
+
+        Args:
+            filepath: Path to the binary file.
+        """
+        sidecar_path = self.sidecar_path(filepath)
+        temporary_path = sidecar_path.with_name(
+            f".{sidecar_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        with open(temporary_path, "w") as file:
+            json.dump({"version": STATISTICS_VERSION, **asdict(self)}, file)
+        os.replace(temporary_path, sidecar_path)
+
+    @classmethod
+    def remove(cls, filepath: str | os.PathLike[str]) -> None:
+        """
+        Removes the statistics of a binary file, if any, like when they are outdated.
+
+        Args:
+            filepath: Path to the binary file.
+        """
+        cls.sidecar_path(filepath).unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, filepath: str | os.PathLike[str]) -> "FileStatistics | None":
+        """
+        Reads the statistics of a binary file from its sidecar.
+
+        Args:
+            filepath: Path to the binary file.
+
+        Returns:
+            The statistics, or None if the file has no sidecar or it was written by
+            an incompatible version.
+        """
+        try:
+            with open(cls.sidecar_path(filepath)) as file:
+                content = json.load(file)
+        except FileNotFoundError:
+            return None
+        if content.pop("version", None) != STATISTICS_VERSION:
+            return None
+        return cls(**content)
+
+
+class StatisticsBackendArray(BackendArray):
+    """
+    Backend array of a statistic of binary files, along the dimension they stack on.
+
+    Only the sidecars of the selected entries are read, when they are indexed.
+    Entries of files without statistics are NaN.
+
+    Attributes:
+        filepaths: Paths to the binary files, in order.
+        statistic: Name of the statistic, one of `STATISTICS`.
+        dtype: Data type of the array.
+        shape: Shape of the array.
+    """
+
+    def __init__(self, filepaths: Sequence[Path], sizes: Sequence[int], statistic: str):
+        """
+        Initializes the backend array.
+
+        Args:
+            filepaths: Paths to the binary files, in order.
+            sizes: Number of entries of each file along the stacking dimension, that
+                all share the statistics of their file.
+            statistic: Name of the statistic, one of `STATISTICS`.
+        """
+        self.filepaths = tuple(filepaths)
+        self.statistic = statistic
+        self._file_ids = np.repeat(np.arange(len(self.filepaths)), sizes)
+
+        # Attributes required by BackendArray
+        self.dtype = np.dtype(np.float64)
+        self.shape = self._file_ids.shape
+
+    def __getitem__(self, key: indexing.ExplicitIndexer) -> np.typing.ArrayLike:
+        """
+        Retrieves the statistic of the selected entries.
+
+        Args:
+            key: Indexing key specifying the data to retrieve.
+
+        Returns:
+            The retrieved data.
+        """
+        return indexing.explicit_indexing_adapter(
+            key=key,
+            shape=self.shape,
+            indexing_support=indexing.IndexingSupport.OUTER,
+            raw_indexing_method=self._raw_indexing_method,
+        )
+
+    def _raw_indexing_method(self, key: tuple) -> np.typing.NDArray:
+        """
+        Reads the sidecars of the files holding the selected entries.
+
+        Args:
+            key: Outer indexing key, with a slice, an integer or a 1-D integer array.
+
+        Returns:
+            The statistic of each selected entry.
+        """
+        file_ids = self._file_ids[key]
+        unique_ids, inverse = np.unique(file_ids, return_inverse=True)
+        values = np.full(unique_ids.size, np.nan)
+        for i, file_id in enumerate(unique_ids):
+            statistics = FileStatistics.load(self.filepaths[file_id])
+            if statistics is not None:
+                values[i] = getattr(statistics, self.statistic)
+        return values[inverse].reshape(np.shape(file_ids))
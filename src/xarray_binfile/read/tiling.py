@@ -0,0 +1,627 @@
+"""
+Reads arrays split into N-dimensional tiles, each one stored in its own file.
+
+A manifest holds everything needed to read the tiles back as a single array: the
+dimensions, the shape of the whole array and of each tile, the data type on disk
+and the coordinates. Tiles lie on a regular grid, and the last tile along each
+dimension may be smaller. The manifest only depends on the array being tiled, so
+independent writers, one per tile, write the same manifest without coordination.
+
+The manifest is a NumPy ``.npz`` archive, with a JSON header and one array per
+coordinate, and its tiles are stored next to it.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import threading
+from collections import defaultdict
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import xarray as xr
+from xarray.backends import BackendArray
+from xarray.core import indexing
+
+from xarray_binfile.read.array import get_backend_arrays
+from xarray_binfile.read.byte_ranges import key_indices
+from xarray_binfile.read.file_metadata import ReadSpecs
+from xarray_binfile.read.index import _as_descr
+from xarray_binfile.read.series import StackedBackendArray
+from xarray_binfile.typing import AttributesLike, DTypeLike
+
+MANIFEST_VERSION = 1
+
+
+@dataclass(frozen=True)
+class TileManifest:
+    """
+    Layout of an array split into tiles.
+
+    Attributes:
+        name: Name of the array.
+        dims: Dimensions of the array.
+        shape: Shape of the whole array.
+        tile_shape: Largest shape of each tile.
+        dtype: Data type of the tiles on disk.
+        coords: Coordinates of the array, either along one of its dimensions or
+            scalar.
+        attrs: Attributes of the array. Defaults to None.
+        compression: Name of the codec of block-compressed tiles. Defaults to None,
+            meaning the tiles are not compressed.
+        memory_dtype: Data type of the array in memory. Defaults to None, meaning
+            the same as `dtype`.
+        storage_dims: Dimensions in the order they are stored in each tile. Defaults
+            to None, meaning the order of `dims`.
+        record_dim: Dimension whose entries are stored as separate records in each
+            tile. Defaults to None, meaning each tile is a single record.
+        record_marker_size: Size in bytes of the markers written before and after
+            each record of the tiles. Defaults to 0.
+    """
+
+    name: str
+    dims: tuple[str, ...]
+    shape: tuple[int, ...]
+    tile_shape: tuple[int, ...]
+    dtype: DTypeLike
+    coords: Mapping[str, np.typing.NDArray]
+    attrs: AttributesLike | None = None
+    compression: str | None = None
+    memory_dtype: DTypeLike | None = None
+    storage_dims: tuple[str, ...] | None = None
+    record_dim: str | None = None
+    record_marker_size: int = 0
+
+    def __post_init__(self):
+        """
+        Validates the shape of the tiles.
+
+        Raises:
+            ValueError: If the tile shape does not match the dimensions or is not
+                positive.
+        """
+        if (
+            len(self.tile_shape) != len(self.dims)
+            or min(self.tile_shape, default=1) < 1
+        ):
+            error_message = (
+                f"Invalid tile shape {self.tile_shape} for dimensions {self.dims}"
+            )
+            raise ValueError(error_message)
+
+    @cached_property
+    def grid_shape(self) -> tuple[int, ...]:
+        """
+        Number of tiles along each dimension.
+
+        Returns:
+            The shape of the grid of tiles.
+
+        Examples:
+            >>> manifest = TileManifest(
+            ...     "ux", ("x", "y"), (100, 64), (32, 64), "<f8", coords={}
+            ... )
+            >>> manifest.grid_shape
+            (4, 1)
+        """
+        return tuple(
+            -(-size // tile_size)
+            for size, tile_size in zip(self.shape, self.tile_shape, strict=True)
+        )
+
+    def tile_indices(self) -> Iterator[tuple[int, ...]]:
+        """
+        Iterates over the position of each tile in the grid, in C order.
+
+        Yields:
+            The position of each tile.
+        """
+        yield from itertools.product(*map(range, self.grid_shape))
+
+    def tile_slices(self, tile_index: tuple[int, ...]) -> tuple[slice, ...]:
+        """
+        Gets the region of the array stored in a tile.
+
+        Args:
+            tile_index: Position of the tile in the grid.
+
+        Returns:
+            The slice of the array along each dimension.
+        """
+        return tuple(
+            slice(index * tile_size, min((index + 1) * tile_size, size))
+            for index, tile_size, size in zip(
+                tile_index, self.tile_shape, self.shape, strict=True
+            )
+        )
+
+    @staticmethod
+    def tile_filename(filename: str, tile_index: tuple[int, ...]) -> str:
+        """
+        Gets the name of the file storing a tile.
+
+        Args:
+            filename: Name of the manifest.
+            tile_index: Position of the tile in the grid.
+
+        Returns:
+            The name of the tile, next to the manifest.
+
+        Examples:
+            >>> TileManifest.tile_filename("ux-0001.npz", (0, 2, 1))
+            'ux-0001.0.2.1.bin'
+            >>> TileManifest.tile_filename("ux.0001.npz", (0, 2, 1))
+            'ux.0001.0.2.1.bin'
+        """
+        name = ".".join((Path(filename).stem, *map(str, tile_index), "bin"))
+        return str(Path(filename).with_name(name))
+
+    def save(self, filepath: str | os.PathLike[str]) -> None:
+        """
+        Writes the manifest to a file, replacing it atomically.
+
+        The attributes must be serializable to JSON.
+
+        Args:
+            filepath: Path to the manifest, usually with the ``.npz`` suffix.
+        """
+        header = {
+            "version": MANIFEST_VERSION,
+            "name": self.name,
+            "dims": self.dims,
+            "shape": self.shape,
+            "tile_shape": self.tile_shape,
+            "dtype": np.lib.format.dtype_to_descr(np.dtype(self.dtype)),
+            "coords": list(self.coords),
+            "attrs": self.attrs,
+            "compression": self.compression,
+            "memory_dtype": None
+            if self.memory_dtype is None
+            else np.lib.format.dtype_to_descr(np.dtype(self.memory_dtype)),
+            "storage_dims": self.storage_dims,
+            "record_dim": self.record_dim,
+            "record_marker_size": self.record_marker_size,
+        }
+        arrays = {
+            f"coord_{i}": np.asarray(values)
+            for i, values in enumerate(self.coords.values())
+        }
+        filepath = Path(filepath)
+        # each writer uses its own temporary file, and all of them write the same data
+        temporary_path = filepath.with_name(
+            f".{filepath.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        with open(temporary_path, "wb") as file:
+            np.savez(file, header=np.array(json.dumps(header)), **arrays)  # type: ignore[arg-type]
+        os.replace(temporary_path, filepath)
+
+    @classmethod
+    def load(cls, filepath: str | os.PathLike[str]) -> "TileManifest":
+        """
+        Reads a manifest from a file.
+
+        Args:
+            filepath: Path to the manifest.
+
+        Returns:
+            The layout of the tiled array.
+
+        Raises:
+            ValueError: If the manifest was written by an incompatible version.
+        """
+        with np.load(filepath, allow_pickle=False) as archive:
+            header: dict[str, Any] = json.loads(str(archive["header"]))
+            if header.get("version") != MANIFEST_VERSION:
+                error_message = (
+                    f"Unsupported manifest version {header.get('version')!r} in "
+                    f"{filepath}, expected {MANIFEST_VERSION}"
+                )
+                raise ValueError(error_message)
+            coords = {
+                name: archive[f"coord_{i}"] for i, name in enumerate(header["coords"])
+            }
+        return cls(
+            name=header["name"],
+            dims=tuple(header["dims"]),
+            shape=tuple(header["shape"]),
+            tile_shape=tuple(header["tile_shape"]),
+            dtype=np.lib.format.descr_to_dtype(_as_descr(header["dtype"])),
+            coords=coords,
+            attrs=header["attrs"],
+            compression=header["compression"],
+            memory_dtype=None
+            if header["memory_dtype"] is None
+            else np.lib.format.descr_to_dtype(_as_descr(header["memory_dtype"])),
+            storage_dims=None
+            if header["storage_dims"] is None
+            else tuple(header["storage_dims"]),
+            record_dim=header.get("record_dim"),
+            record_marker_size=header.get("record_marker_size", 0),
+        )
+
+
+AxisGroup = tuple[int, np.typing.NDArray[np.intp] | slice, slice]
+"""Position of a tile along an axis, its indices, and their place in the result."""
+
+
+class TiledBackendArray(BackendArray):
+    """
+    Backend array reading the tiles of an array, each one stored in its own file.
+
+    Only the tiles intersecting a selection are read, each one into its place in
+    the result.
+
+    Attributes:
+        manifest: Layout of the tiles.
+        dims: Dimensions of the array.
+        tile_shape: Largest shape of each tile.
+        tiles: Backend array of each tile, by its position in the grid.
+        dtype: Data type of the array.
+        shape: Shape of the array.
+    """
+
+    def __init__(
+        self,
+        manifest: TileManifest,
+        filepath: str | os.PathLike[str],
+        stack_dim: str | None = None,
+    ):
+        """
+        Initializes the tiled backend array.
+
+        Args:
+            manifest: Layout of the tiles.
+            filepath: Path to the manifest, next to the tiles.
+            stack_dim: Name of a scalar coordinate of the manifest, added as a
+                trailing dimension of size one, so arrays from several manifests are
+                stacked along it. Defaults to None, meaning no dimension is added.
+        """
+        self.manifest = manifest
+        self.dims = manifest.dims
+        self.tile_shape = manifest.tile_shape
+        extra_coords: dict[str, range] = {}
+        if stack_dim is not None:
+            self.dims = (*self.dims, stack_dim)
+            self.tile_shape = (*self.tile_shape, 1)
+            extra_coords[stack_dim] = range(1)
+        tile_indices = list(manifest.tile_indices())
+        arrays = get_backend_arrays(
+            _get_tile_read_specs(manifest, Path(filepath), tile_index, extra_coords)
+            for tile_index in tile_indices
+        )
+        self.tiles = {
+            (*tile_index, *(0 for _ in extra_coords)): array
+            for tile_index, array in zip(tile_indices, arrays, strict=True)
+        }
+
+        # Attributes required by BackendArray
+        self.dtype = arrays[0].dtype
+        self.shape = (*manifest.shape, *(1 for _ in extra_coords))
+
+    def __getitem__(self, key: indexing.ExplicitIndexer) -> np.typing.ArrayLike:
+        """
+        Retrieves data from the array using explicit indexing.
+
+        Args:
+            key: Indexing key specifying the data to retrieve.
+
+        Returns:
+            The retrieved data.
+        """
+        return indexing.explicit_indexing_adapter(
+            key=key,
+            shape=self.shape,
+            indexing_support=indexing.IndexingSupport.OUTER,
+            raw_indexing_method=self._raw_indexing_method,
+        )
+
+    async def async_getitem(self, key: indexing.ExplicitIndexer) -> np.typing.ArrayLike:
+        """
+        Retrieves data from the array using explicit indexing, without blocking.
+
+        Args:
+            key: Indexing key specifying the data to retrieve.
+
+        Returns:
+            The retrieved data.
+        """
+        return await indexing.async_explicit_indexing_adapter(
+            key=key,
+            shape=self.shape,
+            indexing_support=indexing.IndexingSupport.OUTER,
+            raw_indexing_method=self._async_raw_indexing_method,
+        )
+
+    def _axis_groups(self, axis: int, k: int | slice | np.ndarray) -> list[AxisGroup]:
+        """
+        Splits the key along an axis into the tiles it intersects.
+
+        Consecutive indices from the same tile are read at once, keeping their order.
+
+        Args:
+            axis: Position of the axis.
+            k: Key along the axis.
+
+        Returns:
+            Position of each tile, the indices to read from it, and where they go in
+            the result, in order.
+        """
+        tile_size = self.tile_shape[axis]
+        indices = key_indices(k, self.shape[axis])
+        tile_ids = indices // tile_size
+        splits = np.flatnonzero(np.diff(tile_ids)) + 1
+        groups: list[AxisGroup] = []
+        for positions in np.split(np.arange(indices.size), splits):
+            if not positions.size:
+                continue
+            tile_id = int(tile_ids[positions[0]])
+            local = indices[positions] - tile_id * tile_size
+            tile_key: np.typing.NDArray[np.intp] | slice = local
+            if np.array_equal(local, np.arange(local[0], local[0] + local.size)):
+                # contiguous indices are read as a slice, without any fancy indexing
+                tile_key = slice(int(local[0]), int(local[0]) + local.size)
+            groups.append(
+                (tile_id, tile_key, slice(int(positions[0]), int(positions[-1]) + 1))
+            )
+        return groups
+
+    def _tile_keys(
+        self, key: tuple
+    ) -> tuple[
+        tuple[int, ...], list[tuple[tuple[int, ...], indexing.OuterIndexer, tuple]]
+    ]:
+        """
+        Splits an outer indexing key into the keys of the tiles it intersects.
+
+        Args:
+            key: Outer indexing key, with slices, integers or 1-D integer arrays.
+
+        Returns:
+            The shape of the result, before dropping the axes of integer keys, and
+            the position of each tile to read, its indexing key and where its data
+            goes in the result.
+        """
+        axis_groups = [self._axis_groups(axis, k) for axis, k in enumerate(key)]
+        shape = tuple(
+            key_indices(k, size).size for k, size in zip(key, self.shape, strict=True)
+        )
+        tile_keys = []
+        for groups in itertools.product(*axis_groups):
+            tile_index = tuple(group[0] for group in groups)
+            tile_key = indexing.OuterIndexer(tuple(group[1] for group in groups))
+            tile_keys.append(
+                (tile_index, tile_key, tuple(group[2] for group in groups))
+            )
+        return shape, tile_keys
+
+    def _assemble(
+        self, key: tuple, shape: tuple[int, ...], regions: list[tuple], parts: list
+    ) -> np.typing.NDArray:
+        """
+        Places the data read from each tile into the result.
+
+        Args:
+            key: Outer indexing key, with slices, integers or 1-D integer arrays.
+            shape: Shape of the result, before dropping the axes of integer keys.
+            regions: Place of the data of each tile in the result.
+            parts: Data read from each tile.
+
+        Returns:
+            The assembled data.
+        """
+        result = np.empty(shape, dtype=self.dtype)
+        for region, part in zip(regions, parts, strict=True):
+            result[region] = part
+        return result.squeeze(
+            axis=tuple(
+                axis for axis, k in enumerate(key) if isinstance(k, int | np.integer)
+            )
+        )
+
+    def _raw_indexing_method(self, key: tuple) -> np.typing.NDArray:
+        """
+        Reads the requested data from each tile intersecting the key.
+
+        Args:
+            key: Outer indexing key, with slices, integers or 1-D integer arrays.
+
+        Returns:
+            The data read from the tiles.
+        """
+        shape, tile_keys = self._tile_keys(key)
+        parts = [
+            self.tiles[tile_index][tile_key] for tile_index, tile_key, _ in tile_keys
+        ]
+        return self._assemble(key, shape, [region for *_, region in tile_keys], parts)
+
+    async def _async_raw_indexing_method(self, key: tuple) -> np.typing.NDArray:
+        """
+        Reads the requested data from each tile intersecting the key concurrently.
+
+        Args:
+            key: Outer indexing key, with slices, integers or 1-D integer arrays.
+
+        Returns:
+            The data read from the tiles.
+        """
+        shape, tile_keys = self._tile_keys(key)
+        parts = await asyncio.gather(
+            *(
+                self.tiles[tile_index].async_getitem(tile_key)
+                for tile_index, tile_key, _ in tile_keys
+            )
+        )
+        return self._assemble(
+            key, shape, [region for *_, region in tile_keys], list(parts)
+        )
+
+    def refresh(self) -> "TiledBackendArray":
+        """
+        Gets the tiled backend array as of now, since tiles have no records to append.
+
+        Returns:
+            This tiled backend array.
+        """
+        return self
+
+    def close(self) -> None:
+        """
+        Closes the files of all tiles.
+        """
+        for array in self.tiles.values():
+            array._file_manager.close()
+
+
+def _get_tile_read_specs(
+    manifest: TileManifest,
+    filepath: Path,
+    tile_index: tuple[int, ...],
+    extra_coords: dict[str, range],
+) -> ReadSpecs:
+    """
+    Gets the read specifications of a tile.
+
+    Args:
+        manifest: Layout of the tiles.
+        filepath: Path to the manifest, next to the tiles.
+        tile_index: Position of the tile in the grid.
+        extra_coords: Trailing dimensions of size one added to the tile.
+
+    Returns:
+        Metadata for reading the tile.
+    """
+    slices = manifest.tile_slices(tile_index)
+    storage_dims = manifest.storage_dims
+    if storage_dims is not None:
+        storage_dims = (*storage_dims, *extra_coords)
+    return ReadSpecs(
+        filepath=Path(TileManifest.tile_filename(str(filepath), tile_index)),
+        dtype=manifest.dtype,
+        coords={
+            dim: range(region.start, region.stop)
+            for dim, region in zip(manifest.dims, slices, strict=True)
+        }
+        | extra_coords,
+        name=manifest.name,
+        compression=manifest.compression,
+        memory_dtype=manifest.memory_dtype,
+        storage_dims=storage_dims,
+        record_dim=manifest.record_dim,
+        record_marker_size=manifest.record_marker_size,
+    )
+
+
+def open_binfile_tiles(
+    paths: Iterable[str | os.PathLike[str]], dim: str = "time"
+) -> xr.Dataset:
+    """
+    Opens tiled arrays, from their manifests, as a single lazily indexed Dataset.
+
+    Manifests of the same variable are stacked along `dim`, sorted by its coordinate
+    values, either an existing dimension or a scalar coordinate of each manifest,
+    like the time step of each file. The preferred chunks of each variable are its
+    tiles.
+
+    Args:
+        paths: Paths to the manifests.
+        dim: Name of the dimension that varies from manifest to manifest. Defaults
+            to "time".
+
+    Returns:
+        The opened Xarray dataset.
+
+    Raises:
+        ValueError: If no manifest is given, or if the manifests of a variable
+            cannot be stacked.
+    """
+    arrays: dict[str, list[TiledBackendArray]] = defaultdict(list)
+    for path in paths:
+        manifest = TileManifest.load(path)
+        stack_dim = None
+        if dim not in manifest.dims and np.ndim(manifest.coords.get(dim, [])) == 0:
+            stack_dim = dim
+        arrays[manifest.name].append(TiledBackendArray(manifest, path, stack_dim))
+    if not arrays:
+        error_message = "No tiled arrays to open"
+        raise ValueError(error_message)
+
+    data_vars = {}
+    coords: dict = {}
+    all_arrays = [array for name_arrays in arrays.values() for array in name_arrays]
+    for name, name_arrays in arrays.items():
+        name_arrays.sort(
+            key=lambda array: np.ravel(array.manifest.coords.get(dim, 0))[0]
+        )
+        _check_stackable(name, name_arrays, dim)
+        first = name_arrays[0]
+        backend_array: BackendArray = first
+        if len(name_arrays) > 1:
+            backend_array = StackedBackendArray(name_arrays, axis=first.dims.index(dim))
+        data_vars[name] = xr.Variable(
+            first.dims,
+            indexing.LazilyIndexedArray(backend_array),
+            attrs=first.manifest.attrs,
+            encoding={
+                "preferred_chunks": dict(zip(first.dims, first.tile_shape, strict=True))
+            },
+        )
+        coords |= {
+            coord_name: values
+            for coord_name, values in first.manifest.coords.items()
+            if coord_name != dim
+        }
+        if dim in first.dims:
+            coords[dim] = np.concatenate(
+                [np.ravel(array.manifest.coords[dim]) for array in name_arrays]
+            )
+
+    dataset = xr.Dataset(data_vars=data_vars, coords=coords)
+
+    def close() -> None:
+        for array in all_arrays:
+            array.close()
+
+    dataset.set_close(close)
+    return dataset
+
+
+def _check_stackable(name: str, arrays: Sequence[TiledBackendArray], dim: str) -> None:
+    """
+    Checks that tiled arrays can be stacked along a dimension.
+
+    Args:
+        name: Name of the variable.
+        arrays: Tiled arrays to stack.
+        dim: Name of the stacking dimension.
+
+    Raises:
+        ValueError: If several arrays do not have the dimension, or if any array
+            differs from the first one in data type, dimensions or coordinates
+            other than `dim`.
+    """
+    first = arrays[0]
+    if len(arrays) > 1 and dim not in first.dims:
+        error_message = f"{name!r} has no dimension {dim!r} to stack its manifests"
+        raise ValueError(error_message)
+    for array in arrays[1:]:
+        if array.dtype != first.dtype or array.dims != first.dims:
+            error_message = (
+                f"Cannot stack the manifests of {name!r}: expected dtype "
+                f"{first.dtype} and dims {first.dims}, got {array.dtype} and "
+                f"{array.dims}"
+            )
+            raise ValueError(error_message)
+        for coord_name, values in first.manifest.coords.items():
+            if coord_name != dim and not np.array_equal(
+                array.manifest.coords[coord_name], values
+            ):
+                error_message = (
+                    f"Cannot stack the manifests of {name!r}: "
+                    f"coordinate {coord_name!r} differs"
+                )
+                raise ValueError(error_message)
@@ -2,13 +2,14 @@
 Provides a utility for generating xarray Datasets with random data.
 """
 
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from pathlib import Path
 
 import numpy as np
 import xarray as xr
 
+from xarray_binfile.read.coordinates import get_coordinates
 from xarray_binfile.read.file_metadata import ReadSpecs, ReadSpecsGetterProtocol
 
 
@@ -35,7 +36,9 @@ class DatasetGenerator:
         Returns:
             A random NumPy array.
         """
-        return self.random_generator.random(size=metadata.shape, dtype=metadata.dtype)
+        return self.random_generator.random(
+            size=metadata.shape, dtype=metadata.output_dtype
+        )
 
     def _get_xarray_array(self, metadata: ReadSpecs) -> xr.DataArray:
         """
@@ -49,21 +52,23 @@ class DatasetGenerator:
         """
         return xr.DataArray(
             data=self._get_numpy_array(metadata),
-            coords=metadata.coords,
+            coords=get_coordinates(metadata.coords),
             attrs=metadata.attrs,
         )
 
-    def _get_dataset(self, metadata: ReadSpecs) -> xr.Dataset:
+    def _get_dataset(self, metadata: ReadSpecs | Iterable[ReadSpecs]) -> xr.Dataset:
         """
         Generates a random xarray Dataset based on metadata.
 
         Args:
-            metadata: Metadata describing the dataset.
+            metadata: Metadata describing the dataset, or each variable in it.
 
         Returns:
             A random xarray Dataset.
         """
-        return self._get_xarray_array(metadata).to_dataset(name=metadata.name)
+        if isinstance(metadata, ReadSpecs):
+            return self._get_xarray_array(metadata).to_dataset(name=metadata.name)
+        return xr.merge(map(self._get_dataset, metadata))
 
     def __call__(self, iter_filepath: Iterator[Path]) -> xr.Dataset:
         """
@@ -24,14 +24,25 @@ class FileSpecsGetter:
     Attributes:
         base_coords: Base coordinates for the data.
         dtype: Data type of the binary file. Defaults to np.float64.
+        memory_dtype: Data type of the arrays read from the binary files, that are
+            converted back to `dtype` when written. Defaults to None, meaning the
+            same as `dtype`.
         filename_template: Template for generating filenames.
         filename_regex: Regular expression for parsing filenames.
+        compression: Name of the codec of block-compressed files. Defaults to None,
+            meaning the files are not compressed.
+        storage_dims: Base dimensions in the order they are stored, from the slowest
+            to the fastest varying, like their reverse for Fortran order. Defaults to
+            None, meaning the order of `base_coords`.
     """
 
     base_coords: dict[str, ArrayLike]
     dtype: DTypeLike = np.float64
+    memory_dtype: DTypeLike | None = None
     filename_template: str = "{name}-{digits:04}.bin"
     filename_regex: re.Pattern = re.compile(r"(?P<name>\w+)-(?P<digits>\d{4})\.bin")
+    compression: str | None = None
+    storage_dims: tuple[str, ...] | None = None
 
     def reader(self, path: Path) -> ReadSpecs:
         """
@@ -46,12 +57,7 @@ class FileSpecsGetter:
         Raises:
             ValueError: If the filename does not match the expected pattern.
         """
-        match = self.filename_regex.match(path.name)
-        if not match:
-            error_message = f"Invalid filename: {path.name}"
-            raise ValueError(error_message)
-
-        name, digits = match.groups()
+        name, digits = self._parse(path)
         time = np.array([int(digits)], dtype=np.int64)
 
         return ReadSpecs(
@@ -59,8 +65,49 @@ class FileSpecsGetter:
             dtype=self.dtype,
             coords=self.base_coords | {"time": time},
             name=name,
+            compression=self.compression,
+            memory_dtype=self.memory_dtype,
+            storage_dims=None
+            if self.storage_dims is None
+            else (*self.storage_dims, "time"),
         )
 
+    def variable_names(self, path: Path) -> str:
+        """
+        Get the name of the variable in a binary file, from its filename alone.
+
+        Args:
+            path: Path to the binary file.
+
+        Returns:
+            str: Name of the variable.
+
+        Raises:
+            ValueError: If the filename does not match the expected pattern.
+        """
+        name, _ = self._parse(path)
+        return name
+
+    def _parse(self, path: Path) -> tuple[str, str]:
+        """
+        Parse the name of the variable and the digits from a filename.
+
+        Args:
+            path: Path to the binary file.
+
+        Returns:
+            tuple: Name of the variable and digits of the time step.
+
+        Raises:
+            ValueError: If the filename does not match the expected pattern.
+        """
+        match = self.filename_regex.match(path.name)
+        if not match:
+            error_message = f"Invalid filename: {path.name}"
+            raise ValueError(error_message)
+        name, digits = match.groups()
+        return name, digits
+
     def writer(self, data_array: DataArray) -> Iterator[WriteSpecs]:
         """
         Generate write specifications for a DataArray.
@@ -76,9 +123,10 @@ class FileSpecsGetter:
                 filename=self.filename_template.format(
                     name=data_array.name, digits=int(time)
                 ),
-                sub_array=data_array.sel(time=time).transpose(
-                    *self._base_dims, missing_dims="raise"
-                ),
+                sub_array=data_array.sel(time=time),
+                compression=self.compression,
+                dtype=self.dtype,
+                storage_dims=self.storage_dims or self._base_dims,
             )
 
     @cached_property
@@ -4,9 +4,14 @@ import typing
 
 import numpy.typing
 
+if typing.TYPE_CHECKING:
+    from xarray_binfile.read.coordinates import RegularCoord
+
 # TODO: Type aliases could look better on the docs https://github.com/sphinx-doc/sphinx/issues/10785#issuecomment-1897551241
 
 ArrayLike = numpy.typing.ArrayLike
 DTypeLike = numpy.typing.DTypeLike
 AttributesLike: typing.TypeAlias = typing.Mapping[typing.Any, typing.Any]
-CoordsLike: typing.TypeAlias = typing.Mapping[str, numpy.typing.ArrayLike]
+CoordsLike: typing.TypeAlias = typing.Mapping[
+    str, "numpy.typing.ArrayLike | RegularCoord"
+]
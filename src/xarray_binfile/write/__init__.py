@@ -1,2 +1,3 @@
 from xarray_binfile.write.accessor import BinaryEngineDataArray, BinaryEngineDataset
+from xarray_binfile.write.executor import WriteReport
 from xarray_binfile.write.file_metadata import WriteSpecs, WriteSpecsGetterProtocol
@@ -2,11 +2,24 @@
 Provides accessors for writing xarray Dataset and DataArray objects to binary files.
 """
 
+from collections.abc import Iterable
+from concurrent.futures import Executor, ThreadPoolExecutor
 from pathlib import Path
+from typing import Literal
 
+import dask
+import dask.array
+import numpy as np
 import xarray as xr
+from dask.delayed import Delayed
 
-from xarray_binfile.write.file_metadata import WriteSpecsGetterProtocol
+from xarray_binfile.read.overviews import Overviews
+from xarray_binfile.read.statistics import FileStatistics
+from xarray_binfile.write.executor import WriteReport, write_file, write_files
+from xarray_binfile.write.file_metadata import WriteSpecs, WriteSpecsGetterProtocol
+from xarray_binfile.write.overviews import expand_overviews, save_overviews
+from xarray_binfile.write.target import BinaryFileTarget
+from xarray_binfile.write.tiling import expand_tiles
 
 
 @xr.register_dataset_accessor("binary_engine")
@@ -28,16 +41,103 @@ class BinaryEngineDataset:
         self,
         write_specs_getter: WriteSpecsGetterProtocol,
         directory: Path | None = None,
-    ) -> None:
+        *,
+        compute: bool = True,
+        max_workers: int | None = None,
+        executor: Executor | None = None,
+        max_inflight_bytes: int | None = None,
+        mode: Literal["w", "a"] = "w",
+        statistics: bool = False,
+    ) -> Delayed | list[WriteReport] | None:
         """
         Writes the dataset to binary files.
 
+        By default, dask-backed data is stored chunk by chunk through dask. When
+        `max_workers` or `executor` is given, the files of all variables are written
+        concurrently by a pool instead, each one loaded as a whole by its worker.
+        In append mode, the records are appended to the files one after the other.
+
         Args:
             write_specs_getter: A callable that generates write specifications for the data arrays.
             directory: The directory where the binary files will be written. Defaults to the current working directory.
+            compute: Whether to write dask-backed data immediately. Defaults to True.
+            max_workers: Number of threads writing files at once. Defaults to None.
+            executor: Thread or process pool writing the files, used instead of
+                `max_workers`. It is not shut down afterwards. Defaults to None.
+            max_inflight_bytes: Bound on the bytes of the files being written at once
+                by the pool. Defaults to None, meaning no bound.
+            mode: "w" to replace the files, or "a" to append the records to the end
+                of existing files, creating them if needed. Defaults to "w".
+            statistics: Whether to save the minimum, maximum and mean of each file
+                next to it, as read by ``open_binfile_series(statistics=True)``.
+                Otherwise, the statistics saved before for the files are removed.
+                Defaults to False.
+
+        Returns:
+            A summary of each write when using a pool. Otherwise, None if `compute`
+            is True, or a delayed object that writes the data when computed, as in
+            ``to_zarr``.
+
+        Raises:
+            ValueError: If a pool is requested with `compute` set to False or in
+                append mode.
         """
+        if mode == "a":
+            if max_workers is not None or executor is not None:
+                error_message = "mode='a' is not supported when writing with a pool"
+                raise ValueError(error_message)
+            return _append(
+                self._data_set.data_vars.values(),
+                write_specs_getter,
+                directory,
+                compute=compute,
+                statistics=statistics,
+            )
+        sidecars: list[tuple[Path, Overviews]] = []
+        if max_workers is not None or executor is not None:
+            if not compute:
+                error_message = (
+                    "compute=False is not supported when writing with a pool"
+                )
+                raise ValueError(error_message)
+            _directory = directory or Path.cwd()
+            tasks = (
+                (_directory / details.filename, details)
+                for data_array in self._data_set.data_vars.values()
+                for details in expand_tiles(
+                    expand_overviews(
+                        write_specs_getter(data_array), _directory, sidecars
+                    ),
+                    _directory,
+                )
+            )
+            if executor is not None:
+                reports = write_files(
+                    tasks, executor, max_inflight_bytes, statistics=statistics
+                )
+            else:
+                with ThreadPoolExecutor(max_workers) as thread_pool:
+                    reports = write_files(
+                        tasks, thread_pool, max_inflight_bytes, statistics=statistics
+                    )
+            save_overviews(sidecars)
+            return reports
+
+        sources: list[dask.array.Array] = []
+        targets: list[Delayed] = []
+        writes: list[Delayed] = []
         for data_array in self._data_set.data_vars.values():
-            data_array.binary_engine.to_file(write_specs_getter, directory)
+            data_array.binary_engine._prepare_store(
+                write_specs_getter,
+                directory,
+                sources,
+                targets,
+                writes,
+                sidecars,
+                compute=compute,
+                statistics=statistics,
+            )
+        return _store(sources, targets, writes, sidecars, compute=compute)
 
 
 @xr.register_dataarray_accessor("binary_engine")
@@ -59,14 +159,254 @@ class BinaryEngineDataArray:
         self,
         write_specs_getter: WriteSpecsGetterProtocol,
         directory: Path | None = None,
-    ) -> None:
+        *,
+        compute: bool = True,
+        mode: Literal["w", "a"] = "w",
+        statistics: bool = False,
+    ) -> Delayed | None:
         """
         Writes the data array to binary files.
 
+        Dask-backed data is streamed chunk by chunk into preallocated files, with
+        the chunks written in parallel by dask's scheduler, so peak memory is
+        bounded by the chunk size rather than by the whole array. In append mode,
+        the records are appended to the files one after the other instead.
+
         Args:
             write_specs_getter: A callable that generates write specifications for the data array.
             directory: The directory where the binary files will be written. Defaults to the current working directory.
+            compute: Whether to write dask-backed data immediately. Defaults to True.
+            mode: "w" to replace the files, or "a" to append the records to the end
+                of existing files, creating them if needed. Defaults to "w".
+            statistics: Whether to save the minimum, maximum and mean of each file,
+                or tile, next to it, computed while the data is in memory.
+                Otherwise, the statistics saved before for the files are removed.
+                Defaults to False.
+
+        Returns:
+            None if `compute` is True, otherwise a delayed object that writes the
+            data when computed, as in ``to_zarr``.
+        """
+        if mode == "a":
+            return _append(
+                (self._data_array,),
+                write_specs_getter,
+                directory,
+                compute=compute,
+                statistics=statistics,
+            )
+        sources: list[dask.array.Array] = []
+        targets: list[Delayed] = []
+        writes: list[Delayed] = []
+        sidecars: list[tuple[Path, Overviews]] = []
+        self._prepare_store(
+            write_specs_getter,
+            directory,
+            sources,
+            targets,
+            writes,
+            sidecars,
+            compute=compute,
+            statistics=statistics,
+        )
+        return _store(sources, targets, writes, sidecars, compute=compute)
+
+    def _prepare_store(
+        self,
+        write_specs_getter: WriteSpecsGetterProtocol,
+        directory: Path | None,
+        sources: list[dask.array.Array],
+        targets: list[Delayed],
+        writes: list[Delayed],
+        sidecars: list[tuple[Path, Overviews]],
+        *,
+        compute: bool,
+        statistics: bool = False,
+    ) -> None:
+        """
+        Writes in-memory data and collects the dask-backed data to store.
+
+        Block-compressed files and files with records are written as a whole, since
+        their blocks or record markers cannot be placed by dask. Tiled arrays get
+        their manifest written right away, and each tile is stored as a file of its
+        own. Overview levels are decimated lazily and stored like the array they
+        come from. The statistics of dask-backed data are reduced from the same chunks
+        that are stored.
+
+        Args:
+            write_specs_getter: A callable that generates write specifications for the data array.
+            directory: The directory where the binary files will be written. Defaults to the current working directory.
+            sources: List extended with the dask arrays to store.
+            targets: List extended with the delayed creation of the files receiving each
+                source.
+            writes: List extended with the delayed writes of compressed files, and
+                of the statistics of dask-backed data.
+            sidecars: List extended with the overview levels to save once the data
+                is written, and the path to their binary file.
+            compute: Whether the data is written immediately.
+            statistics: Whether to save the statistics of each file next to it.
+                Defaults to False.
         """
         _directory = directory or Path.cwd()
-        for details in write_specs_getter(self._data_array):
-            details.sub_array.to_numpy().tofile(_directory / details.filename)
+        for details in expand_tiles(
+            expand_overviews(
+                write_specs_getter(self._data_array), _directory, sidecars
+            ),
+            _directory,
+        ):
+            filepath = _directory / details.filename
+            data = details.stored_array.data
+            if (
+                details.compression is not None
+                or details.record_dim is not None
+                or details.record_marker_size
+            ):
+                if compute:
+                    write_file(filepath, details, statistics=statistics)
+                else:
+                    writes.append(
+                        dask.delayed(write_file)(
+                            filepath, details, statistics=statistics
+                        )
+                    )
+                continue
+            if compute and not dask.is_dask_collection(data):
+                write_file(filepath, details, statistics=statistics)
+                continue
+            source = dask.array.asarray(data)
+            if not statistics or source.dtype.kind not in "biuf":
+                writes.append(dask.delayed(FileStatistics.remove)(filepath))
+            elif not source.size:
+                writes.append(
+                    dask.delayed(_save_statistics)(filepath, 0, np.nan, np.nan, np.nan)
+                )
+            else:
+                writes.append(
+                    dask.delayed(_save_statistics)(
+                        filepath,
+                        source.size,
+                        source.min(),
+                        source.max(),
+                        source.mean(dtype="f8"),
+                    )
+                )
+            if details.dtype is not None:
+                source = source.astype(details.dtype)
+            sources.append(source)
+            # the file is replaced when the data is stored, not when the graph is built
+            targets.append(
+                dask.delayed(BinaryFileTarget.create)(
+                    filepath, source.dtype, source.shape
+                )
+            )
+
+
+def _store(
+    sources: list[dask.array.Array],
+    targets: list[Delayed],
+    writes: list[Delayed],
+    sidecars: list[tuple[Path, Overviews]],
+    *,
+    compute: bool,
+) -> Delayed | None:
+    """
+    Stores dask arrays into binary files, without locking, as their regions are disjoint.
+
+    Args:
+        sources: Dask arrays to store.
+        targets: Delayed creation of the files receiving each source.
+        writes: Delayed writes of whole files, computed along with the stores.
+        sidecars: Overview levels saved once all the data is written, and the path
+            to their binary file.
+        compute: Whether to write the data immediately.
+
+    Returns:
+        None if `compute` is True, otherwise a delayed object that writes the data.
+    """
+    if compute:
+        if writes:
+            # computed at once, so the chunks are loaded once for both
+            stored = dask.array.store(sources, targets, lock=False, compute=False)  # type: ignore[arg-type]
+            dask.compute(stored, *writes)
+        elif sources:
+            dask.array.store(sources, targets, lock=False)  # type: ignore[arg-type]
+        save_overviews(sidecars)
+        return None
+    stored = dask.array.store(sources, targets, lock=False, compute=False)  # type: ignore[arg-type]
+    # recent dask versions return the stored arrays, with empty chunks, which are
+    # discarded
+    return dask.delayed(save_overviews)(sidecars, stored, *writes)
+
+
+def _append(
+    data_arrays: Iterable[xr.DataArray],
+    write_specs_getter: WriteSpecsGetterProtocol,
+    directory: Path | None,
+    *,
+    compute: bool,
+    statistics: bool = False,
+) -> Delayed | None:
+    """
+    Appends the records of data arrays to binary files, in order.
+
+    Args:
+        data_arrays: The data arrays to append.
+        write_specs_getter: A callable that generates write specifications for the data arrays.
+        directory: The directory of the binary files. Defaults to the current working directory.
+        compute: Whether to append the data immediately.
+        statistics: Whether to update the statistics of each file next to it.
+            Defaults to False.
+
+    Returns:
+        None if `compute` is True, otherwise a delayed object that appends the data.
+
+    Raises:
+        ValueError: If the data arrays are written as tiles or with overview levels.
+    """
+    _directory = directory or Path.cwd()
+    tasks = []
+    for data_array in data_arrays:
+        for details in write_specs_getter(data_array):
+            if details.tile_shape is not None:
+                error_message = "mode='a' is not supported for tiled arrays"
+                raise ValueError(error_message)
+            if details.overview_levels is not None:
+                error_message = "mode='a' is not supported for overview levels"
+                raise ValueError(error_message)
+            tasks.append((_directory / details.filename, details))
+    if not compute:
+        return dask.delayed(_append_files)(tasks, statistics=statistics)
+    _append_files(tasks, statistics=statistics)
+    return None
+
+
+def _append_files(
+    tasks: list[tuple[Path, WriteSpecs]], *, statistics: bool = False
+) -> None:
+    """
+    Appends to binary files one after the other, so records keep their order.
+
+    Args:
+        tasks: Path to each binary file and the metadata for appending to it.
+        statistics: Whether to update the statistics of each file next to it.
+            Defaults to False.
+    """
+    for filepath, details in tasks:
+        Overviews.remove(filepath)
+        write_file(filepath, details, append=True, statistics=statistics)
+
+
+def _save_statistics(
+    filepath: Path, count: int, minimum: float, maximum: float, mean: float
+) -> None:
+    """
+    Saves the statistics of dask-backed data, once they are reduced.
+
+    Args:
+        filepath: Path to the binary file.
+        count: Number of values.
+        minimum: Smallest value.
+        maximum: Largest value.
+        mean: Mean of the values.
+    """
+    FileStatistics(count, float(minimum), float(maximum), float(mean)).save(filepath)
@@ -0,0 +1,268 @@
+"""
+Writes many binary files concurrently with a thread or process pool.
+"""
+
+import time
+from collections.abc import Iterable
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+
+import numpy as np
+
+from xarray_binfile.compression import write_compressed
+from xarray_binfile.read.byte_ranges import CONVERT_CHUNK_NBYTES
+from xarray_binfile.read.statistics import FileStatistics
+from xarray_binfile.typing import DTypeLike
+from xarray_binfile.write.file_metadata import WriteSpecs
+
+
+class WriteReport(NamedTuple):
+    """
+    Summary of writing a binary file.
+
+    Attributes:
+        filepath: Path to the binary file.
+        nbytes: Number of bytes written.
+        seconds: Time spent loading the data and writing the file, in seconds.
+    """
+
+    filepath: Path
+    nbytes: int
+    seconds: float
+
+
+def _write_blocks(file: BinaryIO, data: np.typing.NDArray, dtype: np.dtype) -> None:
+    """
+    Writes an array in C order, in blocks of whole leading rows.
+
+    Each block is copied into a contiguous buffer of the data type on disk, so
+    neither a transposed nor a converted copy of the whole array is created.
+
+    Args:
+        file: Binary file open for writing.
+        data: The array to write, possibly a strided view.
+        dtype: Data type on disk.
+    """
+    if data.ndim <= 1:
+        flat = data.reshape(-1)
+        items_per_block = max(1, CONVERT_CHUNK_NBYTES // dtype.itemsize)
+        for start in range(0, flat.size, items_per_block):
+            block = flat[start : start + items_per_block]
+            file.write(np.ascontiguousarray(block, dtype=dtype).data)
+        return
+    row_nbytes = data[0].size * dtype.itemsize
+    if row_nbytes > CONVERT_CHUNK_NBYTES:
+        for row in data:
+            _write_blocks(file, row, dtype)
+        return
+    rows_per_block = max(1, CONVERT_CHUNK_NBYTES // max(row_nbytes, 1))
+    for start in range(0, len(data), rows_per_block):
+        block = data[start : start + rows_per_block]
+        file.write(np.ascontiguousarray(block, dtype=dtype).data)
+
+
+def _tofile(
+    data: np.typing.NDArray, filepath: Path, dtype: DTypeLike | None = None
+) -> int:
+    """
+    Writes an array to a binary file in C order, converting it block by block.
+
+    Args:
+        data: The array to write, possibly a strided view.
+        filepath: Path to the binary file.
+        dtype: Data type on disk. Defaults to None, meaning the data type of `data`.
+
+    Returns:
+        Number of bytes written.
+    """
+    disk_dtype = data.dtype if dtype is None else np.dtype(dtype)
+    if disk_dtype == data.dtype and data.flags.c_contiguous:
+        data.tofile(filepath)
+    else:
+        with open(filepath, "wb") as file:
+            _write_blocks(file, data, disk_dtype)
+    return data.size * disk_dtype.itemsize
+
+
+def _write_records(
+    file: BinaryIO, records: np.typing.NDArray, dtype: np.dtype, marker_size: int
+) -> int:
+    """
+    Writes each entry along the first axis of an array as a record.
+
+    Args:
+        file: Binary file open for writing.
+        records: The records to write, possibly a strided view.
+        dtype: Data type on disk.
+        marker_size: Size in bytes of the markers holding the size of each record,
+            in the byte order of `dtype`, or 0 for no markers.
+
+    Returns:
+        Number of bytes written, with the markers.
+    """
+    record_nbytes = records[0].size * dtype.itemsize if len(records) else 0
+    marker = b""
+    if marker_size:
+        byteorder = dtype.byteorder if dtype.byteorder in "<>" else "="
+        marker = np.array(record_nbytes, dtype=f"{byteorder}i{marker_size}").tobytes()
+    for record in records:
+        file.write(marker)
+        _write_blocks(file, record, dtype)
+        file.write(marker)
+    return len(records) * (record_nbytes + 2 * len(marker))
+
+
+def write_file(
+    filepath: Path,
+    write_specs: WriteSpecs,
+    *,
+    append: bool = False,
+    statistics: bool = False,
+) -> WriteReport:
+    """
+    Writes a portion of a DataArray to a binary file, loading it first if needed.
+
+    Args:
+        filepath: Path to the binary file.
+        write_specs: Metadata for writing the binary file.
+        append: Whether to append the records to the end of the file, creating it
+            if needed, instead of replacing it. Defaults to False.
+        statistics: Whether to save the summary statistics of the data next to the
+            file, merged with those of the records before when appending. Otherwise,
+            the statistics saved before are removed, as they are outdated. Defaults
+            to False.
+
+    Returns:
+        A summary of the write, with the size of the uncompressed data.
+
+    Raises:
+        ValueError: If appending to a block-compressed file.
+    """
+    start = time.perf_counter()
+    if append and write_specs.compression is not None:
+        error_message = f"Cannot append to the compressed file {filepath}"
+        raise ValueError(error_message)
+    data = write_specs.stored_array.to_numpy()
+    if statistics:
+        save_statistics(filepath, data, append=append)
+    else:
+        FileStatistics.remove(filepath)
+    if write_specs.compression is not None:
+        if write_specs.dtype is not None:
+            data = data.astype(write_specs.dtype, copy=False)
+        write_compressed(filepath, data, write_specs.compression)
+        nbytes = data.nbytes
+    elif append or write_specs.record_dim is not None or write_specs.record_marker_size:
+        disk_dtype = (
+            data.dtype if write_specs.dtype is None else np.dtype(write_specs.dtype)
+        )
+        records = data if write_specs.record_dim is not None else data[np.newaxis]
+        # the append mode opens the file with O_APPEND, so each write goes to its end
+        with open(filepath, "ab" if append else "wb") as file:
+            nbytes = _write_records(
+                file, records, disk_dtype, write_specs.record_marker_size
+            )
+    else:
+        nbytes = _tofile(data, filepath, write_specs.dtype)
+    return WriteReport(filepath, nbytes, time.perf_counter() - start)
+
+
+def write_files(
+    tasks: Iterable[tuple[Path, WriteSpecs]],
+    executor: Executor,
+    max_inflight_bytes: int | None = None,
+    *,
+    statistics: bool = False,
+) -> list[WriteReport]:
+    """
+    Writes binary files concurrently.
+
+    New writes are submitted only while the data of the unfinished ones adds up to
+    at most `max_inflight_bytes`, although a single write larger than that still
+    runs alone. After a failure no new write is submitted, the running ones are
+    awaited, and the error of the first failed file, in submission order, is
+    raised, regardless of which one finished first.
+
+    Args:
+        tasks: Path to each binary file and the metadata for writing it.
+        executor: Executor running the writes.
+        max_inflight_bytes: Bound on the bytes of the writes running at once.
+            Defaults to None, meaning no bound.
+        statistics: Whether to save the summary statistics of each file next to
+            it. Defaults to False.
+
+    Returns:
+        A summary of each write, in submission order.
+    """
+    futures: list[Future[WriteReport]] = []
+    inflight: dict[Future[WriteReport], int] = {}
+
+    def wait_first_completed() -> None:
+        done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+        for future in done:
+            inflight.pop(future)
+
+    for filepath, write_specs in tasks:
+        nbytes = write_specs.sub_array.nbytes
+        while (
+            inflight
+            and max_inflight_bytes is not None
+            and sum(inflight.values()) + nbytes > max_inflight_bytes
+        ):
+            wait_first_completed()
+        if any(future.done() and future.exception() for future in futures):
+            break
+        future = executor.submit(
+            write_file, filepath, write_specs, statistics=statistics
+        )
+        futures.append(future)
+        inflight[future] = nbytes
+
+    wait(futures)
+    for future in futures:
+        if (error := future.exception()) is not None:
+            raise error
+    return [future.result() for future in futures]
+
+
+def save_statistics(
+    filepath: Path, data: np.typing.NDArray, *, append: bool = False
+) -> None:
+    """
+    Saves the summary statistics of the data written to a binary file.
+
+    The statistics saved before are removed instead when the new ones cannot cover
+    the whole file, like for non-numeric data, or when appending to records
+    without statistics.
+
+    Args:
+        filepath: Path to the binary file, before the data is written.
+        data: The data written to the binary file.
+        append: Whether the data is appended, so the statistics are merged with
+            those saved before. Defaults to False.
+    """
+    file_statistics = FileStatistics.from_array(data)
+    if append and file_statistics is not None and _has_data(filepath):
+        previous = FileStatistics.load(filepath)
+        file_statistics = None if previous is None else previous.merge(file_statistics)
+    if file_statistics is None:
+        FileStatistics.remove(filepath)
+    else:
+        file_statistics.save(filepath)
+
+
+def _has_data(filepath: Path) -> bool:
+    """
+    Checks whether a binary file exists and is not empty.
+
+    Args:
+        filepath: Path to the binary file.
+
+    Returns:
+        True if the file holds some data.
+    """
+    try:
+        return filepath.stat().st_size > 0
+    except FileNotFoundError:
+        return False
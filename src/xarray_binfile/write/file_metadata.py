@@ -2,11 +2,13 @@
 Defines metadata structures and protocols for writing binary files.
 """
 
-from collections.abc import Iterator
+from collections.abc import Iterator, Mapping, Sequence
 from typing import NamedTuple, Protocol
 
 import xarray as xr
 
+from xarray_binfile.typing import DTypeLike
+
 
 class WriteSpecs(NamedTuple):
     """
@@ -18,10 +20,75 @@ class WriteSpecs(NamedTuple):
         The name of the binary file.
     sub_array : xr.DataArray
         The portion of the DataArray to be written.
+    compression : str | None
+        The name of the codec used to write a block-compressed file, or None to
+        write the raw bytes. Defaults to None.
+    dtype : DTypeLike | None
+        The data type on disk, like ``">f4"``, that the data is converted to while
+        it is written. Defaults to None, meaning the data type of `sub_array`.
+    storage_dims : tuple[str, ...] | None
+        The dimensions in the order they are stored, from the slowest to the fastest
+        varying, like the reversed dimensions for Fortran order. Defaults to None,
+        meaning the order of the dimensions of `sub_array`.
+    tile_shape : Mapping[str, int] | None
+        The largest size of each tile along some dimensions, the others being whole.
+        When given, `filename` names a manifest describing the tiles, and each tile
+        is written to its own file next to it. Defaults to None, meaning that
+        `sub_array` is written to a single file.
+    record_dim : str | None
+        The dimension whose entries are written as separate records, as read with
+        the same `record_dim` in
+        :class:`~xarray_binfile.read.file_metadata.ReadSpecs`. When `sub_array`
+        only has it as a scalar coordinate, it is written as a single record.
+        Defaults to None, meaning the whole array is a single record.
+    record_marker_size : int
+        The size in bytes of the markers holding the size of each record, written
+        before and after it, like the 4 bytes of Fortran unformatted files.
+        Defaults to 0, meaning no markers.
+    overview_levels : Sequence[Mapping[str, int]] | None
+        The decimation factors of each overview level along some dimensions,
+        relative to the full resolution, like ``({"x": 2, "y": 2, "z": 2},
+        {"x": 4, "y": 4, "z": 4})`` for a 1/8 and a 1/64 preview. Each level is
+        written next to the file as ``<filename>.ovr<level>``, as read with the
+        `resolution` option of the readers. Defaults to None, meaning no overview.
+    overview_method : str
+        How the overview levels are decimated, "mean" to average each block of
+        values or "stride" to keep its first value. Defaults to "mean".
     """
 
     filename: str
     sub_array: xr.DataArray
+    compression: str | None = None
+    dtype: DTypeLike | None = None
+    storage_dims: tuple[str, ...] | None = None
+    tile_shape: Mapping[str, int] | None = None
+    record_dim: str | None = None
+    record_marker_size: int = 0
+    overview_levels: Sequence[Mapping[str, int]] | None = None
+    overview_method: str = "mean"
+
+    @property
+    def stored_array(self) -> xr.DataArray:
+        """
+        The portion of the DataArray, with its dimensions in the order they are stored.
+
+        Returns
+        -------
+        xr.DataArray
+            A transposed view of `sub_array`, so no data is copied, starting with
+            the record dimension, if any.
+        """
+        sub_array = self.sub_array
+        record_dims: tuple[str, ...] = ()
+        if self.record_dim is not None:
+            record_dims = (self.record_dim,)
+            if self.record_dim not in sub_array.dims:
+                sub_array = sub_array.expand_dims(self.record_dim)
+        if self.storage_dims is None:
+            return sub_array.transpose(*record_dims, ...)
+        return sub_array.transpose(
+            *record_dims, *self.storage_dims, missing_dims="raise"
+        )
 
 
 class WriteSpecsGetterProtocol(Protocol):
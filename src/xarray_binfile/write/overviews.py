@@ -0,0 +1,93 @@
+"""
+Decimates the arrays to write into coarse overview levels, written next to them.
+"""
+
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import xarray as xr
+
+from xarray_binfile.read.overviews import Overviews
+from xarray_binfile.write.file_metadata import WriteSpecs
+
+
+def decimate(sub_array: xr.DataArray, overviews: Overviews, level: int) -> xr.DataArray:
+    """
+    Decimates an array to an overview level, lazily if it is backed by dask.
+
+    Args:
+        sub_array: The array at full resolution.
+        overviews: The overview levels.
+        level: Position of the level, starting at 1 for the finest one.
+
+    Returns:
+        The decimated array, with the data type of `sub_array`.
+    """
+    factors = {
+        dim: factor
+        for dim, factor in overviews.levels[level - 1].items()
+        if dim in sub_array.dims and factor > 1
+    }
+    if not factors:
+        return sub_array
+    if overviews.method == "stride":
+        return sub_array.isel({dim: slice(None, None, f) for dim, f in factors.items()})
+    coarse = sub_array.coarsen(factors, boundary="trim").mean()  # type: ignore[arg-type]
+    return coarse.astype(sub_array.dtype, copy=False)
+
+
+def expand_overviews(
+    write_specs: Iterable[WriteSpecs],
+    directory: Path,
+    sidecars: list[tuple[Path, Overviews]],
+) -> Iterator[WriteSpecs]:
+    """
+    Expands each array into its file followed by the files of its overview levels.
+
+    Each level is written with the same layout on disk as the array, without its
+    overview levels. The overview levels written before for the same files are
+    removed, so they are never read along with newer data, while the sidecars of
+    the new levels are only collected, to be saved once the levels are written.
+
+    Args:
+        write_specs: Write specifications, with overview levels or not.
+        directory: The directory where the binary files are written.
+        sidecars: List extended with the path to each binary file with overview
+            levels and its levels.
+
+    Yields:
+        The write specifications of each file to write, each array followed by its
+        overview levels.
+
+    Raises:
+        ValueError: If overview levels are given for a tiled array.
+    """
+    for details in write_specs:
+        Overviews.remove(directory / details.filename)
+        if details.overview_levels is None:
+            yield details
+            continue
+        if details.tile_shape is not None:
+            error_message = "Overview levels are not supported for tiled arrays"
+            raise ValueError(error_message)
+        overviews = Overviews(tuple(details.overview_levels), details.overview_method)
+        details = details._replace(overview_levels=None)
+        yield details
+        for level in range(1, len(overviews.levels) + 1):
+            yield details._replace(
+                filename=str(Overviews.level_path(details.filename, level)),
+                sub_array=decimate(details.sub_array, overviews, level),
+            )
+        sidecars.append((directory / details.filename, overviews))
+
+
+def save_overviews(sidecars: Iterable[tuple[Path, Overviews]], *_) -> None:
+    """
+    Saves the sidecars of binary files, once their overview levels are written.
+
+    Args:
+        sidecars: Path to each binary file and its overview levels.
+        *_: Results of the writes to wait for, discarded.
+    """
+    for filepath, overviews in sidecars:
+        overviews.save(filepath)
@@ -0,0 +1,181 @@
+"""
+Defines a target where dask writes the chunks of an array into a binary file.
+"""
+
+import os
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from xarray_binfile.typing import DTypeLike
+
+
+class BinaryFileTarget:
+    """
+    Preallocated binary file that receives the chunks of an array.
+
+    It is safe to pickle, so each dask worker writes its chunks straight into the
+    right byte region of the file, and no chunk needs to be sent anywhere else.
+    Creating the file within the dask graph, as a delayed target, leaves any
+    existing file untouched until the data is stored.
+
+    Attributes:
+        filepath: Path to the binary file.
+        dtype: Data type of the array.
+        shape: Shape of the array.
+    """
+
+    def __init__(self, filepath: str | os.PathLike[str], dtype: DTypeLike, shape):
+        """
+        Initializes the target of an existing binary file.
+
+        Args:
+            filepath: Path to the binary file.
+            dtype: Data type of the array.
+            shape: Shape of the array.
+        """
+        self.filepath = Path(filepath)
+        self.dtype = np.dtype(dtype)
+        self.shape = tuple(shape)
+
+    @classmethod
+    def create(
+        cls, filepath: str | os.PathLike[str], dtype: DTypeLike, shape
+    ) -> "BinaryFileTarget":
+        """
+        Creates a binary file with the size of the array, replacing any existing one.
+
+        Args:
+            filepath: Path to the binary file.
+            dtype: Data type of the array.
+            shape: Shape of the array.
+
+        Returns:
+            The target of the new binary file.
+        """
+        target = cls(filepath, dtype, shape)
+        with open(target.filepath, "wb") as file:
+            file.truncate(target.dtype.itemsize * int(np.prod(target.shape)))
+        return target
+
+    def __setitem__(self, key: Any, value: np.typing.ArrayLike) -> None:
+        """
+        Writes a chunk of the array into the binary file.
+
+        Only the bytes of the chunk are written, with a single write when they are
+        contiguous in the file, like a block of whole rows, and through a memory map
+        of the bytes between its first and last element otherwise.
+
+        Args:
+            key: Location of the chunk in the array.
+            value: Data of the chunk.
+        """
+        region = self._region(key)
+        if region is None:
+            if not all(self.shape):
+                return
+            memory_map = np.memmap(
+                self.filepath, dtype=self.dtype, mode="r+", shape=self.shape, order="C"
+            )
+            memory_map[key] = value
+            memory_map.flush()
+            return
+        shape = tuple(stop - start for start, stop in region)
+        if not all(shape):
+            return
+        data = np.broadcast_to(np.asarray(value, dtype=self.dtype), shape)
+        strides = _c_strides(self.shape, self.dtype.itemsize)
+        first = sum(
+            start * stride for (start, _), stride in zip(region, strides, strict=True)
+        )
+        if _is_contiguous(shape, self.shape):
+            with open(self.filepath, "r+b", buffering=0) as file:
+                file.seek(first)
+                file.write(np.ascontiguousarray(data).data.cast("B"))
+            return
+        last = sum(
+            (stop - 1) * stride
+            for (_, stop), stride in zip(region, strides, strict=True)
+        )
+        memory_map = np.memmap(
+            self.filepath,
+            dtype=np.uint8,
+            mode="r+",
+            offset=first,
+            shape=(last + self.dtype.itemsize - first,),
+        )
+        np.ndarray(shape, self.dtype, buffer=memory_map, strides=strides)[...] = data
+        memory_map.flush()
+
+    def _region(self, key: Any) -> tuple[tuple[int, int], ...] | None:
+        """
+        Gets the bounds of a chunk made of unit-step slices, like those from dask.
+
+        Args:
+            key: Location of the chunk in the array.
+
+        Returns:
+            The start and stop along each axis, or None for any other key.
+        """
+        key = key if isinstance(key, tuple) else (key,)
+        if len(key) > len(self.shape) or not all(isinstance(k, slice) for k in key):
+            return None
+        key += (slice(None),) * (len(self.shape) - len(key))
+        region = []
+        for k, size in zip(key, self.shape, strict=True):
+            start, stop, step = k.indices(size)
+            if step != 1:
+                return None
+            region.append((start, max(start, stop)))
+        return tuple(region)
+
+
+def _c_strides(shape: tuple[int, ...], itemsize: int) -> tuple[int, ...]:
+    """
+    Gets the strides in bytes of a C-ordered array.
+
+    Args:
+        shape: Shape of the array.
+        itemsize: Size in bytes of each element.
+
+    Returns:
+        The stride along each axis.
+
+    Examples:
+        >>> _c_strides((4, 3, 2), 8)
+        (48, 16, 8)
+    """
+    strides = []
+    for size in reversed(shape):
+        strides.append(itemsize)
+        itemsize *= size
+    return tuple(reversed(strides))
+
+
+def _is_contiguous(shape: tuple[int, ...], array_shape: tuple[int, ...]) -> bool:
+    """
+    Checks whether a region of a C-ordered array is a single run of bytes.
+
+    That is the case when the region spans whole trailing axes, after a single
+    partial one, preceded by axes of size one.
+
+    Args:
+        shape: Shape of the region.
+        array_shape: Shape of the whole array.
+
+    Returns:
+        Whether the region is contiguous.
+
+    Examples:
+        >>> _is_contiguous((1, 2, 3), (4, 5, 3))
+        True
+        >>> _is_contiguous((2, 2, 3), (4, 5, 3))
+        False
+    """
+    partial = False
+    for size, array_size in zip(reversed(shape), reversed(array_shape), strict=True):
+        if partial and size != 1:
+            return False
+        partial = partial or size != array_size
+    return True
@@ -0,0 +1,107 @@
+"""
+Splits the arrays to write into N-dimensional tiles, described by a manifest.
+"""
+
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import numpy as np
+
+from xarray_binfile.read.tiling import TileManifest
+from xarray_binfile.write.file_metadata import WriteSpecs
+
+
+def get_manifest(write_specs: WriteSpecs) -> TileManifest:
+    """
+    Gets the layout of the tiles of an array to write.
+
+    The coordinates along each dimension and the scalar ones are kept, as well as
+    the layout of the records of each tile.
+
+    Args:
+        write_specs: Write specifications, with the shape of the tiles.
+
+    Returns:
+        The manifest of the tiles.
+
+    Raises:
+        ValueError: If the shape of the tiles names an unknown dimension.
+    """
+    sub_array = write_specs.sub_array
+    tile_shape = dict(write_specs.tile_shape or {})
+    if unknown := set(tile_shape) - set(sub_array.dims):
+        error_message = (
+            f"Unknown dimensions {sorted(unknown)} in the tile shape, "
+            f"expected some of {sub_array.dims}"
+        )
+        raise ValueError(error_message)
+    dtype = np.dtype(write_specs.dtype or sub_array.dtype)
+    return TileManifest(
+        name=str(sub_array.name),
+        dims=tuple(map(str, sub_array.dims)),
+        shape=sub_array.shape,
+        tile_shape=tuple(
+            min(tile_shape.get(str(dim), size), max(size, 1))
+            for dim, size in sub_array.sizes.items()
+        ),
+        dtype=dtype,
+        coords={
+            str(name): coord.to_numpy()
+            for name, coord in sub_array.coords.items()
+            if coord.dims in ((), (name,))
+        },
+        attrs=sub_array.attrs or None,
+        compression=write_specs.compression,
+        memory_dtype=None if sub_array.dtype == dtype else sub_array.dtype,
+        storage_dims=write_specs.storage_dims,
+        # a record dimension only given as a scalar coordinate is a single record
+        record_dim=write_specs.record_dim
+        if write_specs.record_dim in sub_array.dims
+        else None,
+        record_marker_size=write_specs.record_marker_size,
+    )
+
+
+def split_tiles(
+    write_specs: WriteSpecs, manifest: TileManifest
+) -> Iterator[WriteSpecs]:
+    """
+    Splits write specifications into those of each tile.
+
+    Each tile is a view of the array to write, so no data is copied.
+
+    Args:
+        write_specs: Write specifications, with the shape of the tiles.
+        manifest: The manifest of the tiles.
+
+    Yields:
+        The write specifications of each tile, in the order of the grid.
+    """
+    for tile_index in manifest.tile_indices():
+        yield write_specs._replace(
+            filename=TileManifest.tile_filename(write_specs.filename, tile_index),
+            sub_array=write_specs.sub_array[manifest.tile_slices(tile_index)],
+            tile_shape=None,
+        )
+
+
+def expand_tiles(
+    write_specs: Iterable[WriteSpecs], directory: Path
+) -> Iterator[WriteSpecs]:
+    """
+    Writes the manifest of each tiled array, and expands it into its tiles.
+
+    Args:
+        write_specs: Write specifications, tiled or not.
+        directory: The directory where the manifests and tiles are written.
+
+    Yields:
+        The write specifications of each file to write.
+    """
+    for details in write_specs:
+        if details.tile_shape is None:
+            yield details
+            continue
+        manifest = get_manifest(details)
+        manifest.save(directory / details.filename)
+        yield from split_tiles(details, manifest)
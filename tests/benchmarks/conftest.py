@@ -0,0 +1,100 @@
+"""
+Synthetic file sets for the benchmarks.
+
+The total size of each file set is read from the environment variable
+``XARRAY_BINFILE_BENCHMARK_NBYTES``, small by default so the benchmarks also run as
+quick tests, and set to some GB to measure at realistic sizes, for instance:
+
+    XARRAY_BINFILE_BENCHMARK_NBYTES=4e9 hatch run benchmark
+
+The data written by the write benchmarks is lazy, and only a single file of the
+set is held in memory.
+"""
+
+import os
+import pathlib
+from typing import NamedTuple
+
+import numpy as np
+import pytest
+
+from xarray_binfile.tutorial import DatasetGenerator, FileSpecsGetter
+from xarray_binfile.write import BinaryEngineDataset  # noqa F401
+
+BENCHMARK_NBYTES = int(float(os.environ.get("XARRAY_BINFILE_BENCHMARK_NBYTES", "8e6")))
+"""Total size in bytes of each synthetic file set."""
+
+PLANE_SHAPE = (256, 256)
+"""Shape of the trailing dimensions of each file."""
+
+
+class FileSet(NamedTuple):
+    """
+    Binary files written to disk, one per variable and time step.
+
+    Attributes:
+        directory: Directory holding the files.
+        file_specs_getter: Specifications of the files.
+        nbytes: Total size in bytes of the files.
+    """
+
+    directory: pathlib.Path
+    file_specs_getter: FileSpecsGetter
+    nbytes: int
+
+    @property
+    def paths(self) -> list[pathlib.Path]:
+        return sorted(self.directory.glob("*.bin"))
+
+
+def get_file_specs_getter(
+    n_files: int, nbytes: int = BENCHMARK_NBYTES
+) -> FileSpecsGetter:
+    """
+    Gets the specifications of a set of files with about a total size.
+
+    Args:
+        n_files: Number of files.
+        nbytes: Total size in bytes of the files.
+
+    Returns:
+        The specifications of the files.
+    """
+    plane_nbytes = np.dtype(np.float64).itemsize * int(np.prod(PLANE_SHAPE))
+    n_planes = max(1, nbytes // (n_files * plane_nbytes))
+    ny, nz = PLANE_SHAPE
+    return FileSpecsGetter(
+        base_coords={"x": np.arange(n_planes), "y": np.arange(ny), "z": np.arange(nz)}
+    )
+
+
+def write_file_set(directory: pathlib.Path, n_files: int) -> FileSet:
+    """
+    Writes a set of files with random data, one at a time to bound the memory.
+
+    Args:
+        directory: Directory receiving the files.
+        n_files: Number of files.
+
+    Returns:
+        The file set.
+    """
+    file_specs_getter = get_file_specs_getter(n_files)
+    dataset_generator = DatasetGenerator(file_specs_getter.reader)
+    for time in range(n_files):
+        filename = file_specs_getter.filename_template.format(name="ux", digits=time)
+        dataset = dataset_generator(iter([directory / filename]))
+        dataset.binary_engine.to_file(file_specs_getter.writer, directory)
+    nbytes = sum(path.stat().st_size for path in directory.glob("*.bin"))
+    return FileSet(directory, file_specs_getter, nbytes)
+
+
+@pytest.fixture(scope="module", params=[1, 16, 64], ids="{}-files".format)
+def file_set(request, tmp_path_factory) -> FileSet:
+    directory = tmp_path_factory.mktemp(f"files-{request.param}")
+    return write_file_set(directory, request.param)
+
+
+@pytest.fixture(scope="module")
+def single_file(tmp_path_factory) -> FileSet:
+    return write_file_set(tmp_path_factory.mktemp("single-file"), 1)
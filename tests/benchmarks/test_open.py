@@ -0,0 +1,16 @@
+import xarray as xr
+
+
+def test_open_mfdataset(file_set, benchmark):
+    def helper():
+        ds = xr.open_mfdataset(
+            file_set.paths,
+            engine="binfile",
+            read_specs_getter=file_set.file_specs_getter.reader,
+        )
+        ds.close()
+        return ds
+
+    benchmark.extra_info["n_files"] = len(file_set.paths)
+    ds = benchmark(helper)
+    assert ds.sizes["time"] == len(file_set.paths)
@@ -0,0 +1,65 @@
+from collections.abc import Iterator
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from xarray_binfile.read import open_binfile_series
+from xarray_binfile.read.array import BinaryEngineBackendArray
+from xarray_binfile.read.file_manager import MappedFile
+
+from .conftest import BENCHMARK_NBYTES
+
+# the result, with some room for the interpreter and the libraries
+LIMIT_MEMORY = f"{BENCHMARK_NBYTES * 1.1 / 2**20 + 64:.0f} MB"
+
+
+@pytest.fixture(scope="module")
+def array(single_file) -> BinaryEngineBackendArray:
+    (path,) = single_file.paths
+    return BinaryEngineBackendArray(single_file.file_specs_getter.reader(path))
+
+
+@pytest.fixture(scope="module")
+def mapped_file(array) -> Iterator[MappedFile]:
+    mapped_file = MappedFile(array.metadata.filepath)
+    yield mapped_file
+    mapped_file.close()
+
+
+@pytest.mark.limit_memory(LIMIT_MEMORY)
+@pytest.mark.parametrize(
+    "key",
+    [
+        (slice(None), slice(None), slice(None), slice(None)),
+        (slice(None, None, 2), slice(None), slice(None), slice(None)),
+        (slice(None), slice(10, 20), slice(None), slice(None)),
+        (slice(None), slice(None), slice(None, None, 2), slice(None)),
+        (slice(None), np.arange(0, 256, 7), slice(None), slice(None)),
+    ],
+    ids=["full", "every-other-plane", "rows", "every-other-column", "fancy-rows"],
+)
+def test_read_binary_at_slices(single_file, array, mapped_file, key, benchmark):
+    def helper():
+        return array._read_binary_at_slices(mapped_file, key)
+
+    result = benchmark(helper)
+    benchmark.extra_info["nbytes"] = result.nbytes
+    assert result.shape == tuple(
+        np.arange(size)[k].size for k, size in zip(key, array.shape, strict=True)
+    )
+
+
+@pytest.mark.limit_memory(LIMIT_MEMORY)
+def test_load(file_set, benchmark):
+    def helper():
+        with open_binfile_series(
+            file_set.paths, file_set.file_specs_getter.reader
+        ) as ds:
+            return ds.load()
+
+    benchmark.extra_info["n_files"] = len(file_set.paths)
+    benchmark.extra_info["nbytes"] = file_set.nbytes
+    ds = benchmark(helper)
+    assert isinstance(ds, xr.Dataset)
+    assert ds.nbytes >= file_set.nbytes
@@ -0,0 +1,37 @@
+import shutil
+
+import dask.array
+import pytest
+
+from xarray_binfile.read import open_binfile_series
+
+
+@pytest.fixture(scope="module")
+def dataset(file_set):
+    # every chunk, one per file, shares the same block, so only a single chunk is
+    # held in memory whatever the size of the file set
+    with open_binfile_series(file_set.paths, file_set.file_specs_getter.reader) as ds:
+        ux = ds["ux"]
+        block = dask.array.from_array(ux.isel(time=[0]).to_numpy(), chunks=-1)
+        data = dask.array.concatenate(
+            [block] * ux.sizes["time"], axis=ux.dims.index("time")
+        )
+        return ds.copy(data={"ux": data})
+
+
+def test_to_file(file_set, dataset, tmp_path, benchmark):
+    directory = tmp_path / "out"
+
+    def setup():
+        shutil.rmtree(directory, ignore_errors=True)
+        directory.mkdir()
+
+    def helper():
+        dataset.binary_engine.to_file(file_set.file_specs_getter.writer, directory)
+
+    benchmark.extra_info["n_files"] = len(file_set.paths)
+    benchmark.extra_info["nbytes"] = file_set.nbytes
+    benchmark.pedantic(helper, setup=setup, rounds=3)
+    assert sum(path.stat().st_size for path in directory.glob("*.bin")) == (
+        file_set.nbytes
+    )
@@ -1,12 +1,41 @@
+import asyncio
+import mmap
 import pathlib
+from dataclasses import replace
 from functools import cached_property
+from typing import ClassVar
 
 import numpy as np
 import pytest
 import xarray as xr
+from xarray.indexes import RangeIndex
 
+from xarray_binfile.read import (
+    FileStatistics,
+    PackedReadSpecs,
+    ReadSpecs,
+    RegularCoord,
+    collect_read_stats,
+    file_manager,
+    iter_steps,
+    load_binfile_series,
+    open_binfile_series,
+    open_binfile_tiles,
+    refresh_dataset,
+    select_paths,
+    set_max_read_workers,
+)
+from xarray_binfile.read.executor import DEFAULT_MAX_READ_WORKERS
 from xarray_binfile.tutorial import DatasetGenerator, FileSpecsGetter
-from xarray_binfile.write import BinaryEngineDataset  # noqa F401
+from xarray_binfile.write import BinaryEngineDataset, WriteSpecs  # noqa F401
+
+
+def add_speed(dataset: xr.Dataset) -> xr.Dataset:
+    return dataset.assign(speed=np.hypot(dataset["ux"], dataset["uy"]))
+
+
+def sum_time(dataset: xr.Dataset) -> xr.Dataset:
+    return dataset.sum("time")
 
 
 class TestOpenDataset:
@@ -46,3 +75,503 @@ class TestOpenDataset:
             parallel=True,
         ).load()
         xr.testing.assert_equal(ds, self.dataset)
+
+    @pytest.mark.parametrize(
+        "chunks",
+        [
+            {"x": 2, "y": 5, "z": 3, "time": 2},
+            None,
+        ],
+    )
+    def test_open_binfile_series__success(self, write_files, chunks):
+        ds = open_binfile_series(
+            write_files.glob("*.bin"), self.file_specs_getter.reader
+        )
+        if chunks is not None:
+            ds = ds.chunk(chunks)
+        xr.testing.assert_equal(ds.load(), self.dataset)
+
+    def test_load_async(self, write_files):
+        async def load(ds: xr.Dataset) -> xr.Dataset:
+            return await ds.isel(x=[1, 3], z=slice(2, 9)).load_async()
+
+        ds = open_binfile_series(
+            write_files.glob("*.bin"), self.file_specs_getter.reader
+        )
+        xr.testing.assert_equal(
+            asyncio.run(load(ds)), self.dataset.isel(x=[1, 3], z=slice(2, 9))
+        )
+
+        with xr.open_dataset(
+            write_files / "ux-0002.bin",
+            engine="binfile",
+            read_specs_getter=self.file_specs_getter.reader,
+        ) as ds:
+            xr.testing.assert_equal(
+                asyncio.run(load(ds)),
+                self.dataset[["ux"]].isel(x=[1, 3], z=slice(2, 9), time=[2]),
+            )
+
+    def test_open_binfile_series__selection(self, write_files):
+        ds = open_binfile_series(
+            write_files.glob("*.bin"), self.file_specs_getter.reader
+        )
+        indexers = {"x": 1, "z": [0, 7, 14], "time": [4, 0, 2]}
+        xr.testing.assert_equal(ds.isel(indexers), self.dataset.isel(indexers))
+
+    def test_open__variables(self, write_files):
+        opened = []
+
+        def read_specs_getter(path: pathlib.Path) -> ReadSpecs:
+            opened.append(path.name)
+            return self.file_specs_getter.reader(path)
+
+        ds = open_binfile_series(
+            write_files.glob("*.bin"),
+            read_specs_getter,
+            variables=["uy"],
+            variable_names_getter=self.file_specs_getter.variable_names,
+        )
+        xr.testing.assert_equal(ds.load(), self.dataset[["uy"]])
+        assert sorted(opened) == [f"uy-{t:04}.bin" for t in range(5)]
+
+        opened.clear()
+        with xr.open_dataset(
+            write_files / "ux-0002.bin",
+            engine="binfile",
+            read_specs_getter=read_specs_getter,
+            variables="uy",
+            variable_names_getter=self.file_specs_getter.variable_names,
+        ) as ds:
+            assert not ds.variables
+        assert not opened
+
+        paths = select_paths(
+            write_files.glob("*.bin"),
+            self.file_specs_getter.variable_names,
+            drop_variables="ux",
+        )
+        ds = xr.open_mfdataset(
+            paths, engine="binfile", read_specs_getter=read_specs_getter
+        )
+        xr.testing.assert_equal(ds.load(), self.dataset[["uy"]])
+        assert sorted(opened) == [f"uy-{t:04}.bin" for t in range(5)]
+
+    @pytest.mark.parametrize("chunks", [{"x": 2, "time": 1}, None])
+    def test_open_binfile_series__statistics(self, tmp_path, chunks):
+        dataset = self.dataset if chunks is None else self.dataset.chunk(chunks)
+        dataset.binary_engine.to_file(
+            self.file_specs_getter.writer, tmp_path, statistics=True
+        )
+        (tmp_path / "uy-0003.bin.stats.json").unlink()
+
+        ds = open_binfile_series(
+            tmp_path.glob("*.bin"), self.file_specs_getter.reader, statistics=True
+        )
+        with collect_read_stats() as collector:
+            threshold = float(self.dataset["ux"].max(("x", "y", "z"))[2])
+            selected = ds.sel(time=ds["ux_max"] >= threshold)
+            xr.testing.assert_allclose(
+                ds["uy_mean"].reset_coords(drop=True),
+                self.dataset["uy"]
+                .mean(("x", "y", "z"))
+                .where(self.dataset["time"] != 3)
+                .reset_coords(drop=True),
+            )
+        assert not collector.total.calls
+        expected = self.dataset.sel(
+            time=self.dataset["ux"].max(("x", "y", "z")) >= threshold
+        )
+        xr.testing.assert_equal(
+            selected.reset_coords(drop=True).load(), expected.reset_coords(drop=True)
+        )
+
+    @pytest.mark.parametrize("transform", [None, add_speed])
+    def test_load_binfile_series(self, write_files, transform):
+        ds = load_binfile_series(
+            write_files.glob("*.bin"),
+            self.file_specs_getter.reader,
+            transform=transform,
+            max_workers=2,
+        )
+        expected = self.dataset if transform is None else transform(self.dataset)
+        xr.testing.assert_equal(ds, expected)
+        # the variables are views of the shared memory block
+        for data_array in ds.data_vars.values():
+            assert isinstance(data_array.values.base.base, mmap.mmap)
+
+    def test_load_binfile_series__invalid_transform(self, write_files):
+        with pytest.raises(ValueError, match="must keep the dimensions"):
+            load_binfile_series(
+                write_files.glob("*.bin"),
+                self.file_specs_getter.reader,
+                transform=sum_time,
+                max_workers=1,
+            )
+
+    @pytest.mark.parametrize("prefetch", [0, 2])
+    def test_iter_steps(self, write_files, prefetch):
+        ds = open_binfile_series(
+            write_files.glob("*.bin"), self.file_specs_getter.reader
+        )
+        with collect_read_stats() as collector:
+            steps = iter_steps(ds, prefetch=prefetch)
+            xr.testing.assert_equal(next(steps), self.dataset.isel(time=0))
+            # the steps read ahead of the current one are bounded
+            assert len(collector.files) <= 2 * (prefetch + 1)
+            for i, step in enumerate(steps, start=1):
+                xr.testing.assert_equal(step, self.dataset.isel(time=i))
+        assert collector.total.calls == len(collector.files) == 10
+
+        with pytest.raises(ValueError, match="must be non-negative"):
+            next(iter_steps(ds["ux"], prefetch=-1))
+
+    def test_iter_steps__resize_pool(self, write_files):
+        ds = open_binfile_series(
+            write_files.glob("*.bin"), self.file_specs_getter.reader
+        )
+        try:
+            for i, step in enumerate(iter_steps(ds, prefetch=2)):
+                # the pool is replaced while the iteration runs
+                set_max_read_workers(1 + i % 2)
+                xr.testing.assert_equal(step, self.dataset.isel(time=i))
+        finally:
+            set_max_read_workers(DEFAULT_MAX_READ_WORKERS)
+
+    @pytest.mark.parametrize("chunks", [{"x": 2, "time": 1}, None])
+    @pytest.mark.parametrize("method", ["mean", "stride"])
+    def test_open_binfile_series__overviews(self, tmp_path, chunks, method):
+        levels = ({"x": 2, "y": 2, "z": 2}, {"x": 4, "y": 4, "z": 4})
+
+        def writer(data_array: xr.DataArray):
+            for details in self.file_specs_getter.writer(data_array):
+                yield details._replace(overview_levels=levels, overview_method=method)
+
+        def decimate(dataset: xr.Dataset, factor: int) -> xr.Dataset:
+            factors = dict.fromkeys(("x", "y", "z"), factor)
+            if method == "mean":
+                return dataset.coarsen(factors, boundary="trim").mean()
+            return dataset.isel({d: slice(None, None, f) for d, f in factors.items()})
+
+        dataset = self.dataset if chunks is None else self.dataset.chunk(chunks)
+        dataset.binary_engine.to_file(writer, tmp_path)
+
+        for resolution, factor in (({"y": 4}, 2), ({"y": 2}, 4), ({"y": 6}, 1)):
+            expected = decimate(self.dataset, factor)
+            with collect_read_stats() as collector:
+                ds = open_binfile_series(
+                    tmp_path.glob("*.bin"),
+                    self.file_specs_getter.reader,
+                    resolution=resolution,
+                ).load()
+            xr.testing.assert_allclose(ds, expected)
+            assert collector.total.requested_nbytes == sum(
+                data_array.nbytes for data_array in expected.data_vars.values()
+            )
+
+        with xr.open_dataset(
+            tmp_path / "ux-0002.bin",
+            engine="binfile",
+            read_specs_getter=self.file_specs_getter.reader,
+            resolution={"y": 2},
+        ) as ds:
+            xr.testing.assert_allclose(
+                ds.load(), decimate(self.dataset[["ux"]].isel(time=[2]), 4)
+            )
+
+    def test_open_binfile_series__rewritten_overviews(self, tmp_path):
+        def writer(data_array: xr.DataArray):
+            for details in self.file_specs_getter.writer(data_array):
+                yield details._replace(overview_levels=({"y": 2},))
+
+        delayed = self.dataset.chunk().binary_engine.to_file(
+            writer, tmp_path, compute=False
+        )
+        # the sidecars are only saved once their levels are written
+        assert not list(tmp_path.glob("*.overviews.json"))
+        delayed.compute()
+        assert len(list(tmp_path.glob("*.overviews.json"))) == 10
+
+        rewritten = -self.dataset
+        rewritten.binary_engine.to_file(self.file_specs_getter.writer, tmp_path)
+        assert not list(tmp_path.glob("*.ovr*"))
+        assert not list(tmp_path.glob("*.overviews.json"))
+        ds = open_binfile_series(
+            tmp_path.glob("*.bin"),
+            self.file_specs_getter.reader,
+            resolution={"y": 2},
+        )
+        xr.testing.assert_equal(ds.load(), rewritten)
+
+    def test_open_binfile_series__regular_coords(self, write_files):
+        def read_specs_getter(path: pathlib.Path) -> ReadSpecs:
+            specs = self.file_specs_getter.reader(path)
+            time = float(np.asarray(specs.coords["time"])[0])
+            coords = {
+                "z": RegularCoord(0.0, 1.0, 15),
+                "time": RegularCoord(time, 1.0, 1),
+            }
+            return replace(specs, coords={**specs.coords, **coords})
+
+        ds = open_binfile_series(write_files.glob("*.bin"), read_specs_getter)
+        assert isinstance(ds.xindexes["z"], RangeIndex)
+        assert isinstance(ds.xindexes["time"], RangeIndex)
+        indexers = {"x": 1, "z": slice(2, 9), "time": [4, 0, 2]}
+        xr.testing.assert_equal(ds.isel(indexers), self.dataset.isel(indexers))
+        xr.testing.assert_equal(ds.load(), self.dataset)
+
+    def test_open_binfile_series__compressed(self, tmp_path):
+        file_specs_getter = replace(self.file_specs_getter, compression="zlib")
+        self.dataset.binary_engine.to_file(file_specs_getter.writer, tmp_path)
+
+        ds = open_binfile_series(tmp_path.glob("*.bin"), file_specs_getter.reader)
+        indexers = {"x": 1, "z": [0, 7, 14], "time": [4, 0, 2]}
+        xr.testing.assert_equal(ds.isel(indexers), self.dataset.isel(indexers))
+        xr.testing.assert_equal(ds.load(), self.dataset)
+
+    @pytest.mark.parametrize("chunks", [{"x": 2, "z": 4}, None])
+    def test_open_binfile_tiles(self, tmp_path, chunks):
+        def writer(data_array: xr.DataArray):
+            for details in self.file_specs_getter.writer(data_array):
+                yield details._replace(
+                    filename=details.filename.replace(".bin", ".npz"),
+                    tile_shape={"x": 2, "z": 4},
+                )
+
+        dataset = self.dataset if chunks is None else self.dataset.chunk(chunks)
+        dataset.binary_engine.to_file(writer, tmp_path, statistics=True)
+        assert len(list(tmp_path.glob("ux-0001.*.bin"))) == 3 * 4
+        tile_statistics = FileStatistics.load(tmp_path / "ux-0001.1.0.2.bin")
+        assert tile_statistics is not None
+        assert tile_statistics.max == float(
+            self.dataset["ux"].isel(x=slice(2, 4), z=slice(8, 12), time=1).max()
+        )
+
+        ds = open_binfile_tiles(tmp_path.glob("*.npz"))
+        assert ds["ux"].encoding["preferred_chunks"] == {
+            "x": 2,
+            "y": 10,
+            "z": 4,
+            "time": 1,
+        }
+        indexers = {"x": 1, "z": [0, 7, 14, 3], "time": [4, 0, 2]}
+        xr.testing.assert_equal(ds.isel(indexers), self.dataset.isel(indexers))
+        xr.testing.assert_equal(
+            asyncio.run(ds.isel(x=slice(1, 4)).load_async()),
+            self.dataset.isel(x=slice(1, 4)),
+        )
+        xr.testing.assert_equal(ds.load(), self.dataset)
+
+    @pytest.mark.parametrize(
+        ("change", "match"),
+        [
+            (
+                lambda specs: {"coords": {**specs.coords, "z": np.arange(1, 16)}},
+                "coordinate 'z' differs",
+            ),
+            (lambda specs: {"memory_dtype": np.float32}, "output dtype float32"),
+            (
+                lambda specs: {"storage_dims": ("time", "z", "y", "x")},
+                r"storage order \('time', 'z', 'y', 'x'\)",
+            ),
+        ],
+    )
+    def test_open_binfile_series__not_homogeneous(self, write_files, change, match):
+        file_specs_getter = FileSpecsGetter(
+            base_coords={"x": np.arange(5), "y": np.arange(10), "z": np.arange(15)}
+        )
+
+        def read_specs_getter(path: pathlib.Path) -> ReadSpecs:
+            specs = file_specs_getter.reader(path)
+            if np.asarray(specs.coords["time"])[0] == 3:
+                return replace(specs, **change(specs))
+            return specs
+
+        with pytest.raises(ValueError, match=match):
+            open_binfile_series(write_files.glob("*.bin"), read_specs_getter)
+
+
+class TestOpenPackedDataset:
+    random_generator = np.random.Generator(np.random.PCG64(1234))
+    coords: ClassVar = {"x": np.arange(4), "y": np.arange(3), "time": np.arange(6)}
+    variables: ClassVar = {"ux": np.float64, "uy": np.float32}
+
+    def read_specs_getter(self, path: pathlib.Path) -> PackedReadSpecs:
+        return PackedReadSpecs(
+            filepath=path,
+            variables=self.variables,
+            coords=self.coords,
+            offset=8,
+            record_marker_size=4,
+        )
+
+    @cached_property
+    def dataset(self) -> xr.Dataset:
+        return xr.Dataset(
+            {
+                name: (
+                    tuple(self.coords),
+                    self.random_generator.random(size=(4, 3, 6)).astype(dtype),
+                )
+                for name, dtype in self.variables.items()
+            },
+            coords=self.coords,
+        )
+
+    @pytest.fixture
+    def write_file(self, tmp_path) -> pathlib.Path:
+        file_path = tmp_path / "fields.bin"
+        with open(file_path, "wb") as file:
+            file.write(b"header!!")
+            for time in self.coords["time"]:
+                for data_array in self.dataset.data_vars.values():
+                    values = data_array.sel(time=time).to_numpy()
+                    marker = np.array([values.nbytes], dtype="<i4").tobytes()
+                    file.write(marker + values.tobytes() + marker)
+        return file_path
+
+    def test_open_dataset__success(self, write_file):
+        with xr.open_dataset(
+            write_file, engine="binfile", read_specs_getter=self.read_specs_getter
+        ) as ds:
+            xr.testing.assert_equal(ds.load(), self.dataset)
+
+    def test_open_dataset__shared_file_manager(self, write_file, monkeypatch):
+        file_managers = []
+
+        def get_file_manager(filepath, compression):
+            file_managers.append(file_manager.get_file_manager(filepath, compression))
+            return file_managers[-1]
+
+        monkeypatch.setattr(
+            "xarray_binfile.read.array.get_file_manager", get_file_manager
+        )
+        with xr.open_dataset(
+            write_file, engine="binfile", read_specs_getter=self.read_specs_getter
+        ) as ds:
+            ds.load()
+        assert len(file_managers) == 1
+
+    def test_open_dataset__drop_variables(self, write_file):
+        with xr.open_dataset(
+            write_file,
+            engine="binfile",
+            read_specs_getter=self.read_specs_getter,
+            drop_variables="ux",
+        ) as ds:
+            xr.testing.assert_equal(ds.load(), self.dataset.drop_vars("ux"))
+
+
+class TestAppendDataset:
+    random_generator = np.random.Generator(np.random.PCG64(1234))
+
+    @cached_property
+    def dataset(self) -> xr.Dataset:
+        return xr.Dataset(
+            {
+                name: (("time", "x", "y"), self.random_generator.random(size=(6, 4, 3)))
+                for name in ("ux", "uy")
+            },
+            coords={"time": np.arange(6) * 0.5, "x": np.arange(4), "y": np.arange(3)},
+        )
+
+    @staticmethod
+    def writer(data_array: xr.DataArray):
+        yield WriteSpecs(
+            f"{data_array.name}.bin",
+            data_array,
+            record_dim="time",
+            record_marker_size=4,
+        )
+
+    def read_specs_getter(self, path: pathlib.Path) -> ReadSpecs:
+        return ReadSpecs(
+            filepath=path,
+            dtype=np.float64,
+            coords={"time": self.dataset["time"][:2].to_numpy()}
+            | {dim: self.dataset[dim].to_numpy() for dim in ("x", "y")},
+            name=path.stem,
+            record_dim="time",
+            record_marker_size=4,
+        )
+
+    @pytest.mark.parametrize("compute", [True, False])
+    def test_append__refresh(self, tmp_path, compute):
+        self.dataset.isel(time=slice(2)).binary_engine.to_file(self.writer, tmp_path)
+        ds = open_binfile_series(tmp_path.glob("*.bin"), self.read_specs_getter)
+        ds_ux = xr.open_dataset(
+            tmp_path / "ux.bin",
+            engine="binfile",
+            read_specs_getter=self.read_specs_getter,
+        )
+        ds_ux["ux"].isel(time=0).load()
+
+        for time in range(2, 6):
+            delayed = (
+                self.dataset.isel(time=[time])
+                .chunk()
+                .binary_engine.to_file(self.writer, tmp_path, mode="a", compute=compute)
+            )
+            if not compute:
+                delayed.compute()
+        with open(tmp_path / "uy.bin", "ab") as file:
+            file.write(b"partial record")
+
+        xr.testing.assert_equal(refresh_dataset(ds).load(), self.dataset)
+        xr.testing.assert_equal(refresh_dataset(ds_ux).load(), self.dataset[["ux"]])
+        ds.close()
+        ds_ux.close()
+
+    def test_append__from_empty_files(self, tmp_path):
+        def read_specs_getter(path: pathlib.Path) -> ReadSpecs:
+            return replace(
+                self.read_specs_getter(path),
+                coords={"time": RegularCoord(0.0, 0.5, 0)}
+                | {dim: self.dataset[dim].to_numpy() for dim in ("x", "y")},
+            )
+
+        for name in ("ux", "uy"):
+            (tmp_path / f"{name}.bin").touch()
+        ds = open_binfile_series(tmp_path.glob("*.bin"), read_specs_getter)
+        ds_ux = xr.open_dataset(
+            tmp_path / "ux.bin", engine="binfile", read_specs_getter=read_specs_getter
+        )
+        assert ds_ux["ux"].isel(x=0).load().shape == (0, 3)
+        assert ds.sizes["time"] == 0
+
+        self.dataset.binary_engine.to_file(self.writer, tmp_path, mode="a")
+
+        xr.testing.assert_equal(refresh_dataset(ds).load(), self.dataset)
+        xr.testing.assert_equal(refresh_dataset(ds_ux).load(), self.dataset[["ux"]])
+        ds.close()
+        ds_ux.close()
+
+    def test_append__refresh_dask(self, tmp_path):
+        self.dataset.isel(time=slice(2)).binary_engine.to_file(self.writer, tmp_path)
+        ds_ux = xr.open_mfdataset(
+            [tmp_path / "ux.bin"],
+            engine="binfile",
+            read_specs_getter=self.read_specs_getter,
+        )
+        ds = xr.open_dataset(
+            tmp_path / "uy.bin",
+            engine="binfile",
+            read_specs_getter=self.read_specs_getter,
+            chunks={"time": 2},
+        )
+        self.dataset.isel(time=slice(2, None)).binary_engine.to_file(
+            self.writer, tmp_path, mode="a"
+        )
+
+        refreshed = refresh_dataset(ds)
+        assert refreshed["uy"].chunks == ((2, 2, 2), (4,), (3,))
+        xr.testing.assert_equal(refreshed.load(), self.dataset[["uy"]])
+        refreshed = refresh_dataset(ds_ux)
+        assert refreshed["ux"].chunks is not None
+        xr.testing.assert_equal(refreshed.load(), self.dataset[["ux"]])
+        with pytest.raises(ValueError, match="Cannot refresh"):
+            refresh_dataset(ds_ux.isel(x=slice(2)))
+        with pytest.raises(ValueError, match="Cannot refresh"):
+            refresh_dataset(ds_ux + 1)
+        ds.close()
+        ds_ux.close()
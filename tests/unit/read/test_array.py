@@ -1,9 +1,19 @@
+import gc
 import pathlib
+import pickle
+import sys
+import weakref
 
 import numpy as np
 import pytest
+import xarray as xr
+from xarray.backends.file_manager import FILE_CACHE
+from xarray.core import indexing
 
-from xarray_binfile.read.array import BinaryEngineBackendArray, _is_coord_sliced
+from xarray_binfile.read.array import BinaryEngineBackendArray
+from xarray_binfile.read.buffers import BufferPool
+from xarray_binfile.read.byte_ranges import MIN_RUN_NBYTES
+from xarray_binfile.read.file_manager import MappedFile
 from xarray_binfile.read.file_metadata import ReadSpecs, ReadSpecsGetterProtocol
 from xarray_binfile.typing import AttributesLike, CoordsLike, DTypeLike
 
@@ -25,63 +35,373 @@ def file_read_specs_getter_factory(
     return helper
 
 
-@pytest.mark.parametrize(
-    ("size", "slice_spec", "expected"),
-    [
-        (100, slice(0, 100), False),
-        (100, slice(0, 50), True),
-        (100, slice(50, 100), True),
-        (100, slice(0, 100, 2), True),
-        (100, slice(1, 100), True),
-        (100, slice(0, 99), True),
-        (100, slice(None), False),
-    ],
-)
-def test_is_coord_sliced(size: int, slice_spec: slice, *, expected: bool):
-    actual = _is_coord_sliced(size, slice_spec)
-    assert actual == expected
-
-
-class TestArrayBenchmark:
+class TestArrayIndexing:
+    shape = (6, 7, 130)
     random_generator = np.random.Generator(np.random.PCG64(1234))
 
     @pytest.fixture
-    def file_path(self, tmp_path):
-        return tmp_path / "test.bin"
+    def write_array(self, tmp_path) -> np.ndarray:
+        array = self.random_generator.random(size=self.shape)
+        array.tofile(tmp_path / "test.bin")
+        return array
 
     @pytest.fixture
-    def metadata(self, file_path):
+    def array(self, tmp_path, write_array) -> BinaryEngineBackendArray:
         read_specs_getter = file_read_specs_getter_factory(
-            coords={"x": range(1000), "y": range(100), "z": range(100)}
+            coords={"x": range(6), "y": range(7), "z": range(130)}
+        )
+        read_specs = read_specs_getter(tmp_path / "test.bin")
+        assert isinstance(read_specs, ReadSpecs)
+        return BinaryEngineBackendArray(read_specs)
+
+    @pytest.mark.parametrize(
+        "key",
+        [
+            (slice(None), slice(None), slice(None)),
+            (slice(1, 4), slice(None), slice(None)),
+            (slice(None), slice(2, 5), slice(None)),
+            (slice(None), slice(None), slice(3, 100)),
+            (slice(None), slice(None), slice(None, None, 2)),
+            (slice(None, None, -1), slice(None), slice(None)),
+            (2, slice(None), slice(None)),
+            (slice(None), 3, 4),
+            (np.array([0, 5, 2]), slice(None), slice(None)),
+            (slice(None), np.array([1, 2, 6]), slice(10, 90)),
+            (slice(None), slice(None), np.array([0, 7, 14])),
+            (np.array([4, 1]), 2, np.array([5, 6, 7, 120])),
+            (slice(0, 0), slice(None), slice(None)),
+        ],
+    )
+    @pytest.mark.parametrize("min_run_nbytes", [0, MIN_RUN_NBYTES])
+    def test_outer_indexing(self, array, write_array, key, min_run_nbytes, monkeypatch):
+        monkeypatch.setattr("xarray_binfile.read.array.MIN_RUN_NBYTES", min_run_nbytes)
+        indices = [
+            np.atleast_1d(np.arange(s)[k]) for k, s in zip(key, self.shape, strict=True)
+        ]
+        int_axes = tuple(i for i, k in enumerate(key) if isinstance(k, int))
+        expected = write_array[np.ix_(*indices)].squeeze(axis=int_axes)
+
+        actual = array[indexing.OuterIndexer(key)]
+        assert np.array_equal(actual, expected)
+
+        out = np.empty(expected.shape, dtype=array.dtype)
+        assert array.read_into(out, key) is out
+        assert np.array_equal(out, expected)
+
+    def test_vectorized_indexing(self, array, write_array):
+        key = (np.array([0, 5, 2]), slice(None), np.array([1, 3, 100]))
+
+        actual = array[indexing.VectorizedIndexer(key)]
+        assert np.array_equal(actual, write_array[key])
+
+
+class TestArrayDtypeConversion:
+    shape = (6, 7, 130)
+    random_generator = np.random.Generator(np.random.PCG64(1234))
+
+    @pytest.fixture
+    def write_array(self, tmp_path) -> np.ndarray:
+        array = self.random_generator.random(size=self.shape).astype(">f4")
+        array.tofile(tmp_path / "test.bin")
+        return array
+
+    @pytest.fixture
+    def array(self, tmp_path, write_array) -> BinaryEngineBackendArray:
+        return BinaryEngineBackendArray(
+            ReadSpecs(
+                filepath=tmp_path / "test.bin",
+                dtype=">f4",
+                coords={"x": range(6), "y": range(7), "z": range(130)},
+                name="test",
+                memory_dtype=np.float64,
+            )
         )
-        return read_specs_getter(file_path)
+
+    @pytest.mark.parametrize(
+        "key",
+        [
+            (slice(None), slice(None), slice(None)),
+            (slice(1, 4), slice(None), slice(None)),
+            (slice(None), 3, 4),
+            (np.array([4, 1]), 2, np.array([5, 6, 7, 120])),
+            (slice(0, 0), slice(None), slice(None)),
+        ],
+    )
+    @pytest.mark.parametrize("min_run_nbytes", [0, MIN_RUN_NBYTES])
+    def test_outer_indexing(self, array, write_array, key, min_run_nbytes, monkeypatch):
+        monkeypatch.setattr("xarray_binfile.read.array.MIN_RUN_NBYTES", min_run_nbytes)
+        # small chunks, so the conversion spans several of them
+        monkeypatch.setattr("xarray_binfile.read.array.CONVERT_CHUNK_NBYTES", 256)
+
+        indices = [
+            np.atleast_1d(np.arange(s)[k]) for k, s in zip(key, self.shape, strict=True)
+        ]
+        int_axes = tuple(i for i, k in enumerate(key) if isinstance(k, int))
+        expected = write_array[np.ix_(*indices)].squeeze(axis=int_axes)
+
+        actual = array[indexing.OuterIndexer(key)]
+        assert array.dtype == actual.dtype == np.float64
+        assert np.array_equal(actual, expected)
+
+        out = np.empty(expected.shape, dtype=array.dtype)
+        assert np.array_equal(array.read_into(out, key), expected)
+
+
+class TestArrayStorageOrder:
+    shape = (6, 7, 130)
+    random_generator = np.random.Generator(np.random.PCG64(1234))
+
+    @pytest.fixture
+    def write_array(self, tmp_path) -> np.ndarray:
+        array = self.random_generator.random(size=self.shape)
+        array.tofile(tmp_path / "test.bin")  # stored with dims ("x", "y", "z")
+        return array.transpose(2, 0, 1)
 
     @pytest.fixture
-    def array(self, metadata):
-        return BinaryEngineBackendArray(metadata)
+    def array(self, tmp_path, write_array) -> BinaryEngineBackendArray:
+        return BinaryEngineBackendArray(
+            ReadSpecs(
+                filepath=tmp_path / "test.bin",
+                dtype=np.float64,
+                coords={"z": range(130), "x": range(6), "y": range(7)},
+                name="test",
+                storage_dims=("x", "y", "z"),
+            )
+        )
+
+    @pytest.mark.parametrize(
+        "key",
+        [
+            (slice(None), slice(None), slice(None)),
+            (slice(3, 100), slice(1, 4), slice(None)),
+            (4, slice(None), 3),
+            (np.array([5, 6, 7, 120]), np.array([4, 1]), 2),
+        ],
+    )
+    @pytest.mark.parametrize("min_run_nbytes", [0, MIN_RUN_NBYTES])
+    def test_outer_indexing(self, array, write_array, key, min_run_nbytes, monkeypatch):
+        monkeypatch.setattr("xarray_binfile.read.array.MIN_RUN_NBYTES", min_run_nbytes)
+        shape = write_array.shape
+        indices = [
+            np.atleast_1d(np.arange(s)[k]) for k, s in zip(key, shape, strict=True)
+        ]
+        int_axes = tuple(i for i, k in enumerate(key) if isinstance(k, int))
+        expected = write_array[np.ix_(*indices)].squeeze(axis=int_axes)
+
+        actual = array[indexing.OuterIndexer(key)]
+        assert np.array_equal(actual, expected)
+
+        out = np.empty(expected.shape, dtype=array.dtype)
+        assert array.read_into(out, key) is out
+        assert np.array_equal(out, expected)
+
+
+class TestArrayBufferPool:
+    shape = (6, 7, 130)
 
     @pytest.fixture
-    def write_array(self, file_path, metadata) -> np.ndarray:
-        array = self.random_generator.random(size=metadata.shape, dtype=metadata.dtype)
-        array.tofile(file_path)
+    def write_array(self, tmp_path) -> np.ndarray:
+        array = np.arange(np.prod(self.shape), dtype=np.float64).reshape(self.shape)
+        array.tofile(tmp_path / "test.bin")
         return array
 
-    @pytest.mark.limit_memory("86 MB")
-    def test_read_array__numpy_fromfile(self, file_path, array, write_array, benchmark):
-        def helper():
-            with open(file_path, "rb") as file:
-                return array._wrap_numpy_fromfile(file)  # noqa: SLF001
+    @pytest.fixture
+    def metadata(self, tmp_path, write_array) -> ReadSpecs:
+        return ReadSpecs(
+            filepath=tmp_path / "test.bin",
+            dtype=np.float64,
+            coords={"x": range(6), "y": range(7), "z": range(130)},
+            name="test",
+        )
+
+    @pytest.mark.parametrize("min_run_nbytes", [0, MIN_RUN_NBYTES])
+    def test_reads_reuse_buffers(
+        self, metadata, write_array, min_run_nbytes, monkeypatch
+    ):
+        monkeypatch.setattr("xarray_binfile.read.array.MIN_RUN_NBYTES", min_run_nbytes)
+        pool = BufferPool()
+        array = BinaryEngineBackendArray(metadata, buffer_pool=pool)
+
+        for i in range(6):
+            actual = array[indexing.OuterIndexer((i, slice(None), slice(2, 9)))]
+            assert np.array_equal(actual, write_array[i, :, 2:9])
+            pool.release(actual)
+        assert pool.allocations == 1
+
+    def test_dataset_chunks_reuse_buffers(self, metadata, write_array):
+        pool = BufferPool()
+        dataset = BinaryEngineBackendArray(
+            metadata, buffer_pool=pool
+        ).get_xarray_dataset()
+
+        for i in range(6):
+            chunk = dataset["test"].isel(x=i).values
+            assert np.array_equal(chunk, write_array[i])
+            pool.release(chunk)
+        assert pool.allocations == 1
+
+    def test_release__unknown(self):
+        with pytest.raises(ValueError, match="not acquired from this pool"):
+            BufferPool().release(np.empty(3))
+
+    def test_unreleased_arrays_are_collected(self):
+        pool = BufferPool()
+        array = pool.acquire((3,), np.float64)
+        collected = weakref.ref(array)
+
+        del array
+        gc.collect()
+
+        assert collected() is None
+        assert not pool._lent
+
+    def test_read_into__invalid(self, metadata, write_array):
+        array = BinaryEngineBackendArray(metadata)
+
+        with pytest.raises(ValueError, match="Expected a writable array"):
+            array.read_into(np.empty((6, 7, 1)), (slice(None), slice(None), 0))
+        with pytest.raises(ValueError, match="Expected a writable array"):
+            array.read_into(np.empty(self.shape, dtype=np.float32))
+
+
+class TestArrayFileCache:
+    @pytest.fixture
+    def write_arrays(self, tmp_path) -> dict[pathlib.Path, np.ndarray]:
+        arrays = {}
+        for i in range(3):
+            file_path = tmp_path / f"test-{i}.bin"
+            arrays[file_path] = np.full((4, 5), i, dtype=np.float64)
+            arrays[file_path].tofile(file_path)
+        return arrays
+
+    @staticmethod
+    def get_array(file_path: pathlib.Path) -> BinaryEngineBackendArray:
+        read_specs_getter = file_read_specs_getter_factory(
+            coords={"x": range(4), "y": range(5)}
+        )
+        read_specs = read_specs_getter(file_path)
+        assert isinstance(read_specs, ReadSpecs)
+        return BinaryEngineBackendArray(read_specs)
+
+    def test_reads_reuse_the_cached_file(self, write_arrays):
+        array = self.get_array(next(iter(write_arrays)))
+        key = (slice(None), slice(None))
+
+        with array._file_manager.acquire_context() as first:
+            array._raw_indexing_method(key)
+            with array._file_manager.acquire_context() as second:
+                assert first is second
+
+    def test_eviction_respects_file_cache_maxsize(self, write_arrays):
+        arrays = {path: self.get_array(path) for path in write_arrays}
+        key = (slice(None), slice(None))
+
+        with xr.set_options(file_cache_maxsize=1):
+            first_array = next(iter(arrays.values()))
+            first_file = first_array._file_manager.acquire()
+            for _ in range(2):
+                for path, array in arrays.items():
+                    actual = array._raw_indexing_method(key)
+                    assert np.array_equal(actual, write_arrays[path])
+                    assert len(FILE_CACHE) == 1
+            # the file was evicted by the others, so it is opened again
+            assert first_array._file_manager.acquire() is not first_file
+
+    def test_pickle_roundtrip(self, write_arrays):
+        path = next(iter(write_arrays))
+        array = pickle.loads(pickle.dumps(self.get_array(path)))
+
+        actual = array._raw_indexing_method((slice(1, 3), slice(None)))
+        assert np.array_equal(actual, write_arrays[path][1:3])
+
+    @pytest.mark.skipif(
+        not pathlib.Path("/proc/self/fd").exists(), reason="needs /proc/self/fd"
+    )
+    def test_file_descriptors(self, write_arrays):
+        before = len(list(pathlib.Path("/proc/self/fd").iterdir()))
 
-        result = benchmark(helper)
-        assert np.array_equal(result, write_array)
+        mapped_file = MappedFile(next(iter(write_arrays)))
+        opened = len(list(pathlib.Path("/proc/self/fd").iterdir())) - before
+        mapped_file.close()
 
-    @pytest.mark.limit_memory("86 MB")
-    def test_read_array__numpy_memmap(self, file_path, array, write_array, benchmark):
-        keys = tuple(slice(None) for _ in array.metadata.shape)
+        # the memory map holds a duplicate of the descriptor before Python 3.13
+        assert opened == (1 if sys.version_info >= (3, 13) else 2)
+
+
+class TestArrayRecordLayout:
+    random_generator = np.random.Generator(np.random.PCG64(1234))
+
+    @pytest.mark.parametrize("marker_size", [0, 4, 8])
+    @pytest.mark.parametrize("offset", [0, 16])
+    def test_single_record(self, tmp_path, offset, marker_size):
+        file_path = tmp_path / "ux.bin"
+        expected = self.random_generator.random(size=(4, 5))
+        marker = np.array([expected.nbytes], dtype=f"<i{marker_size or 4}")
+        with open(file_path, "wb") as file:
+            file.write(b"h" * offset)
+            file.write(marker.tobytes()[:marker_size])
+            expected.tofile(file)
+            file.write(marker.tobytes()[:marker_size])
+        metadata = ReadSpecs(
+            filepath=file_path,
+            dtype=np.float64,
+            coords={"x": range(4), "y": range(5)},
+            name="ux",
+            offset=offset,
+            record_marker_size=marker_size,
+        )
+        array = BinaryEngineBackendArray(metadata)
+
+        for key in [(slice(None), slice(None)), (slice(1, 3), slice(None, None, 2))]:
+            actual = array._raw_indexing_method(key)
+            assert np.array_equal(actual, expected[key])
+
+    @pytest.mark.parametrize("padding", [0, 24])
+    def test_strided_records(self, tmp_path, padding):
+        file_path = tmp_path / "ux.bin"
+        expected = self.random_generator.random(size=(4, 5, 3))
+        marker = np.array([expected[..., 0].nbytes], dtype="<i4").tobytes()
+        with open(file_path, "wb") as file:
+            file.write(b"header")
+            for t in range(expected.shape[-1]):
+                file.write(marker)
+                expected[..., t].tofile(file)
+                file.write(marker)
+                file.write(b"p" * padding)
+        metadata = ReadSpecs(
+            filepath=file_path,
+            dtype=np.float64,
+            coords={"x": range(4), "y": range(5), "time": range(3)},
+            name="ux",
+            offset=6,
+            record_dim="time",
+            record_marker_size=4,
+            record_stride=expected[..., 0].nbytes + 8 + padding,
+        )
+        array = BinaryEngineBackendArray(metadata)
 
-        def helper():
-            with open(file_path, "rb") as file:
-                return array._wrap_numpy_memmap(file, key=keys)  # noqa: SLF001
+        for key in [
+            (slice(None), slice(None), slice(None)),
+            (slice(1, 3), slice(None), slice(1, 3)),
+        ]:
+            actual = array._raw_indexing_method(key)
+            assert np.array_equal(actual, expected[key])
 
-        result = benchmark(helper)
-        assert np.array_equal(result, write_array)
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"offset": -1},
+            {"record_marker_size": -4},
+            {"record_dim": "t"},
+            {"record_dim": "y", "record_stride": 8},
+        ],
+    )
+    def test_invalid_layout(self, kwargs):
+        with pytest.raises(ValueError):
+            ReadSpecs(
+                filepath=pathlib.Path("ux.bin"),
+                dtype=np.float64,
+                coords={"x": range(4), "y": range(5)},
+                name="ux",
+                **kwargs,
+            )
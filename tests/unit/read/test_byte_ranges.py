@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from xarray_binfile.read.byte_ranges import ByteRanges, OuterSelection
+
+SHAPE = (4, 5, 6)
+STRIDES = (240, 48, 8)
+
+
+@pytest.mark.parametrize(
+    ("key", "expected_starts", "expected_nbytes"),
+    [
+        ((slice(None), slice(None), slice(None)), [0], 960),
+        ((slice(1, 3), slice(None), slice(None)), [240], 480),
+        ((slice(None), slice(1, 3), slice(None)), [48, 288, 528, 768], 96),
+        ((1, slice(None), slice(2, 4)), [256, 304, 352, 400, 448], 16),
+        (
+            (slice(None), slice(None), np.array([0, 5])),
+            np.arange(0, 960, 8)[np.tile([True, False, False, False, False, True], 20)],
+            8,
+        ),
+        ((np.array([3, 0]), slice(None), slice(None)), [720, 0], 240),
+        ((slice(0, 0), slice(None), slice(None)), [], 0),
+    ],
+)
+def test_byte_ranges_from_selection(key, expected_starts, expected_nbytes):
+    selection = OuterSelection.from_key(key, SHAPE)
+
+    actual = ByteRanges.from_selection(selection, STRIDES, itemsize=8)
+
+    assert actual.nbytes == expected_nbytes
+    assert np.array_equal(actual.starts, expected_starts)
+
+
+def test_outer_selection_from_key__long_axes():
+    # a small selection of very long axes does not enumerate them
+    selection = OuterSelection.from_key(
+        (slice(5, 15), -1, np.array([-2, 3])), (10**15, 10**15, 10**15)
+    )
+
+    assert selection.shape == (10, 1, 2)
+    assert np.array_equal(selection.indices[0], np.arange(5, 15))
+    assert np.array_equal(selection.indices[1], [10**15 - 1])
+    assert np.array_equal(selection.indices[2], [10**15 - 2, 3])
+    assert selection.int_axes == (1,)
+    with pytest.raises(IndexError, match="out of bounds"):
+        OuterSelection.from_key((np.array([0, 4]),), (4,))
+
+
+def test_byte_ranges_with_offset_and_record_stride():
+    selection = OuterSelection.from_key((1, slice(None), slice(None)), (4, 2, 3))
+
+    actual = ByteRanges.from_selection(selection, (100, 24, 8), itemsize=8, offset=4)
+
+    assert actual.nbytes == 48
+    assert np.array_equal(actual.starts, [104])
+
+
+def test_byte_ranges_skip_axes_of_size_one():
+    selection = OuterSelection.from_key((slice(None), slice(None), 0), (2, 3, 1))
+
+    actual = ByteRanges.from_selection(selection, (24, 8, 100), itemsize=8)
+
+    assert actual.nbytes == 48
+    assert np.array_equal(actual.starts, [0])
+
+
+@pytest.mark.parametrize(
+    ("starts", "max_gap", "expected"),
+    [
+        ([0, 16, 32], 0, [(0, [(0, 48)])]),
+        ([0, 24, 48], 8, [(0, [(0, 16), (-1, 8), (16, 16), (-1, 8), (32, 16)])]),
+        ([0, 24, 48], 4, [(0, [(0, 16)]), (24, [(16, 16)]), (48, [(32, 16)])]),
+        ([32, 0, 16], 8, [(32, [(0, 16)]), (0, [(16, 32)])]),
+        ([], 8, []),
+    ],
+)
+def test_byte_ranges_coalesce(starts, max_gap, expected):
+    ranges = ByteRanges(np.array(starts, dtype=np.int64), nbytes=16)
+
+    actual = list(ranges.coalesce(max_gap))
+
+    assert actual == expected
+
+
+@pytest.mark.parametrize(
+    ("nbytes", "expected_starts", "expected_nbytes"),
+    [
+        (32, [0, 200], 32),
+        (96, [0, 48, 200, 248], 48),
+        (256, [0, 64, 128, 192, 200, 264, 328, 392], 64),
+        (104, [0, 200], 104),  # 13 elements cannot be split evenly
+    ],
+)
+def test_byte_ranges_split(nbytes, expected_starts, expected_nbytes):
+    ranges = ByteRanges(np.array([0, 200], dtype=np.int64), nbytes=nbytes)
+
+    actual = ranges.split(itemsize=8, max_nbytes=64)
+
+    assert actual.nbytes == expected_nbytes
+    assert np.array_equal(actual.starts, expected_starts)
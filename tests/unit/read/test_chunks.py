@@ -0,0 +1,95 @@
+import pathlib
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from xarray_binfile.read import open_binfile_series
+from xarray_binfile.read.chunks import get_preferred_chunks
+from xarray_binfile.read.file_metadata import ReadSpecs
+from xarray_binfile.tutorial import FileSpecsGetter
+from xarray_binfile.write import BinaryEngineDataset  # noqa F401
+
+COORDS = {"x": range(100), "y": range(32), "z": range(64)}
+ROW_NBYTES = 32 * 64 * 8
+
+
+@pytest.mark.parametrize(
+    ("target_nbytes", "alignment", "expected"),
+    [
+        (1 << 30, 1, {"x": 100, "y": 32, "z": 64}),
+        (22 * ROW_NBYTES, 1, {"x": 22, "y": 32, "z": 64}),
+        (22 * ROW_NBYTES, 4 * ROW_NBYTES, {"x": 20, "y": 32, "z": 64}),
+        # too few rows to align them, so the target is kept
+        (3 * ROW_NBYTES, 4 * ROW_NBYTES, {"x": 3, "y": 32, "z": 64}),
+        (8 * 64 * 4, 1, {"x": 1, "y": 4, "z": 64}),
+        (8, 1, {"x": 1, "y": 1, "z": 1}),
+    ],
+)
+def test_get_preferred_chunks(target_nbytes, alignment, expected):
+    specs = ReadSpecs(pathlib.Path("ux.bin"), "<f8", COORDS, "ux")
+
+    assert get_preferred_chunks(specs, target_nbytes, alignment) == expected
+
+
+def test_get_preferred_chunks__records():
+    specs = ReadSpecs(
+        pathlib.Path("ux.bin"),
+        "<f8",
+        {"time": range(10), "x": range(100)},
+        "ux",
+        record_dim="time",
+        record_marker_size=4,
+    )
+
+    # records are not contiguous, so they are never merged with the trailing dims
+    assert get_preferred_chunks(specs, 1 << 30, alignment=4096) == {
+        "time": 10,
+        "x": 100,
+    }
+    assert get_preferred_chunks(specs, 3 * 800, alignment=4096) == {
+        "time": 3,
+        "x": 100,
+    }
+
+
+def test_open_dataset__preferred_chunks(tmp_path):
+    file_specs_getter = FileSpecsGetter(base_coords={"x": range(100), "y": range(30)})
+    dataset = xr.Dataset(
+        {"ux": (("x", "y", "time"), np.ones((100, 30, 1)))},
+        coords={"time": [0]},
+    )
+    dataset.binary_engine.to_file(file_specs_getter.writer, tmp_path)
+
+    with xr.open_dataset(
+        tmp_path / "ux-0000.bin",
+        engine="binfile",
+        read_specs_getter=file_specs_getter.reader,
+        chunk_nbytes=10 * 30 * 8,
+        chunks={},
+    ) as ds:
+        assert ds.ux.encoding["preferred_chunks"] == {"x": 10, "y": 30, "time": 1}
+        assert ds.ux.chunks == ((10,) * 10, (30,), (1,))
+
+
+def test_open_binfile_series__preferred_chunks(tmp_path):
+    lengths = [3, 1, 5]
+    for i, length in enumerate(lengths):
+        np.ones((length, 100)).tofile(tmp_path / f"ux-{i:04}.bin")
+
+    def read_specs_getter(path: pathlib.Path) -> ReadSpecs:
+        i = int(path.stem.removeprefix("ux-"))
+        first = sum(lengths[:i])
+        return ReadSpecs(
+            path,
+            "<f8",
+            {"time": range(first, first + lengths[i]), "x": range(100)},
+            "ux",
+            record_dim="time",
+        )
+
+    ds = open_binfile_series(
+        tmp_path.glob("*.bin"), read_specs_getter, chunk_nbytes=2 * 100 * 8
+    )
+
+    assert ds.ux.encoding["preferred_chunks"] == {"time": (2, 1, 1, 2, 2, 1), "x": 100}
@@ -0,0 +1,60 @@
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pytest
+from xarray.indexes import RangeIndex
+
+from xarray_binfile.read import ReadSpecs, RegularCoord
+from xarray_binfile.read.coordinates import concatenate_coords, get_coordinates
+
+
+@pytest.mark.parametrize(
+    "key", [slice(None), slice(2, 7), slice(None, None, 3), slice(8, 1, -2), -1, 4]
+)
+def test_regular_coord__getitem(key):
+    coord = RegularCoord(1.5, 0.25, 10)
+
+    np.testing.assert_array_equal(
+        np.asarray(coord[key]), (1.5 + 0.25 * np.arange(10))[key]
+    )
+
+
+def test_regular_coord__invalid():
+    with pytest.raises(ValueError, match="Invalid regular coordinate"):
+        RegularCoord(0.0, 0.0, 10)
+
+
+def test_concatenate_coords():
+    first, second = RegularCoord(0.0, 0.5, 4), RegularCoord(2.0, 0.5, 6)
+
+    assert concatenate_coords([first, second]) == RegularCoord(0.0, 0.5, 10)
+    np.testing.assert_array_equal(
+        concatenate_coords([second, first]),
+        np.concatenate([np.asarray(second), np.asarray(first)]),
+    )
+
+
+def test_get_coordinates():
+    coords = get_coordinates(
+        {"x": RegularCoord(0.0, 1e-3, 10**9), "y": RegularCoord(0, 2, 3), "z": [1, 2]}
+    )
+
+    assert list(coords) == ["x", "y", "z"]
+    assert isinstance(coords.xindexes["x"], RangeIndex)
+    assert coords["x"][-1].item() == pytest.approx(10**6 - 1e-3)
+    np.testing.assert_array_equal(coords["y"], [0, 2, 4])
+
+
+def test_read_specs__compact():
+    specs = ReadSpecs(
+        filepath=Path("ux.bin"),
+        dtype="<f4",
+        coords={name: RegularCoord(0.0, 1.0, 10**6) for name in ("x", "y", "z")},
+        name="ux",
+        record_dim="x",
+    )
+
+    assert specs.shape == (10**6, 10**6, 10**6)
+    assert len(pickle.dumps(specs)) < 1024
+    assert specs.with_records(3).coords["x"] == RegularCoord(0.0, 1.0, 3)
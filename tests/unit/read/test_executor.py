@@ -0,0 +1,40 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from xarray_binfile.read import executor, set_max_read_workers
+
+
+@pytest.fixture
+def max_read_workers():
+    set_max_read_workers(2)
+    yield 2
+    set_max_read_workers(executor.DEFAULT_MAX_READ_WORKERS)
+
+
+def test_run_read__bounded(max_read_workers):
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def read(i: int) -> int:
+        with lock:
+            running.append(i)
+            peak.append(len(running))
+        time.sleep(0.005)
+        with lock:
+            running.remove(i)
+        return i
+
+    async def main() -> list[int]:
+        return await asyncio.gather(*(executor.run_read(read, i) for i in range(50)))
+
+    assert asyncio.run(main()) == list(range(50))
+    assert max(peak) == max_read_workers
+
+
+def test_set_max_read_workers__not_positive():
+    with pytest.raises(ValueError, match="must be positive"):
+        set_max_read_workers(0)
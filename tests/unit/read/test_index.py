@@ -0,0 +1,104 @@
+import os
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from xarray_binfile.read import (
+    ReadSpecs,
+    ReadSpecsIndex,
+    RegularCoord,
+    open_binfile_series,
+)
+from xarray_binfile.tutorial import FileSpecsGetter
+from xarray_binfile.write import BinaryEngineDataset  # noqa F401
+
+
+class TestReadSpecsIndex:
+    file_specs_getter = FileSpecsGetter(
+        base_coords={"x": np.arange(4), "y": np.linspace(0.0, 1.0, 3)}
+    )
+
+    @pytest.fixture
+    def dataset(self) -> xr.Dataset:
+        return xr.Dataset(
+            {
+                name: (("x", "y", "time"), np.arange(4 * 3 * 5.0).reshape(4, 3, 5))
+                for name in ("ux", "uy")
+            },
+            coords={"x": np.arange(4), "y": np.linspace(0.0, 1.0, 3), "time": range(5)},
+        )
+
+    @pytest.fixture
+    def paths(self, tmp_path, dataset) -> list:
+        dataset.binary_engine.to_file(self.file_specs_getter.writer, tmp_path)
+        return sorted(tmp_path.glob("*.bin"))
+
+    @pytest.fixture
+    def index_path(self, tmp_path, paths):
+        index_path = tmp_path / "index.npz"
+        ReadSpecsIndex.build(paths, self.file_specs_getter.reader).save(index_path)
+        return index_path
+
+    def test_load__roundtrip(self, paths, index_path):
+        index = ReadSpecsIndex.load(index_path)
+
+        assert index.paths == paths
+        for path in paths:
+            (specs,) = index(path)
+            expected = self.file_specs_getter.reader(path)
+            assert specs.filepath == expected.filepath
+            assert specs.name == expected.name
+            assert np.dtype(specs.dtype) == np.dtype(expected.dtype)
+            assert specs.coords.keys() == expected.coords.keys()
+            for dim, values in expected.coords.items():
+                np.testing.assert_array_equal(specs.coords[dim], values)
+
+        # coordinates with the same values are stored once, and shared
+        first, second = (index(path)[0] for path in paths[:2])
+        assert first.coords["x"] is second.coords["x"]
+
+    def test_load__structured_dtype(self, tmp_path):
+        dtype = np.dtype([("u", "<f8"), ("v", "<i4", (2,))])
+        path = tmp_path / "data.bin"
+        np.zeros(3, dtype=dtype).tofile(path)
+        specs = ReadSpecs(path, dtype, {"x": np.arange(3)}, "data")
+
+        ReadSpecsIndex.build([path], lambda path: specs).save(tmp_path / "index.npz")
+
+        (loaded,) = ReadSpecsIndex.load(tmp_path / "index.npz")(path)
+        assert loaded.dtype == dtype
+
+    def test_load__regular_coords(self, tmp_path):
+        path = tmp_path / "data.bin"
+        np.zeros(3, dtype="<f4").tofile(path)
+        coord = RegularCoord(0.5, 0.25, 3, dtype="<f4")
+        specs = ReadSpecs(path, "<f4", {"x": coord}, "data")
+
+        ReadSpecsIndex.build([path], lambda path: specs).save(tmp_path / "index.npz")
+
+        (loaded,) = ReadSpecsIndex.load(tmp_path / "index.npz")(path)
+        assert loaded.coords["x"] == RegularCoord(0.5, 0.25, 3, dtype="<f4")
+
+    def test_call__stale(self, paths, index_path):
+        os.utime(paths[0], ns=(0, 0))
+
+        with pytest.raises(ValueError, match="has changed"):
+            ReadSpecsIndex.load(index_path)(paths[0])
+
+        index = ReadSpecsIndex.load(index_path, self.file_specs_getter.reader)
+        (specs,) = index(paths[0])
+        assert specs.name == "ux"
+        assert index.refresh().entries[str(paths[0])].mtime_ns == 0
+
+    def test_open_dataset__index(self, dataset, paths, index_path):
+        ds = xr.open_mfdataset(paths, engine="binfile", read_specs_index=index_path)
+
+        xr.testing.assert_equal(ds.load(), dataset)
+
+    def test_open_binfile_series__index(self, dataset, index_path):
+        index = ReadSpecsIndex.load(index_path)
+
+        ds = open_binfile_series(index.paths, index)
+
+        xr.testing.assert_equal(ds.load(), dataset)
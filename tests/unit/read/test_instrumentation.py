@@ -0,0 +1,83 @@
+import mmap
+
+import numpy as np
+import pytest
+
+from xarray_binfile.read import add_read_hook, collect_read_stats, remove_read_hook
+from xarray_binfile.read.array import BinaryEngineBackendArray
+from xarray_binfile.read.byte_ranges import ByteRanges
+from xarray_binfile.read.file_metadata import ReadSpecs
+from xarray_binfile.read.instrumentation import READ_HOOKS, touched_nbytes
+
+
+@pytest.fixture
+def array(tmp_path) -> BinaryEngineBackendArray:
+    filepath = tmp_path / "ux.bin"
+    np.arange(64 * 1024, dtype=np.float64).tofile(filepath)
+    metadata = ReadSpecs(
+        filepath=filepath,
+        dtype=np.float64,
+        coords={"x": range(64), "y": range(1024)},
+        name="ux",
+    )
+    return BinaryEngineBackendArray(metadata)
+
+
+def test_collect_read_stats(array):
+    with collect_read_stats() as stats:
+        array._raw_indexing_method((slice(0, 4), slice(None)))
+        array._raw_indexing_method((slice(None), np.array([0, 2])))
+
+    assert not READ_HOOKS
+    (file_stats,) = stats.files.values()
+    assert file_stats.calls == 2
+    assert file_stats.requested_nbytes == 4 * 8192 + 64 * 16
+    assert file_stats.paths == {"ranges": 1, "gather": 1}
+    assert sum(file_stats.latency_histogram.values()) == 2
+    assert stats.total.calls == 2
+
+
+def test_add_read_hook(array):
+    events = []
+    add_read_hook(events.append)
+    try:
+        array._raw_indexing_method((slice(1, 2), slice(None)))
+    finally:
+        remove_read_hook(events.append)
+
+    (event,) = events
+    assert event.filepath == array.metadata.filepath
+    assert event.name == "ux"
+    assert (event.requested_nbytes, event.touched_nbytes) == (8192, 8192)
+    assert event.n_ranges == 1
+
+
+def test_remove_read_hook__while_emitting(array):
+    events = []
+
+    def remove_itself(event):
+        remove_read_hook(remove_itself)
+
+    add_read_hook(remove_itself)
+    add_read_hook(events.append)
+    try:
+        array._raw_indexing_method((slice(1, 2), slice(None)))
+    finally:
+        remove_read_hook(events.append)
+
+    # the hook after the removed one still gets the event
+    assert len(events) == 1
+    assert not READ_HOOKS
+
+
+@pytest.mark.parametrize(
+    ("starts", "nbytes", "gather", "expected"),
+    [
+        ([], 8, False, 0),
+        ([0, 16, 1 << 20], 8, False, 24 + 8),
+        ([0, 8, 2 * mmap.PAGESIZE - 4], 8, True, 3 * mmap.PAGESIZE),
+    ],
+)
+def test_touched_nbytes(starts, nbytes, gather, expected):
+    ranges = ByteRanges(np.array(starts, dtype=np.int64), nbytes)
+    assert touched_nbytes(ranges, gather=gather) == expected
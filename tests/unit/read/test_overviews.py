@@ -0,0 +1,73 @@
+import json
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from xarray_binfile.read import Overviews, ReadSpecs, RegularCoord
+from xarray_binfile.read.overviews import decimate_coord, select_overviews
+
+
+@pytest.mark.parametrize("method", ["mean", "stride"])
+@pytest.mark.parametrize("factor", [1, 3, 4])
+def test_decimate_coord(method, factor):
+    values = 1.5 + 0.25 * np.arange(10)
+    expected = (
+        values[: values.size // factor * factor].reshape(-1, factor).mean(axis=1)
+        if method == "mean"
+        else values[::factor]
+    )
+
+    np.testing.assert_allclose(decimate_coord(values, factor, method), expected)
+    coord = decimate_coord(RegularCoord(1.5, 0.25, 10), factor, method)
+    assert isinstance(coord, RegularCoord)
+    np.testing.assert_allclose(np.asarray(coord), expected)
+
+
+@pytest.mark.parametrize("unit", ["s", "ns"])
+def test_decimate_coord__times(unit):
+    times = np.datetime64("2020-01-01T00:00", unit) + np.array(
+        [0, 1, 3, 4, 7, 9, 10], dtype=f"timedelta64[{unit}]"
+    )
+    expected = xr.DataArray(times, dims="time").coarsen(time=2, boundary="trim")
+
+    np.testing.assert_array_equal(
+        decimate_coord(times, 2, "mean"), expected.mean().to_numpy()
+    )
+    np.testing.assert_array_equal(decimate_coord(times, 2, "stride"), times[::2])
+
+
+def test_overviews__select(tmp_path):
+    specs = ReadSpecs(
+        filepath=tmp_path / "ux.bin",
+        dtype="<f8",
+        coords={"x": np.arange(64), "y": np.arange(32)},
+        name="ux",
+        offset=16,
+    )
+    overviews = Overviews(({"x": 2, "y": 2}, {"x": 8}), method="stride")
+    overviews.save(specs.filepath)
+
+    [selected] = select_overviews([specs], {"x": 8, "y": 16})
+    assert selected.filepath == tmp_path / "ux.bin.ovr2"
+    assert selected.shape == (8, 32)
+    assert selected.offset == 0
+    np.testing.assert_array_equal(selected.coords["x"], np.arange(0, 64, 8))
+    assert select_overviews([specs], {"x": 8, "y": 20})[0].shape == (8, 32)
+    assert select_overviews([specs], {"x": 16, "y": 16})[0].shape == (32, 16)
+    assert select_overviews([specs], None)[0] is specs
+
+    sidecar_path = Overviews.sidecar_path(specs.filepath)
+    assert Overviews.load(specs.filepath) == Overviews(
+        ({"x": 2, "y": 2}, {"x": 8}), method="stride"
+    )
+    sidecar_path.write_text(json.dumps({"version": 0}))
+    assert Overviews.load(specs.filepath) is None
+    assert Overviews.load(tmp_path / "uy.bin") is None
+
+
+def test_overviews__invalid():
+    with pytest.raises(ValueError, match="Unknown overview method"):
+        Overviews(({"x": 2},), method="median")
+    with pytest.raises(ValueError, match="must be positive"):
+        Overviews(({"x": 0},))
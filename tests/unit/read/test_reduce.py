@@ -0,0 +1,95 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from xarray_binfile.read import ReadSpecs, binfile_reduce
+from xarray_binfile.read.reduce import REDUCTIONS
+
+
+@pytest.fixture
+def dataset(tmp_path) -> xr.Dataset:
+    random_generator = np.random.Generator(np.random.PCG64(1234))
+    values = 1e3 + random_generator.random((12, 6, 130), dtype=np.float32)
+    for i in range(4):
+        values[3 * i : 3 * i + 3].tofile(tmp_path / f"ux-{i:04}.bin")
+    return xr.Dataset(
+        {"ux": (("time", "x", "y"), values)},
+        coords={"time": range(12), "x": range(6), "y": np.linspace(0.0, 1.0, 130)},
+    )
+
+
+def read_specs_getter(path) -> ReadSpecs:
+    first = 3 * int(path.stem.removeprefix("ux-"))
+    return ReadSpecs(
+        filepath=path,
+        dtype=np.float32,
+        coords={
+            "time": range(first, first + 3),
+            "x": range(6),
+            "y": np.linspace(0.0, 1.0, 130),
+        },
+        name="ux",
+        record_dim="time",
+    )
+
+
+@pytest.mark.parametrize("max_workers", [1, 3])
+@pytest.mark.parametrize("block_nbytes", [1024, 1 << 20])
+def test_binfile_reduce(tmp_path, dataset, max_workers, block_nbytes):
+    result = binfile_reduce(
+        tmp_path.glob("*.bin"),
+        read_specs_getter,
+        ops=REDUCTIONS,
+        max_workers=max_workers,
+        block_nbytes=block_nbytes,
+    )
+
+    assert result.keys() == set(REDUCTIONS)
+    for op in REDUCTIONS:
+        expected = getattr(dataset.astype(np.float64), op)("time")
+        xr.testing.assert_allclose(result[op], expected, rtol=1e-10)
+
+
+def test_binfile_reduce__unknown(tmp_path, dataset):
+    with pytest.raises(ValueError, match="Unknown reductions"):
+        binfile_reduce(tmp_path.glob("*.bin"), read_specs_getter, ops="median")
+
+
+@pytest.mark.parametrize("block_nbytes", [1024, 1 << 20])
+def test_binfile_reduce__nan(tmp_path, dataset, block_nbytes):
+    values = dataset.ux.values
+    values[::2, 1] = np.nan
+    values[:, 2, :5] = np.nan
+    values[5:, 3] = np.nan
+    for i in range(4):
+        values[3 * i : 3 * i + 3].tofile(tmp_path / f"ux-{i:04}.bin")
+
+    result = binfile_reduce(
+        tmp_path.glob("*.bin"),
+        read_specs_getter,
+        ops=REDUCTIONS,
+        block_nbytes=block_nbytes,
+    )
+
+    for op in REDUCTIONS:
+        expected = getattr(dataset.astype(np.float64), op)("time")
+        xr.testing.assert_allclose(result[op], expected, rtol=1e-10)
+
+
+def test_binfile_reduce__integer_sum(tmp_path, dataset):
+    values = (dataset.ux.values * 1000).astype(np.int32)
+    for i in range(4):
+        values[3 * i : 3 * i + 3].tofile(tmp_path / f"ux-{i:04}.bin")
+
+    result = binfile_reduce(
+        tmp_path.glob("*.bin"),
+        lambda path: replace(read_specs_getter(path), dtype=np.int32),
+        ops=["sum", "min", "max"],
+    )
+
+    expected = dataset.copy(data={"ux": values})
+    for op in ["sum", "min", "max"]:
+        assert result[op].ux.dtype == getattr(expected.ux, op)("time").dtype
+        xr.testing.assert_equal(result[op], getattr(expected, op)("time"))
@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+import xarray as xr
+
+from xarray_binfile.read import collect_read_stats, open_binfile_tiles
+from xarray_binfile.read.tiling import TiledBackendArray, TileManifest
+from xarray_binfile.write import WriteSpecs
+
+
+@pytest.fixture
+def manifest() -> TileManifest:
+    return TileManifest(
+        name="ux",
+        dims=("x", "y"),
+        shape=(10, 7),
+        tile_shape=(4, 7),
+        dtype=">f4",
+        coords={
+            "x": np.arange(10),
+            "time": np.array(np.datetime64("2020-01-01T00:00", "ns")),
+        },
+        attrs={"units": "m/s"},
+        memory_dtype=np.float64,
+        storage_dims=("y", "x"),
+    )
+
+
+def test_tile_manifest__grid(manifest):
+    assert manifest.grid_shape == (3, 1)
+    assert list(manifest.tile_indices()) == [(0, 0), (1, 0), (2, 0)]
+    assert manifest.tile_slices((2, 0)) == (slice(8, 10), slice(0, 7))
+
+
+def test_tile_manifest__roundtrip(tmp_path, manifest):
+    manifest.save(tmp_path / "ux-0001.npz")
+    loaded = TileManifest.load(tmp_path / "ux-0001.npz")
+
+    assert loaded.coords.keys() == manifest.coords.keys()
+    for name, values in manifest.coords.items():
+        np.testing.assert_array_equal(loaded.coords[name], values)
+    assert loaded.dtype == np.dtype(">f4")
+    assert loaded.memory_dtype == np.dtype(np.float64)
+    assert (loaded.dims, loaded.shape, loaded.tile_shape) == (
+        manifest.dims,
+        manifest.shape,
+        manifest.tile_shape,
+    )
+    assert (loaded.attrs, loaded.storage_dims) == (
+        manifest.attrs,
+        manifest.storage_dims,
+    )
+    assert list(tmp_path.iterdir()) == [tmp_path / "ux-0001.npz"]
+
+
+def test_tile_manifest__invalid_tile_shape():
+    with pytest.raises(ValueError, match="Invalid tile shape"):
+        TileManifest("ux", ("x", "y"), (10, 7), (0, 7), "<f8", coords={})
+
+
+def test_tiled_backend_array__touches_intersecting_tiles(tmp_path):
+    data_array = xr.DataArray(
+        np.arange(12 * 10, dtype=np.float32).reshape(12, 10),
+        coords={"x": np.arange(12), "y": np.arange(10)},
+        dims=("x", "y"),
+        name="ux",
+    )
+
+    def writer(data_array: xr.DataArray):
+        yield WriteSpecs("ux.npz", data_array, tile_shape={"x": 5, "y": 4})
+
+    data_array.binary_engine.to_file(writer, tmp_path)
+    manifest = TileManifest.load(tmp_path / "ux.npz")
+    assert manifest.grid_shape == (3, 3)
+    array = TiledBackendArray(manifest, tmp_path / "ux.npz")
+
+    key = (slice(6, 12), np.array([9, 1, 2]))
+    with collect_read_stats() as stats:
+        result = array._raw_indexing_method(key)
+
+    np.testing.assert_array_equal(result, data_array.to_numpy()[key])
+    assert sorted(path.name for _, path in stats.files) == [
+        "ux.1.0.bin",
+        "ux.1.2.bin",
+        "ux.2.0.bin",
+        "ux.2.2.bin",
+    ]
+
+
+def test_open_binfile_tiles__dotted_manifest_names(tmp_path):
+    data_array = xr.DataArray(
+        np.arange(2 * 6 * 4, dtype=np.float64).reshape(2, 6, 4),
+        coords={"time": [0, 1], "x": np.arange(6), "y": np.arange(4)},
+        dims=("time", "x", "y"),
+        name="ux",
+    )
+
+    def writer(data_array: xr.DataArray):
+        for time in data_array["time"].values:
+            yield WriteSpecs(
+                f"ux.{time:04}.npz",
+                data_array.sel(time=time),
+                tile_shape={"x": 4, "y": 2},
+            )
+
+    data_array.binary_engine.to_file(writer, tmp_path)
+
+    assert len(list(tmp_path.glob("ux.0001.*.bin"))) == 2 * 2
+    ds = open_binfile_tiles(sorted(tmp_path.glob("*.npz")))
+    xr.testing.assert_equal(ds["ux"].transpose(*data_array.dims), data_array)
+
+
+@pytest.mark.parametrize("record_dim", ["time", "x"])
+def test_open_binfile_tiles__records(tmp_path, record_dim):
+    data_array = xr.DataArray(
+        np.arange(2 * 6 * 4, dtype=np.float64).reshape(2, 6, 4),
+        coords={"time": [0, 1], "x": np.arange(6), "y": np.arange(4)},
+        dims=("time", "x", "y"),
+        name="ux",
+    )
+
+    def writer(data_array: xr.DataArray):
+        for time in data_array["time"].values:
+            yield WriteSpecs(
+                f"ux-{time:04}.npz",
+                data_array.sel(time=time),
+                tile_shape={"x": 4, "y": 2},
+                record_dim=record_dim,
+                record_marker_size=4,
+            )
+
+    data_array.binary_engine.to_file(writer, tmp_path)
+
+    manifest = TileManifest.load(tmp_path / "ux-0001.npz")
+    assert manifest.record_dim == (None if record_dim == "time" else record_dim)
+    assert manifest.record_marker_size == 4
+    ds = open_binfile_tiles(sorted(tmp_path.glob("*.npz")))
+    xr.testing.assert_equal(ds["ux"].transpose(*data_array.dims), data_array)
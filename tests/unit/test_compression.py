@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from xarray_binfile import compression
+from xarray_binfile.compression import CompressedFile, get_codec, write_compressed
+from xarray_binfile.read.byte_ranges import ByteRanges, OuterSelection
+
+
+@pytest.fixture
+def data() -> np.typing.NDArray:
+    return np.arange(10 * 20 * 30, dtype=np.float64).reshape(10, 20, 30)
+
+
+@pytest.mark.parametrize("codec", ["zlib", "gzip", "bz2", "lzma"])
+def test_write_compressed__roundtrip(tmp_path, data, codec):
+    filepath = tmp_path / "data.bin"
+    nbytes = write_compressed(filepath, data, codec, block_size=4096)
+
+    assert nbytes == filepath.stat().st_size < data.nbytes
+    compressed_file = CompressedFile(filepath)
+    assert compressed_file.size == data.nbytes
+    assert compressed_file.codec.name == codec
+
+    result = np.empty_like(data)
+    compressed_file.readv(0, [result.reshape(-1).view(np.uint8).data])
+    np.testing.assert_array_equal(result, data)
+    compressed_file.close()
+
+
+@pytest.mark.parametrize(
+    "key",
+    [
+        (slice(2, 5), slice(None), slice(None)),
+        (np.array([7, 0, 3]), 4, slice(5, 25)),
+        (slice(None), np.array([1, 19]), np.array([0, 29])),
+    ],
+)
+def test_compressed_file__read_ranges(tmp_path, data, key):
+    filepath = tmp_path / "data.bin"
+    write_compressed(filepath, data, "zlib", block_size=1000)
+    selection = OuterSelection.from_key(key, data.shape)
+    ranges = ByteRanges.from_selection(selection, data.strides, data.itemsize)
+
+    result = np.empty(selection.shape, dtype=data.dtype)
+    CompressedFile(filepath).read_ranges(result, ranges)
+
+    np.testing.assert_array_equal(result, data[np.ix_(*selection.indices)])
+
+
+def test_compressed_file__decodes_only_overlapping_blocks(tmp_path, data, monkeypatch):
+    filepath = tmp_path / "data.bin"
+    write_compressed(filepath, data, "zlib", block_size=4096)
+    monkeypatch.setattr(compression, "BLOCK_CACHE", {})
+    compressed_file = CompressedFile(filepath)
+
+    result = np.empty(16, dtype=np.uint8)
+    compressed_file.readv(4090, [result.data])
+
+    assert sorted(key[-1] for key in compression.BLOCK_CACHE) == [0, 1]
+    np.testing.assert_array_equal(result, data.reshape(-1).view(np.uint8)[4090:4106])
+
+
+def test_compressed_file__readv_across_blocks(tmp_path, data):
+    filepath = tmp_path / "data.bin"
+    write_compressed(filepath, data, "zlib", block_size=1000)
+    compressed_file = CompressedFile(filepath)
+
+    result = np.empty(3000, dtype=np.uint8)
+    compressed_file.readv(
+        500, [result[:700].data, result[700:700].data, result[700:].data]
+    )
+
+    np.testing.assert_array_equal(result, data.reshape(-1).view(np.uint8)[500:3500])
+    with pytest.raises(EOFError, match="Expected 16 bytes"):
+        compressed_file.readv(data.nbytes - 8, [result[:16].data])
+
+
+def test_write_compressed__long_codec_name(tmp_path, data):
+    with pytest.raises(ValueError, match="longer than 16 bytes"):
+        write_compressed(tmp_path / "data.bin", data, "a-very-long-codec-name")
+    assert not (tmp_path / "data.bin").exists()
+
+
+def test_compressed_file__not_compressed(tmp_path, data):
+    filepath = tmp_path / "data.bin"
+    data.tofile(filepath)
+
+    with pytest.raises(ValueError, match="not a block-compressed file"):
+        CompressedFile(filepath)
+
+
+def test_get_codec__unknown():
+    with pytest.raises(ValueError, match="Unknown codec 'unknown'"):
+        get_codec("unknown")
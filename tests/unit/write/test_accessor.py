@@ -0,0 +1,184 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+import numpy as np
+import pytest
+import xarray as xr
+from dask.delayed import Delayed
+
+from xarray_binfile.read import FileStatistics
+from xarray_binfile.tutorial import FileSpecsGetter
+from xarray_binfile.write import BinaryEngineDataset  # noqa F401
+
+
+class TestToFile:
+    file_specs_getter = FileSpecsGetter(
+        base_coords={"x": np.arange(6), "y": np.arange(8)}
+    )
+    random_generator = np.random.Generator(np.random.PCG64(1234))
+
+    @pytest.fixture
+    def dataset(self) -> xr.Dataset:
+        return xr.Dataset(
+            {
+                name: (
+                    ("time", "y", "x"),
+                    self.random_generator.random(size=(3, 8, 6)),
+                )
+                for name in ("ux", "uy")
+            },
+            coords={"x": np.arange(6), "y": np.arange(8), "time": np.arange(3)},
+        )
+
+    def read(self, directory) -> xr.Dataset:
+        return xr.open_mfdataset(
+            sorted(directory.glob("*.bin")),
+            engine="binfile",
+            read_specs_getter=self.file_specs_getter.reader,
+        ).load()
+
+    @pytest.mark.parametrize("chunks", [None, {"x": 2, "y": 3, "time": 1}])
+    def test_to_file__compute(self, tmp_path, dataset, chunks):
+        if chunks is not None:
+            dataset = dataset.chunk(chunks)
+
+        result = dataset.binary_engine.to_file(self.file_specs_getter.writer, tmp_path)
+
+        assert result is None
+        xr.testing.assert_equal(
+            self.read(tmp_path), dataset.transpose("x", "y", "time")
+        )
+
+    @pytest.mark.parametrize("chunks", [None, {"x": 2, "y": 3, "time": 1}])
+    def test_to_file__outdated_statistics(self, tmp_path, dataset, chunks):
+        if chunks is not None:
+            dataset = dataset.chunk(chunks)
+        dataset.binary_engine.to_file(
+            self.file_specs_getter.writer, tmp_path, statistics=True
+        )
+        assert len(list(tmp_path.glob("*.stats.json"))) == 6
+
+        dataset.binary_engine.to_file(self.file_specs_getter.writer, tmp_path)
+
+        assert not list(tmp_path.glob("*.stats.json"))
+
+    def test_to_file__empty_statistics(self, tmp_path, dataset):
+        dataset = dataset.isel(x=slice(0)).chunk()
+
+        dataset.binary_engine.to_file(
+            self.file_specs_getter.writer, tmp_path, statistics=True
+        )
+
+        file_statistics = FileStatistics.load(tmp_path / "ux-0000.bin")
+        assert file_statistics is not None
+        assert file_statistics.count == 0
+        assert np.isnan(file_statistics.mean)
+
+    def test_to_file__delayed(self, tmp_path, dataset):
+        dataset = dataset.chunk({"x": 2, "y": 3, "time": 1})
+
+        result = dataset.binary_engine.to_file(
+            self.file_specs_getter.writer, tmp_path, compute=False
+        )
+
+        assert isinstance(result, Delayed)
+        assert not list(tmp_path.glob("*.bin"))
+        result.compute()
+        xr.testing.assert_equal(
+            self.read(tmp_path), dataset.transpose("x", "y", "time")
+        )
+
+    def test_data_array_to_file__delayed(self, tmp_path, dataset):
+        data_array = dataset.ux.chunk({"x": 3})
+
+        result = data_array.binary_engine.to_file(
+            self.file_specs_getter.writer, tmp_path, compute=False
+        )
+        result.compute()
+
+        xr.testing.assert_equal(
+            self.read(tmp_path).ux, data_array.transpose("x", "y", "time")
+        )
+
+    @pytest.mark.parametrize("pool", ["max_workers", "executor"])
+    def test_to_file__pool(self, tmp_path, dataset, pool):
+        with ThreadPoolExecutor(2) as executor:
+            kwargs = (
+                {"max_workers": 2} if pool == "max_workers" else {"executor": executor}
+            )
+            reports = dataset.chunk({"x": 3}).binary_engine.to_file(
+                self.file_specs_getter.writer, tmp_path, **kwargs
+            )
+
+        assert [report.filepath.name for report in reports] == [
+            f"{name}-{time:04}.bin" for name in ("ux", "uy") for time in range(3)
+        ]
+        assert all(report.nbytes == 6 * 8 * 8 for report in reports)
+        xr.testing.assert_equal(
+            self.read(tmp_path), dataset.transpose("x", "y", "time")
+        )
+
+    def test_to_file__pool_without_compute(self, tmp_path, dataset):
+        with pytest.raises(ValueError, match="compute=False"):
+            dataset.binary_engine.to_file(
+                self.file_specs_getter.writer, tmp_path, max_workers=2, compute=False
+            )
+
+    @pytest.mark.parametrize("compute", [True, False])
+    def test_to_file__compressed(self, tmp_path, dataset, compute):
+        file_specs_getter = replace(self.file_specs_getter, compression="zlib")
+
+        result = dataset.chunk({"x": 3}).binary_engine.to_file(
+            file_specs_getter.writer, tmp_path, compute=compute
+        )
+        if not compute:
+            assert not list(tmp_path.glob("*.bin"))
+            result.compute()
+
+        read = xr.open_mfdataset(
+            sorted(tmp_path.glob("*.bin")),
+            engine="binfile",
+            read_specs_getter=file_specs_getter.reader,
+        ).load()
+        xr.testing.assert_equal(read, dataset.transpose("x", "y", "time"))
+
+    @pytest.mark.parametrize("chunks", [None, {"x": 3}])
+    def test_to_file__disk_dtype(self, tmp_path, dataset, chunks):
+        file_specs_getter = replace(
+            self.file_specs_getter, dtype=">f4", memory_dtype=np.float64
+        )
+        if chunks is not None:
+            dataset = dataset.chunk(chunks)
+
+        dataset.binary_engine.to_file(file_specs_getter.writer, tmp_path)
+
+        assert (tmp_path / "ux-0000.bin").stat().st_size == 6 * 8 * 4
+        read = xr.open_mfdataset(
+            sorted(tmp_path.glob("*.bin")),
+            engine="binfile",
+            read_specs_getter=file_specs_getter.reader,
+        ).load()
+        assert read.ux.dtype == np.float64
+        xr.testing.assert_equal(
+            read,
+            dataset.astype(np.float32).astype(np.float64).transpose("x", "y", "time"),
+        )
+
+    @pytest.mark.parametrize("chunks", [None, {"x": 3}])
+    def test_to_file__storage_dims(self, tmp_path, dataset, chunks):
+        file_specs_getter = replace(self.file_specs_getter, storage_dims=("y", "x"))
+        if chunks is not None:
+            dataset = dataset.chunk(chunks)
+
+        dataset.binary_engine.to_file(file_specs_getter.writer, tmp_path)
+
+        np.testing.assert_array_equal(
+            np.fromfile(tmp_path / "ux-0001.bin").reshape(8, 6),
+            dataset.ux.isel(time=1).transpose("y", "x"),
+        )
+        read = xr.open_mfdataset(
+            sorted(tmp_path.glob("*.bin")),
+            engine="binfile",
+            read_specs_getter=file_specs_getter.reader,
+        ).load()
+        xr.testing.assert_equal(read, dataset.transpose("x", "y", "time"))
@@ -0,0 +1,131 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from xarray_binfile.read import FileStatistics
+from xarray_binfile.write import WriteSpecs
+from xarray_binfile.write import executor as write_executor
+from xarray_binfile.write.executor import WriteReport, write_files
+
+
+@pytest.fixture
+def tasks(tmp_path) -> list[tuple]:
+    return [
+        (
+            tmp_path / f"test-{i}.bin",
+            WriteSpecs(f"test-{i}.bin", xr.DataArray(np.full(16, i, dtype=np.float64))),
+        )
+        for i in range(8)
+    ]
+
+
+def test_write_files__inflight_bytes(tasks, monkeypatch):
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def write_file(filepath, write_specs, **_) -> WriteReport:
+        with lock:
+            running.append(filepath)
+            peak.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.remove(filepath)
+        return WriteReport(filepath, write_specs.sub_array.nbytes, 0.01)
+
+    monkeypatch.setattr(write_executor, "write_file", write_file)
+    with ThreadPoolExecutor(8) as executor:
+        write_files(tasks, executor, max_inflight_bytes=2 * 16 * 8)
+
+    assert max(peak) == 2
+
+
+def test_write_files__deterministic_error(tasks, tmp_path):
+    tasks[3] = (tmp_path / "missing" / "test-3.bin", tasks[3][1])
+    tasks[5] = (tmp_path / "missing" / "test-5.bin", tasks[5][1])
+
+    with (
+        ThreadPoolExecutor(4) as executor,
+        pytest.raises(FileNotFoundError, match="test-3.bin"),
+    ):
+        write_files(tasks, executor)
+
+
+def test_write_files__reports(tasks):
+    with ThreadPoolExecutor(4) as executor:
+        reports = write_files(tasks, executor)
+
+    assert [report.filepath for report in reports] == [path for path, _ in tasks]
+    for report, (_, write_specs) in zip(reports, tasks, strict=True):
+        assert report.nbytes == write_specs.sub_array.nbytes
+        assert np.array_equal(np.fromfile(report.filepath), write_specs.sub_array)
+
+
+@pytest.mark.parametrize("chunk_nbytes", [16, 64])
+def test_write_file__blocks(tmp_path, monkeypatch, chunk_nbytes):
+    monkeypatch.setattr(write_executor, "CONVERT_CHUNK_NBYTES", chunk_nbytes)
+    sub_array = xr.DataArray(np.arange(6 * 20.0).reshape(6, 20), dims=("x", "y"))
+    write_specs = WriteSpecs(
+        "test.bin", sub_array, dtype=">f4", storage_dims=("y", "x")
+    )
+
+    report = write_executor.write_file(tmp_path / "test.bin", write_specs)
+
+    assert report.nbytes == 6 * 20 * 4
+    np.testing.assert_array_equal(
+        np.fromfile(tmp_path / "test.bin", dtype=">f4").reshape(20, 6), sub_array.T
+    )
+
+
+def test_write_file__append_records(tmp_path):
+    data = np.arange(2 * 3 * 4, dtype=np.float64).reshape(2, 3, 4)
+    data_array = xr.DataArray(data, dims=("time", "x", "y"))
+    filepath = tmp_path / "ux.bin"
+    for step in range(2):
+        write_executor.write_file(
+            filepath,
+            WriteSpecs(
+                "ux.bin",
+                data_array.isel(time=step),
+                dtype=">f4",
+                storage_dims=("y", "x"),
+                record_dim="time",
+                record_marker_size=4,
+            ),
+            append=True,
+            statistics=True,
+        )
+
+    assert FileStatistics.load(filepath) == FileStatistics(
+        count=data.size, min=0.0, max=23.0, mean=11.5
+    )
+    records = np.fromfile(
+        filepath, dtype=[("m0", ">i4"), ("v", ">f4", (4, 3)), ("m1", ">i4")]
+    )
+    np.testing.assert_array_equal(records["m0"], [48, 48])
+    np.testing.assert_array_equal(records["m1"], [48, 48])
+    np.testing.assert_array_equal(records["v"], data.transpose(0, 2, 1))
+
+
+def test_write_file__outdated_statistics(tmp_path):
+    filepath = tmp_path / "ux.bin"
+
+    def write(values: list[float], **kwargs) -> FileStatistics | None:
+        data_array = xr.DataArray(np.array(values), dims="x")
+        write_executor.write_file(filepath, WriteSpecs("ux.bin", data_array), **kwargs)
+        return FileStatistics.load(filepath)
+
+    assert write([1.0, 5.0], statistics=True) is not None
+    assert write([100.0, 500.0]) is None
+    # the records before have no statistics, so those appended cannot cover them
+    assert write([2.0], append=True, statistics=True) is None
+    assert write([1.0, 5.0], statistics=True) is not None
+    assert write([2.0], append=True) is None
+    filepath.unlink()
+    assert write([2.0], append=True, statistics=True) == FileStatistics(
+        count=1, min=2.0, max=2.0, mean=2.0
+    )
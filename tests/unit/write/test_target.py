@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from xarray_binfile.write.target import BinaryFileTarget
+
+
+@pytest.mark.parametrize(
+    "key",
+    [
+        (slice(1, 3),),
+        (slice(2, 3), slice(1, 4)),
+        (slice(0, 4), slice(2, 4), slice(1, 2)),
+        (slice(None), slice(None, None, 2)),
+        (1, slice(None)),
+    ],
+)
+def test_setitem(tmp_path, key):
+    expected = np.zeros((4, 5, 3), dtype=">f4")
+    target = BinaryFileTarget.create(
+        tmp_path / "ux.bin", expected.dtype, expected.shape
+    )
+    value = np.arange(expected[key].size, dtype=np.float64).reshape(expected[key].shape)
+
+    target[key] = value
+    expected[key] = value
+
+    np.testing.assert_array_equal(
+        np.fromfile(tmp_path / "ux.bin", dtype=">f4").reshape(expected.shape), expected
+    )
+
+
+def test_setitem__empty(tmp_path):
+    target = BinaryFileTarget.create(tmp_path / "ux.bin", np.float64, (0, 3))
+
+    target[0:0, :] = np.empty((0, 3))
+    target[...] = np.empty((0, 3))
+
+    assert (tmp_path / "ux.bin").stat().st_size == 0